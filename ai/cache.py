@@ -0,0 +1,150 @@
+"""
+LLM 响应缓存
+
+以 (论文 ID, 摘要哈希, 模型名, 语言, Prompt 哈希) 为键，把成功的结构化结果存进 SQLite。
+Prompt 哈希覆盖 system.txt、template.txt 和 Structure 的 JSON Schema，任何一处改动都会
+让旧缓存自然失效。失败的回退结果不会写入缓存。
+
+超过容量上限时按最近访问时间淘汰最旧的条目。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+def prompt_fingerprint(system: str, template: str, schema: Dict) -> str:
+    """Prompt 与输出结构的指纹"""
+    payload = json.dumps([system, template, schema], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite 响应缓存
+
+    Args:
+        path: 数据库文件路径
+        model: 模型名称
+        language: 输出语言
+        fingerprint: prompt_fingerprint() 的结果
+        max_bytes: 缓存值的总字节数上限（0 表示不限）
+    """
+
+    def __init__(self, path: str, model: str, language: str, fingerprint: str, max_bytes: int = 200 * 1024 * 1024):
+        self.path = path
+        self.model = model
+        self.language = language
+        self.fingerprint = fingerprint
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 线程引擎会在多个线程中访问，由 _lock 串行化
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key         TEXT PRIMARY KEY,
+                paper_id    TEXT NOT NULL,
+                model       TEXT NOT NULL,
+                data        TEXT NOT NULL,
+                size        INTEGER NOT NULL,
+                created_at  REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed ON llm_responses (accessed_at)"
+        )
+        self.conn.commit()
+
+    def key_for(self, item: Dict) -> str:
+        """条目的缓存键"""
+        parts = [
+            str(item.get("id", "")),
+            content_hash(item.get("summary", "")),
+            self.model,
+            self.language,
+            self.fingerprint,
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, item: Dict) -> Optional[Dict]:
+        """命中时返回缓存的 AI 字段"""
+        key = self.key_for(item)
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        return json.loads(row[0])
+
+    def put(self, item: Dict, ai_fields: Dict) -> None:
+        """缓存一次成功的结果"""
+        data = json.dumps(ai_fields, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, paper_id, model, data, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.key_for(item), str(item.get("id", "")), self.model, data, len(data.encode("utf-8")), now, now),
+            )
+            self.conn.commit()
+            self.stores += 1
+
+    def evict(self) -> int:
+        """总大小超过上限时，按最近访问时间从旧到新删除，返回删除的条目数"""
+        if not self.max_bytes:
+            return 0
+        with self._lock:
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            removed = 0
+            rows = self.conn.execute("SELECT key, size FROM llm_responses ORDER BY accessed_at").fetchall()
+            doomed = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                total -= size
+                removed += 1
+            self.conn.executemany("DELETE FROM llm_responses WHERE key = ?", doomed)
+            self.conn.commit()
+            self.evicted += removed
+        return removed
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Response cache: {self.hits} hits / {self.misses} misses "
+            f"(hit rate {self.hit_rate:.1%}), {self.stores} stored, {self.evicted} evicted"
+        )
+
+    def close(self) -> None:
+        self.evict()
+        with self._lock:
+            self.conn.close()
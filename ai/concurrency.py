@@ -0,0 +1,160 @@
+"""
+AIMD 自适应并发控制
+
+和 TCP 拥塞控制一样：每完成一次健康的请求，并发上限增加 increase / limit（约每轮
++increase）；遇到限流（429）或超时时乘以 decrease。延迟明显高于历史最低水平、或服务端
+错误率偏高时只保持不增加。同一轮（一个平均延迟）内的多次限流只减一次，避免一批 429
+把并发一下子降到底。
+
+每次请求结束记录一条轨迹（时间、上限、在途数、结果、延迟），可以导出为 CSV，
+用来给不同服务商挑选合适的参数。
+"""
+
+import asyncio
+import csv
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import List, Optional, Tuple
+
+from resilience import classify_error
+
+# 延迟与错误率的指数滑动平均系数
+EWMA_ALPHA = 0.2
+
+
+class AIMDController:
+    """
+    自适应并发上限
+
+    Args:
+        minimum: 并发下限
+        maximum: 并发上限（线程池大小 / 协程数）
+        initial: 初始并发数
+        increase: 每轮增加量
+        decrease: 限流或超时时的乘数
+        latency_tolerance: 平滑延迟超过历史最低值的多少倍时不再增加
+        error_tolerance: 服务端错误率（平滑）超过该值时不再增加
+    """
+
+    def __init__(self, minimum: int = 1, maximum: int = 64, initial: Optional[int] = None,
+                 increase: float = 1.0, decrease: float = 0.5,
+                 latency_tolerance: float = 2.0, error_tolerance: float = 0.1):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(self.maximum, max(self.minimum, initial or min(4, self.maximum))))
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.error_tolerance = error_tolerance
+
+        self.in_flight = 0
+        self.latency = None          # 平滑延迟（秒）
+        self.latency_floor = None    # 平滑延迟的历史最低值
+        self.error_rate = 0.0
+        self.last_decrease = 0.0
+        self.decreases = 0
+        self.peak = self.limit
+        self.started = time.monotonic()
+        self.trace: List[Tuple[float, float, int, str, float]] = []
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._async_cond: Optional[asyncio.Condition] = None
+
+    def _has_slot(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _healthy(self) -> bool:
+        if self.error_rate > self.error_tolerance:
+            return False
+        if self.latency is None or self.latency_floor is None:
+            return True
+        return self.latency <= self.latency_floor * self.latency_tolerance
+
+    def _record(self, outcome: str, latency: float) -> None:
+        """请求结束后更新上限（调用方持有锁）"""
+        now = time.monotonic()
+        self.in_flight -= 1
+
+        if outcome in ("ok", "parse"):
+            # 解析失败也说明服务端正常响应，延迟同样有效
+            self.latency = latency if self.latency is None else (
+                EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency
+            )
+            self.latency_floor = self.latency if self.latency_floor is None else min(self.latency_floor, self.latency)
+        self.error_rate = EWMA_ALPHA * (outcome == "server") + (1 - EWMA_ALPHA) * self.error_rate
+
+        if outcome in ("rate_limit", "timeout"):
+            # 同一轮内只减一次
+            if now - self.last_decrease >= (self.latency or 0.0):
+                self.limit = max(float(self.minimum), self.limit * self.decrease)
+                self.last_decrease = now
+                self.decreases += 1
+        elif outcome in ("ok", "parse") and self._healthy():
+            self.limit = min(float(self.maximum), self.limit + self.increase / self.limit)
+        self.peak = max(self.peak, self.limit)
+
+        self.trace.append((now - self.started, self.limit, self.in_flight, outcome, latency))
+
+    @contextmanager
+    def slot(self):
+        """占用一个并发名额直到 with 块结束，按是否异常及异常类别调整上限"""
+        with self._cond:
+            while not self._has_slot():
+                self._cond.wait()
+            self.in_flight += 1
+        start = time.monotonic()
+        outcome = "ok"
+        try:
+            yield
+        except Exception as e:
+            outcome = classify_error(e)
+            raise
+        finally:
+            with self._cond:
+                self._record(outcome, time.monotonic() - start)
+                self._cond.notify_all()
+
+    @asynccontextmanager
+    async def slot_async(self):
+        """slot 的异步版本（只在同一个事件循环中使用）"""
+        if self._async_cond is None:
+            self._async_cond = asyncio.Condition()
+        cond = self._async_cond
+        async with cond:
+            await cond.wait_for(self._has_slot)
+            self.in_flight += 1
+        start = time.monotonic()
+        outcome = "ok"
+        try:
+            yield
+        except Exception as e:
+            outcome = classify_error(e)
+            raise
+        finally:
+            async with cond:
+                with self._lock:
+                    self._record(outcome, time.monotonic() - start)
+                cond.notify_all()
+
+    def format_status(self) -> str:
+        """进度条后缀用的简短文本"""
+        return f"conc {self.in_flight}/{int(self.limit)}"
+
+    def summary(self) -> str:
+        """运行结束后的统计"""
+        latency = f"{self.latency:.2f}s" if self.latency is not None else "n/a"
+        return (
+            f"Adaptive concurrency: final {int(self.limit)}, peak {int(self.peak)} "
+            f"(bounds {self.minimum}-{self.maximum}), {self.decreases} decreases, smoothed latency {latency}"
+        )
+
+    def export_trace(self, path: str) -> int:
+        """把并发轨迹写成 CSV，返回行数"""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["elapsed_s", "limit", "in_flight", "outcome", "latency_s"])
+            for elapsed, limit, in_flight, outcome, latency in self.trace:
+                writer.writerow([f"{elapsed:.3f}", f"{limit:.2f}", in_flight, outcome, f"{latency:.3f}"])
+        return len(self.trace)
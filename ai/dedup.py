@@ -0,0 +1,335 @@
+"""
+近似重复论文检测（MinHash + LSH）
+
+替换版本、撤稿后重投、同时出现在会议和 arXiv 上的论文，id 不同但标题和摘要几乎一样。
+这里对规范化后的标题 + 摘要取词级 3-gram，计算 MinHash 签名，按 LSH 分带存进 SQLite，
+跨天累积。查询时只取与当前论文至少有一个分带相同的候选（索引查找，与库的大小基本
+无关），再用签名估计 Jaccard 相似度确认。
+
+默认只在结果中标记 ``AI.near_duplicate_of``（flag 模式）；显式选择 reuse 模式时，
+命中且库中有同一 Prompt 下的完整分析结果的论文直接复用该结果，不再调用 LLM。
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[一-鿿]|[a-z0-9]+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# 写入结果 AI 字段的标记（存入索引前去掉）
+DUPLICATE_FIELDS = ("near_duplicate_of", "duplicate_similarity")
+
+
+def shingles(item: Dict, k: int = 3) -> Set[str]:
+    """规范化（小写、去标点）后的标题 + 摘要的词级 k-gram"""
+    text = f"{item.get('title', '')} {item.get('summary', '')}".lower()
+    tokens = _TOKEN_RE.findall(text)
+    if len(tokens) < k:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+class MinHasher:
+    """
+    MinHash 签名（h(x) = (a * x + b) mod p，取低 32 位）
+
+    Args:
+        num_perm: 签名长度
+        seed: 随机种子（持久化的签名依赖它，不能随意修改）
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        self.num_perm = num_perm
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, tokens: Set[str]) -> np.ndarray:
+        if not tokens:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=4).digest(), "little") for t in tokens),
+            dtype=np.uint64,
+            count=len(tokens),
+        )
+        # uint64 乘法溢出按模 2^64 回绕，与 datasketch 的做法相同，不影响作为哈希族使用
+        permuted = (np.outer(hashes, self.a) + self.b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """两个签名估计的 Jaccard 相似度"""
+    return float(np.mean(a == b))
+
+
+@dataclass
+class Match:
+    """查询命中的已有论文"""
+
+    paper_id: str
+    similarity: float
+    ai: Optional[Dict] = None          # 与当前 Prompt 指纹一致的分析结果
+
+
+class NearDuplicateIndex:
+    """
+    持久化的 MinHash LSH 索引
+
+    Args:
+        path: SQLite 文件路径
+        threshold: 判定为近似重复的相似度
+        num_perm: 签名长度
+        bands: LSH 分带数（num_perm 必须能被整除）；bands=16、rows=8 时候选门限约 0.7
+    """
+
+    def __init__(self, path: str, threshold: float = 0.85, num_perm: int = 128, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.queries = 0
+        self.matches = 0
+        self.candidates = 0
+        self.query_seconds = 0.0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS minhash_meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS minhash_documents (
+                paper_id    TEXT PRIMARY KEY,
+                title       TEXT,
+                signature   BLOB NOT NULL,
+                ai          TEXT,
+                fingerprint TEXT,
+                added_at    REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS minhash_buckets (
+                bucket   INTEGER NOT NULL,
+                paper_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_minhash_buckets_bucket ON minhash_buckets (bucket);
+            CREATE INDEX IF NOT EXISTS idx_minhash_buckets_paper ON minhash_buckets (paper_id);
+            """
+        )
+        self._check_params(num_perm)
+
+    def _check_params(self, num_perm: int) -> None:
+        """签名参数写入库中；与已有索引不一致时拒绝使用，避免混用两种签名"""
+        params = json.dumps({"num_perm": num_perm, "bands": self.bands, "seed": 1})
+        row = self.conn.execute("SELECT value FROM minhash_meta WHERE key = 'params'").fetchone()
+        if row is None:
+            self.conn.execute("INSERT INTO minhash_meta (key, value) VALUES ('params', ?)", (params,))
+            self.conn.commit()
+        elif row[0] != params:
+            raise ValueError(f"{self.path} was built with {row[0]}, not {params}")
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM minhash_documents").fetchone()[0]
+
+    def signature(self, item: Dict) -> np.ndarray:
+        return self.hasher.signature(shingles(item))
+
+    def _buckets(self, signature: np.ndarray) -> List[int]:
+        buckets = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(band.to_bytes(2, "little") + chunk, digest_size=8).digest()
+            buckets.append(int.from_bytes(digest, "little", signed=True))
+        return buckets
+
+    def query(self, item: Dict, fingerprint: Optional[str] = None,
+              signature: Optional[np.ndarray] = None) -> Optional[Match]:
+        """
+        查找与 item 最相似的已有论文（不含同一 id）
+
+        Args:
+            item: 论文（需要 title / summary）
+            fingerprint: 当前 Prompt 指纹，只返回指纹一致的分析结果
+            signature: 预先算好的签名
+
+        Returns:
+            相似度达到阈值的最佳匹配，没有时返回 None
+        """
+        start = time.perf_counter()
+        self.queries += 1
+        if signature is None:
+            signature = self.signature(item)
+        buckets = self._buckets(signature)
+        placeholders = ",".join("?" * len(buckets))
+        rows = self.conn.execute(
+            f"SELECT DISTINCT d.paper_id, d.signature, d.ai, d.fingerprint "
+            f"FROM minhash_buckets b JOIN minhash_documents d ON d.paper_id = b.paper_id "
+            f"WHERE b.bucket IN ({placeholders}) AND b.paper_id != ?",
+            (*buckets, str(item.get("id", ""))),
+        ).fetchall()
+        self.candidates += len(rows)
+
+        # 优先选有可复用分析结果的匹配，其次选相似度最高的
+        best, best_key = None, None
+        for paper_id, blob, ai, ai_fingerprint in rows:
+            score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if score < self.threshold:
+                continue
+            usable = ai is not None and (fingerprint is None or ai_fingerprint == fingerprint)
+            if usable:
+                ai = json.loads(ai)
+                # 旧版本写入的初筛结果不能当作完整分析复用
+                usable = ai.get("analysis_tier") != "triage"
+            if best_key is None or (usable, score) > best_key:
+                best, best_key = Match(paper_id, score, ai if usable else None), (usable, score)
+        if best is not None:
+            self.matches += 1
+        self.query_seconds += time.perf_counter() - start
+        return best
+
+    def add(self, item: Dict, ai: Optional[Dict] = None, fingerprint: Optional[str] = None,
+            signature: Optional[np.ndarray] = None) -> None:
+        """加入或更新一篇论文（ai 为 None 时保留已有的分析结果）"""
+        paper_id = str(item.get("id", ""))
+        if signature is None:
+            signature = self.signature(item)
+        existing = self.conn.execute(
+            "SELECT ai, fingerprint FROM minhash_documents WHERE paper_id = ?", (paper_id,)
+        ).fetchone()
+        if ai is None and existing is not None:
+            ai_json, fingerprint = existing
+        else:
+            ai_json = json.dumps(ai, ensure_ascii=False) if ai is not None else None
+        self.conn.execute(
+            "INSERT OR REPLACE INTO minhash_documents (paper_id, title, signature, ai, fingerprint, added_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (paper_id, item.get("title", ""), signature.tobytes(), ai_json, fingerprint, time.time()),
+        )
+        self.conn.execute("DELETE FROM minhash_buckets WHERE paper_id = ?", (paper_id,))
+        self.conn.executemany(
+            "INSERT INTO minhash_buckets (bucket, paper_id) VALUES (?, ?)",
+            [(bucket, paper_id) for bucket in self._buckets(signature)],
+        )
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        return self.matches / self.queries if self.queries else 0.0
+
+    def summary(self) -> str:
+        avg_ms = self.query_seconds / self.queries * 1000 if self.queries else 0.0
+        avg_candidates = self.candidates / self.queries if self.queries else 0.0
+        return (
+            f"Near-duplicate index: {len(self)} papers, {self.matches}/{self.queries} queries matched "
+            f"(hit rate {self.hit_rate:.1%}), {avg_candidates:.1f} candidates and {avg_ms:.2f} ms per query"
+        )
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+def mark_duplicate(ai: Dict, original_id: str, score: float) -> Dict:
+    """带近似重复标记的 AI 字段副本"""
+    return dict(ai, near_duplicate_of=original_id, duplicate_similarity=round(score, 3))
+
+
+def analysis(ai: Dict) -> Dict:
+    """去掉近似重复标记后的 AI 字段"""
+    return {k: v for k, v in ai.items() if k not in DUPLICATE_FIELDS}
+
+
+def resolve_near_duplicates(items: List[Dict], index: NearDuplicateIndex, fingerprint: str,
+                            reuse: bool) -> Tuple[List[Dict], List[Dict], Dict[str, Tuple[str, float]]]:
+    """
+    在调用 LLM 之前处理近似重复
+
+    每篇论文先查询索引再加入索引，同一批中后出现的重复也能找到先出现的那篇。
+
+    Args:
+        items: 待处理的论文
+        index: 近似重复索引
+        fingerprint: 当前 Prompt 指纹
+        reuse: True 时复用已有分析结果、同批重复只分析一次；False 时只标记
+
+    Returns:
+        (仍需调用 LLM 的论文, 已复用历史结果的论文, {重复论文 id: (原论文 id, 相似度)})
+        第三项包含所有命中；reuse 模式下其中同批的重复不在第一项中，需要在处理后从原论文复制结果
+    """
+    to_process, reused, duplicates = [], [], {}
+    pending_ids = set()
+    for item in items:
+        signature = index.signature(item)
+        match = index.query(item, fingerprint, signature)
+        if match is None:
+            index.add(item, signature=signature)
+            to_process.append(item)
+            pending_ids.add(item["id"])
+            continue
+        duplicates[item["id"]] = (match.paper_id, match.similarity)
+        if reuse and match.ai is not None:
+            item["AI"] = mark_duplicate(match.ai, match.paper_id, match.similarity)
+            index.add(item, ai=match.ai, fingerprint=fingerprint, signature=signature)
+            reused.append(item)
+        elif reuse and match.paper_id in pending_ids:
+            # 同一批中的重复：等原论文分析完再复制
+            index.add(item, signature=signature)
+        else:
+            index.add(item, signature=signature)
+            to_process.append(item)
+            pending_ids.add(item["id"])
+    index.commit()
+    return to_process, reused, duplicates
+
+
+def apply_duplicates(results: Dict[str, Dict], items: Iterable[Dict],
+                     duplicates: Dict[str, Tuple[str, float]]) -> Dict[str, int]:
+    """
+    处理完成后补全近似重复论文的结果
+
+    同批中被跳过的重复从原论文复制结果，其余命中（flag 模式或没有可复用结果）加上标记。
+
+    Args:
+        results: {论文 id: 结果}，原地更新
+        items: 输入的论文
+        duplicates: resolve_near_duplicates 返回的命中
+
+    Returns:
+        {"reused": 复用历史结果数, "copied": 同批复制数, "flagged": 只标记数}
+    """
+    counts = {"reused": 0, "copied": 0, "flagged": 0}
+    for item in items:
+        hit = duplicates.get(item["id"])
+        if hit is None:
+            continue
+        original_id, score = hit
+        result = results.get(item["id"])
+        if result is None:
+            original = results.get(original_id)
+            if original is None:
+                continue
+            item["AI"] = mark_duplicate(analysis(original["AI"]), original_id, score)
+            results[item["id"]] = item
+            counts["copied"] += 1
+        elif result["AI"].get("near_duplicate_of") == original_id:
+            counts["reused"] += 1
+        else:
+            result["AI"] = mark_duplicate(result["AI"], original_id, score)
+            counts["flagged"] += 1
+    return counts
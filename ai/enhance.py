@@ -1,8 +1,9 @@
 import os
-import json
 import sys
+import asyncio
+from contextlib import nullcontext
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Type
 
 import dotenv
 import argparse
@@ -15,7 +16,17 @@ from langchain.prompts import (
     SystemMessagePromptTemplate,
     HumanMessagePromptTemplate,
 )
-from structure import Structure
+from pydantic import BaseModel
+from structure import Structure, TriageStructure
+from rate_limit import RateLimiter
+from shared import estimate_tokens
+from cache import ResponseCache, prompt_fingerprint
+from journal import Journal, load_jsonl, read_jsonl, write_jsonl_atomic
+from resilience import CircuitBreaker, Resilience, RetryPolicy
+from concurrency import AIMDController
+from repair import raw_payload, restore_latex, salvage_fields
+from dedup import NearDuplicateIndex, analysis, apply_duplicates, resolve_near_duplicates
+from tiered import TRIAGE_ONLY_TEXT, Stopwatch, TieredReport, expand_triage, matches_keywords, parse_keywords, triage_score
 
 # Disable proxy for accessing domestic API (Alibaba Bailian)
 os.environ.pop('HTTP_PROXY', None)
@@ -34,95 +45,302 @@ elif os.path.exists('.env'):
 
 template = open("template.txt", "r", encoding='utf-8').read()
 system = open("system.txt", "r", encoding='utf-8').read()
+triage_template = open("triage_template.txt", "r", encoding='utf-8').read()
+
+# 每种输出结构使用的 User Prompt
+TEMPLATES = {Structure: template, TriageStructure: triage_template}
+
+# 每次调用预计的输出 token 数（11 个中文字段），用于限速器的 TPM 估算
+COMPLETION_TOKENS_ESTIMATE = int(os.environ.get("COMPLETION_TOKENS_ESTIMATE", "1000"))
+PROMPT_OVERHEAD_TOKENS = {schema: estimate_tokens(system + text) for schema, text in TEMPLATES.items()}
+
+# Default structure with meaningful fallback values (平铺结构)
+DEFAULT_AI_FIELDS = {
+    "core_problem": "问题提取失败",
+    "key_insight": "视角分析失败",
+    "method": "方法提取失败",
+    "method_formula": "方法公式化失败",
+    "core_finding": "发现提取失败",
+    "mechanism_insight": "机制洞察分析失败",
+    "action_value": "行动启发评估失败",
+    "transferability": "可迁移性分析失败",
+    "value_score": "价值评分失败",
+    "summary_core": "核心总结生成失败",
+    "summary_layman": "大白话总结生成失败"
+}
+
+# 整个任务异常时使用的占位字段
+FAILED_AI_FIELDS = {field: "处理失败" for field in DEFAULT_AI_FIELDS}
+
+# 每完成一篇调用一次：on_result(下标, 结果)
+ResultCallback = Callable[[int, Dict], None]
 
 def parse_args():
     """解析命令行参数"""
     parser = argparse.ArgumentParser()
     parser.add_argument("--data", type=str, required=True, help="jsonline data file")
-    parser.add_argument("--max_workers", type=int, default=1, help="Maximum number of parallel workers")
+    parser.add_argument("--max_workers", type=int, default=1,
+                        help="Maximum number of parallel workers (threads, or concurrent requests for the async engine)")
+    parser.add_argument("--engine", choices=["async", "thread"], default="async",
+                        help="async: asyncio + chain.ainvoke; thread: ThreadPoolExecutor + chain.invoke")
+    parser.add_argument("--rpm", type=float, default=float(os.environ.get("RPM_LIMIT", 0)),
+                        help="Requests-per-minute limit (0 = unlimited, env RPM_LIMIT)")
+    parser.add_argument("--tpm", type=float, default=float(os.environ.get("TPM_LIMIT", 0)),
+                        help="Tokens-per-minute limit (0 = unlimited, env TPM_LIMIT)")
+    parser.add_argument("--cache_path", type=str,
+                        default=os.environ.get("LLM_CACHE_PATH", os.path.join("..", ".cache", "llm_responses.sqlite")),
+                        help="Response cache database (env LLM_CACHE_PATH)")
+    parser.add_argument("--cache_max_mb", type=float, default=float(os.environ.get("LLM_CACHE_MAX_MB", 200)),
+                        help="Evict least recently used responses beyond this size (0 = unlimited)")
+    parser.add_argument("--no_cache", action="store_true", help="Do not read or write the response cache")
+    parser.add_argument("--max_retries", type=int, default=int(os.environ.get("LLM_MAX_RETRIES", 3)),
+                        help="Retries for timeouts and server errors (rate limits get two more, parse errors one)")
+    parser.add_argument("--timeout", type=float, default=float(os.environ.get("LLM_TIMEOUT", 120)),
+                        help="Per-request timeout in seconds (env LLM_TIMEOUT)")
+    parser.add_argument("--breaker_threshold", type=int, default=5,
+                        help="Pause all calls after this many consecutive timeouts/server errors (0 = never)")
+    parser.add_argument("--breaker_cooldown", type=float, default=30.0,
+                        help="Seconds to pause before probing the provider again")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Adapt in-flight requests with AIMD between --min_workers and --max_workers")
+    parser.add_argument("--min_workers", type=int, default=1, help="Lower bound for --adaptive")
+    parser.add_argument("--concurrency_trace", type=str, default=None,
+                        help="Write the adaptive concurrency trace to this CSV file")
+    parser.add_argument("--output_mode", choices=["function_calling", "json_schema"],
+                        default=os.environ.get("STRUCTURED_OUTPUT_MODE", "function_calling"),
+                        help="function_calling: tool call arguments; json_schema: strict JSON-schema response format "
+                             "(needs provider support, env STRUCTURED_OUTPUT_MODE)")
+    parser.add_argument("--tiered", action="store_true",
+                        help="Triage every paper with a short schema first; run the full analysis only above the threshold")
+    parser.add_argument("--triage_threshold", type=int, default=int(os.environ.get("TRIAGE_THRESHOLD", 7)),
+                        help="Triage score (1-10) that qualifies a paper for the full analysis (env TRIAGE_THRESHOLD)")
+    parser.add_argument("--deep_keywords", type=str, default=os.environ.get("DEEP_KEYWORDS", ""),
+                        help="Comma-separated keywords; matching papers skip triage and always get the full analysis")
+    parser.add_argument("--dedup", choices=["reuse", "flag", "off"], default=os.environ.get("DEDUP_MODE", "flag"),
+                        help="Near-duplicate papers (replacement versions, resubmissions): only flag them (default), "
+                             "reuse an earlier analysis instead of calling the LLM, or disable the check (env DEDUP_MODE)")
+    parser.add_argument("--dedup_threshold", type=float, default=float(os.environ.get("DEDUP_THRESHOLD", 0.85)),
+                        help="Estimated Jaccard similarity of title + abstract shingles that counts as a near duplicate")
+    parser.add_argument("--dedup_path", type=str,
+                        default=os.environ.get("DEDUP_INDEX_PATH", os.path.join("..", ".cache", "near_duplicates.sqlite")),
+                        help="MinHash LSH index shared across days (env DEDUP_INDEX_PATH)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Keep the journal of an interrupted run and skip papers it already completed")
     return parser.parse_args()
 
-def process_single_item(chain, item: Dict, language: str) -> Dict:
-    """处理单个数据项"""
-    # Default structure with meaningful fallback values (平铺结构)
-    default_ai_fields = {
-        "core_problem": "问题提取失败",
-        "key_insight": "视角分析失败",
-        "method": "方法提取失败",
-        "method_formula": "方法公式化失败",
-        "core_finding": "发现提取失败",
-        "mechanism_insight": "机制洞察分析失败",
-        "action_value": "行动启发评估失败",
-        "transferability": "可迁移性分析失败",
-        "value_score": "价值评分失败",
-        "summary_core": "核心总结生成失败",
-        "summary_layman": "大白话总结生成失败"
+def build_chain(model_name: str, timeout: Optional[float] = None, max_retries: int = 2,
+                output_mode: str = "function_calling", schema: Type[BaseModel] = Structure):
+    """
+    构建 Prompt + 结构化输出的调用链
+
+    output_mode 为 json_schema 时使用严格的 JSON Schema 输出格式，由服务端保证输出可解析
+    （需要服务商支持 response_format=json_schema）。
+    """
+    # include_raw=True：同时拿到原始消息，用其中的 usage 修正限速器的 token 估计
+    # 使用 Resilience 时 max_retries=0，由它按错误类别统一重试
+    llm = ChatOpenAI(model=model_name, timeout=timeout, max_retries=max_retries).with_structured_output(
+        schema,
+        method=output_mode,
+        include_raw=True,
+        **({"strict": True} if output_mode == "json_schema" else {})
+    )
+    print('Connect to:', model_name, file=sys.stderr)
+
+    prompt_template = ChatPromptTemplate.from_messages([
+        SystemMessagePromptTemplate.from_template(system),
+        HumanMessagePromptTemplate.from_template(template=TEMPLATES[schema])
+    ])
+
+    return prompt_template | llm
+
+def _chain_input(item: Dict, language: str) -> Dict:
+    return {
+        "language": language,
+        "content": item['summary']
     }
-    
-    try:
-        response: Structure = chain.invoke({
-            "language": language,
-            "content": item['summary']
-        })
-        item['AI'] = response.model_dump()
-    except langchain_core.exceptions.OutputParserException as e:
-        # 尝试从错误信息中提取 JSON 字符串并修复
-        error_msg = str(e)
-        partial_data = {}
-        
-        if "Function Structure arguments:" in error_msg:
-            try:
-                # 提取 JSON 字符串
-                json_str = error_msg.split("Function Structure arguments:", 1)[1].strip().split('are not valid JSON')[0].strip()
-                # 预处理 LaTeX 数学符号 - 使用四个反斜杠来确保正确转义
-                json_str = json_str.replace('\\', '\\\\')
-                # 尝试解析修复后的 JSON
-                partial_data = json.loads(json_str)
-            except Exception as json_e:
-                print(f"Failed to parse JSON for {item.get('id', 'unknown')}: {json_e}", file=sys.stderr)
-        
-        # Merge partial data with defaults to ensure all fields exist
-        item['AI'] = {**default_ai_fields, **partial_data}
-        print(f"Using partial AI data for {item.get('id', 'unknown')}: {list(partial_data.keys())}", file=sys.stderr)
-    except Exception as e:
+
+def _default_fields(schema: Type[BaseModel]) -> Dict:
+    """输出结构各字段的回退值"""
+    return {field: DEFAULT_AI_FIELDS.get(field, "处理失败") for field in schema.model_fields}
+
+def _estimate_item_tokens(item: Dict, schema: Type[BaseModel] = Structure) -> int:
+    """一次调用的估计 token 数（prompt + completion，completion 按字段数折算）"""
+    completion = COMPLETION_TOKENS_ESTIMATE * len(schema.model_fields) // len(Structure.model_fields)
+    return PROMPT_OVERHEAD_TOKENS[schema] + estimate_tokens(item['summary']) + completion
+
+def _used_tokens(result: Dict, default: int) -> int:
+    """链输出中原始消息记录的实际 token 数，没有时返回 default"""
+    usage = getattr(result.get("raw"), "usage_metadata", None) or {}
+    return usage.get("total_tokens") or default
+
+def _parsed(result: Dict, schema: Type[BaseModel] = Structure) -> BaseModel:
+    """
+    取出结构化结果
+
+    解析失败（或模型没有调用工具）时先用 repair 容错解析原始输出，全部字段都能恢复就
+    当作成功；否则抛出带原始输出（llm_output）的 OutputParserException，交给重试和
+    _fallback_fields 处理。
+    """
+    error = result.get("parsing_error")
+    if error is None and result.get("parsed") is not None:
+        return result["parsed"]
+    payload = raw_payload(result.get("raw"))
+    fields = salvage_fields(payload, schema.model_fields)
+    if len(fields) == len(schema.model_fields):
+        return schema(**fields)
+    raise langchain_core.exceptions.OutputParserException(
+        str(error or "No structured output in the response"), llm_output=payload
+    )
+
+def _ai_fields(response: BaseModel) -> Dict:
+    """成功结果的 AI 字段（修正被 JSON 解析吃掉的 LaTeX 反斜杠）"""
+    return {
+        field: restore_latex(value) if isinstance(value, str) else value
+        for field, value in response.model_dump().items()
+    }
+
+def _fallback_fields(item: Dict, e: Exception, defaults: Dict = DEFAULT_AI_FIELDS) -> Dict:
+    """调用失败时的 AI 字段：解析失败时尽量保留部分结果，其余错误使用默认值"""
+    if not isinstance(e, langchain_core.exceptions.OutputParserException):
         # Catch any other exceptions and provide default values
         print(f"Unexpected error for {item.get('id', 'unknown')}: {e}", file=sys.stderr)
-        item['AI'] = default_ai_fields
-    
-    # Final validation to ensure all required fields exist
-    for field in default_ai_fields.keys():
-        if field not in item['AI']:
-            item['AI'][field] = default_ai_fields[field]
+        return dict(defaults)
+
+    # 从原始输出中容错恢复尽可能多的字段
+    partial_data = salvage_fields(e.llm_output, defaults)
+
+    # Merge partial data with defaults to ensure all fields exist
+    print(f"Using partial AI data for {item.get('id', 'unknown')}: {list(partial_data.keys())}", file=sys.stderr)
+    return {**defaults, **partial_data}
 
+def _fill_missing_fields(item: Dict, defaults: Dict = DEFAULT_AI_FIELDS) -> Dict:
+    """Final validation to ensure all required fields exist"""
+    for field in defaults.keys():
+        if field not in item['AI']:
+            item['AI'][field] = defaults[field]
     return item
 
-def process_all_items(data: List[Dict], model_name: str, language: str, max_workers: int) -> List[Dict]:
-    """并行处理所有数据项"""
-    llm = ChatOpenAI(model=model_name).with_structured_output(Structure, method="function_calling")
-    print('Connect to:', model_name, file=sys.stderr)
-    
-    prompt_template = ChatPromptTemplate.from_messages([
-        SystemMessagePromptTemplate.from_template(system),
-        HumanMessagePromptTemplate.from_template(template=template)
-    ])
+def is_completed(item: Dict) -> bool:
+    """
+    AI 字段是否都是完整分析的真实结果（不含失败占位值，也不是只做了初筛），
+    --resume 只跳过这样的论文，只做了初筛的论文会重新处理（不加 --tiered 时升级为完整分析）
+    """
+    ai = item.get('AI') or {}
+    return all(
+        ai.get(field) not in (None, DEFAULT_AI_FIELDS[field], FAILED_AI_FIELDS[field], TRIAGE_ONLY_TEXT)
+        for field in DEFAULT_AI_FIELDS
+    )
+
+def process_single_item(chain, item: Dict, language: str, limiter: Optional[RateLimiter] = None,
+                        cache: Optional[ResponseCache] = None, resilience: Optional[Resilience] = None,
+                        controller: Optional[AIMDController] = None,
+                        schema: Type[BaseModel] = Structure) -> Dict:
+    """
+    处理单个数据项
+
+    传入 resilience 时按错误类别重试，重试用尽后才使用回退字段；
+    传入 controller 时每次请求占用一个自适应并发名额（限速等待不占名额）。
+    schema 为 chain 的输出结构（分级模式的初筛使用 TriageStructure）。
+    """
+    defaults = _default_fields(schema)
+    if cache is not None:
+        cached = cache.get(item)
+        if cached is not None:
+            item['AI'] = cached
+            return _fill_missing_fields(item, defaults)
+
+    def invoke() -> BaseModel:
+        # 每次尝试（包括重试）都占用一次限速额度
+        estimated = _estimate_item_tokens(item, schema)
+        if limiter is not None:
+            limiter.acquire(estimated)
+        with controller.slot() if controller is not None else nullcontext():
+            result = chain.invoke(_chain_input(item, language))
+        if limiter is not None:
+            limiter.reconcile(estimated, _used_tokens(result, estimated))
+        return _parsed(result, schema)
+
+    try:
+        response = resilience.call(invoke) if resilience is not None else invoke()
+        item['AI'] = _ai_fields(response)
+        if cache is not None:
+            cache.put(item, item['AI'])
+    except Exception as e:
+        item['AI'] = _fallback_fields(item, e, defaults)
+
+    return _fill_missing_fields(item, defaults)
+
+async def process_single_item_async(chain, item: Dict, language: str, limiter: Optional[RateLimiter] = None,
+                                    cache: Optional[ResponseCache] = None,
+                                    resilience: Optional[Resilience] = None,
+                                    controller: Optional[AIMDController] = None,
+                                    schema: Type[BaseModel] = Structure) -> Dict:
+    """处理单个数据项（异步版本，回退逻辑与 process_single_item 相同）"""
+    defaults = _default_fields(schema)
+    if cache is not None:
+        cached = cache.get(item)
+        if cached is not None:
+            item['AI'] = cached
+            return _fill_missing_fields(item, defaults)
+
+    async def invoke() -> BaseModel:
+        estimated = _estimate_item_tokens(item, schema)
+        if limiter is not None:
+            await limiter.acquire_async(estimated)
+        async with controller.slot_async() if controller is not None else nullcontext():
+            result = await chain.ainvoke(_chain_input(item, language))
+        if limiter is not None:
+            limiter.reconcile(estimated, _used_tokens(result, estimated))
+        return _parsed(result, schema)
+
+    try:
+        response = await resilience.call_async(invoke) if resilience is not None else await invoke()
+        item['AI'] = _ai_fields(response)
+        if cache is not None:
+            cache.put(item, item['AI'])
+    except Exception as e:
+        item['AI'] = _fallback_fields(item, e, defaults)
+
+    return _fill_missing_fields(item, defaults)
+
+def _progress_status(limiter: Optional[RateLimiter], controller: Optional[AIMDController]) -> str:
+    """进度条后缀：限速器用量和自适应并发数"""
+    parts = []
+    if limiter is not None and limiter.enabled:
+        parts.append(limiter.format_utilisation())
+    if controller is not None:
+        parts.append(controller.format_status())
+    return " ".join(parts)
+
+def process_all_items(data: List[Dict], model_name: str, language: str, max_workers: int,
+                      limiter: Optional[RateLimiter] = None, cache: Optional[ResponseCache] = None,
+                      on_result: Optional[ResultCallback] = None,
+                      resilience: Optional[Resilience] = None, timeout: Optional[float] = None,
+                      controller: Optional[AIMDController] = None,
+                      output_mode: str = "function_calling", schema: Type[BaseModel] = Structure) -> List[Dict]:
+    """并行处理所有数据项；on_result 在主线程中按完成顺序逐条调用"""
+    chain = build_chain(model_name, timeout, max_retries=0 if resilience is not None else 2,
+                        output_mode=output_mode, schema=schema)
 
-    chain = prompt_template | llm
-    
     # 使用线程池并行处理
     processed_data = [None] * len(data)  # 预分配结果列表
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # 提交所有任务
         future_to_idx = {
-            executor.submit(process_single_item, chain, item, language): idx
+            executor.submit(
+                process_single_item, chain, item, language, limiter, cache, resilience, controller, schema
+            ): idx
             for idx, item in enumerate(data)
         }
         
         # 使用tqdm显示进度
-        for future in tqdm(
+        progress = tqdm(
             as_completed(future_to_idx),
             total=len(data),
             desc="Processing items"
-        ):
+        )
+        for future in progress:
+            progress.set_postfix_str(_progress_status(limiter, controller), refresh=False)
             idx = future_to_idx[future]
             try:
                 result = future.result()
@@ -131,38 +349,136 @@ def process_all_items(data: List[Dict], model_name: str, language: str, max_work
                 print(f"Item at index {idx} generated an exception: {e}", file=sys.stderr)
                 # Add default AI fields to ensure consistency (平铺结构)
                 processed_data[idx] = data[idx]
-                processed_data[idx]['AI'] = {
-                    "core_problem": "处理失败",
-                    "key_insight": "处理失败",
-                    "method": "处理失败",
-                    "method_formula": "处理失败",
-                    "core_finding": "处理失败",
-                    "mechanism_insight": "处理失败",
-                    "action_value": "处理失败",
-                    "transferability": "处理失败",
-                    "value_score": "处理失败",
-                    "summary_core": "处理失败",
-                    "summary_layman": "处理失败"
-                }
+                processed_data[idx]['AI'] = {field: "处理失败" for field in schema.model_fields}
+            if on_result is not None:
+                on_result(idx, processed_data[idx])
     
     return processed_data
 
+async def process_all_items_async(data: List[Dict], model_name: str, language: str, concurrency: int,
+                                  limiter: Optional[RateLimiter] = None,
+                                  cache: Optional[ResponseCache] = None,
+                                  on_result: Optional[ResultCallback] = None,
+                                  resilience: Optional[Resilience] = None,
+                                  timeout: Optional[float] = None,
+                                  controller: Optional[AIMDController] = None,
+                                  output_mode: str = "function_calling",
+                                  schema: Type[BaseModel] = Structure) -> List[Dict]:
+    """
+    异步处理所有数据项
+
+    固定数量（concurrency）的协程从同一个下标迭代器中取任务，同时在途的请求数
+    不超过 concurrency（传入 controller 时再由它自适应限制）；不为每篇论文预先创建任务，也不占用额外线程。
+    结果顺序与输入一致，回退逻辑与线程版本相同；on_result 在事件循环中按完成顺序调用。
+    """
+    chain = build_chain(model_name, timeout, max_retries=0 if resilience is not None else 2,
+                        output_mode=output_mode, schema=schema)
+
+    processed_data = [None] * len(data)  # 预分配结果列表
+    pending = iter(range(len(data)))
+    progress = tqdm(total=len(data), desc="Processing items")
+
+    async def worker():
+        # 单线程事件循环中共享迭代器是安全的
+        for idx in pending:
+            try:
+                processed_data[idx] = await process_single_item_async(
+                    chain, data[idx], language, limiter, cache, resilience, controller, schema
+                )
+            except Exception as e:
+                print(f"Item at index {idx} generated an exception: {e}", file=sys.stderr)
+                processed_data[idx] = data[idx]
+                processed_data[idx]['AI'] = {field: "处理失败" for field in schema.model_fields}
+            if on_result is not None:
+                on_result(idx, processed_data[idx])
+            progress.set_postfix_str(_progress_status(limiter, controller), refresh=False)
+            progress.update(1)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(data))))))
+    progress.close()
+
+    return processed_data
+
+def process_tiered(data: List[Dict], run, limiter: RateLimiter, threshold: int, keywords: List[str],
+                   on_final: Callable[[Dict], None]):
+    """
+    分级处理：命中关键词的论文直接完整分析，其余先用 TriageStructure 初筛，
+    分数达到 threshold 或初筛失败的再做完整分析
+
+    Args:
+        data: 待处理的论文
+        run: run(论文列表, 输出结构, on_result) -> 结果列表
+        limiter: 用于统计各阶段 token 用量的限速器
+        threshold: 进入完整分析的初筛分数
+        keywords: 直接进入完整分析的关键词
+        on_final: 每篇论文得到最终结果时调用（写入日志）
+
+    Returns:
+        (按输入顺序的结果, TieredReport)
+    """
+    report = TieredReport(
+        papers=len(data),
+        estimated_deep_tokens_per_paper=(
+            sum(_estimate_item_tokens(item) for item in data) / len(data) if data else 0.0
+        ),
+    )
+    by_keyword = [item for item in data if keywords and matches_keywords(item, keywords)]
+    keyword_ids = {item['id'] for item in by_keyword}
+    to_triage = [item for item in data if item['id'] not in keyword_ids]
+
+    # 第一阶段：初筛
+    with Stopwatch(limiter) as watch:
+        triaged = run(to_triage, TriageStructure, None) if to_triage else []
+    report.triaged = len(to_triage)
+    report.triage_seconds, report.triage_tokens = watch.seconds, watch.tokens
+
+    deep = list(by_keyword)
+    scores = {}
+    for item in triaged:
+        score = triage_score(item['AI'])
+        if score is None:
+            report.failed_deep += 1
+            deep.append(item)
+        elif score >= threshold:
+            report.score_deep += 1
+            scores[item['id']] = score
+            deep.append(item)
+        else:
+            on_final(expand_triage(item, DEFAULT_AI_FIELDS))
+    report.keyword_deep = len(by_keyword)
+
+    # 第二阶段：完整分析
+    def on_deep(idx, item):
+        item['AI']['analysis_tier'] = 'deep'
+        if item['id'] in scores:
+            item['AI']['triage_score'] = scores[item['id']]
+        on_final(item)
+
+    with Stopwatch(limiter) as watch:
+        if deep:
+            run(deep, Structure, on_deep)
+    report.deep_seconds, report.deep_tokens = watch.seconds, watch.tokens
+
+    # 初筛和完整分析都是原地修改 item，按输入顺序返回即可
+    return data, report
+
 def main():
     args = parse_args()
     model_name = os.environ.get("MODEL_NAME", 'deepseek-chat')
     language = os.environ.get("LANGUAGE", 'Chinese')
 
-    # 检查并删除目标文件
     target_file = args.data.replace('.jsonl', f'_AI_enhanced_{language}.jsonl')
-    if os.path.exists(target_file):
-        os.remove(target_file)
-        print(f'Removed existing file: {target_file}', file=sys.stderr)
+    # 处理过程中逐条追加的结果日志，最终文件写出后删除
+    journal_path = target_file + '.journal'
+    if not args.resume:
+        # 检查并删除目标文件
+        for path in (target_file, journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+                print(f'Removed existing file: {path}', file=sys.stderr)
 
     # 读取数据
-    data = []
-    with open(args.data, "r") as f:
-        for line in f:
-            data.append(json.loads(line))
+    data = load_jsonl(args.data)
 
     # 去重
     seen_ids = set()
@@ -174,20 +490,121 @@ def main():
 
     data = unique_data
     print('Open:', args.data, file=sys.stderr)
-    
-    # 并行处理所有数据
-    processed_data = process_all_items(
-        data,
-        model_name,
-        language,
-        args.max_workers
+
+    # --resume：已有输出文件和日志中完整成功的论文不再处理（日志中较新的记录优先）
+    completed = {}
+    if args.resume:
+        for path in (target_file, journal_path):
+            for item in read_jsonl(path):
+                if is_completed(item):
+                    completed[item['id']] = item
+        completed = {item['id']: completed[item['id']] for item in data if item['id'] in completed}
+        print(f'Resume: {len(completed)}/{len(data)} items already completed', file=sys.stderr)
+    pending_data = [item for item in data if item['id'] not in completed]
+
+    # 近似重复（替换版本、撤稿重投、会议版与 arXiv 版）：复用已有分析结果或只做标记
+    dedup = None
+    reused, duplicates = [], {}
+    dedup_fingerprint = '|'.join(
+        (model_name, language, prompt_fingerprint(system, template, Structure.model_json_schema()))
     )
+    if args.dedup != 'off':
+        dedup = NearDuplicateIndex(args.dedup_path, threshold=args.dedup_threshold)
+        pending_data, reused, duplicates = resolve_near_duplicates(
+            pending_data, dedup, dedup_fingerprint, reuse=args.dedup == 'reuse'
+        )
+    
+    # 按 RPM / TPM 上限限速（两种引擎共用）
+    limiter = RateLimiter(rpm=args.rpm, tpm=args.tpm)
+
+    # 按错误类别重试，服务连续故障时暂停所有调用
+    policy = RetryPolicy()
+    for kind in ("timeout", "server"):
+        policy.max_retries[kind] = args.max_retries
+    policy.max_retries["rate_limit"] = args.max_retries + 2
+    resilience = Resilience(policy, CircuitBreaker(args.breaker_threshold, args.breaker_cooldown))
+
+    # --adaptive：--max_workers 作为并发上限，实际在途请求数按 AIMD 调整
+    controller = AIMDController(args.min_workers, args.max_workers) if args.adaptive else None
+
+    caches = []
+    # 分级模式会运行两轮，异步引擎的两轮共用一个事件循环（langchain-openai 会复用异步 HTTP 客户端）
+    loop = asyncio.new_event_loop() if args.engine == "async" else None
+
+    def run(items: List[Dict], schema: Type[BaseModel], on_result: Optional[ResultCallback]) -> List[Dict]:
+        """用选定的引擎处理一批论文"""
+        # 响应缓存：同一篇论文、同样的模型/语言/Prompt 只调用一次 API
+        cache = None
+        if not args.no_cache:
+            cache = ResponseCache(
+                args.cache_path,
+                model=model_name,
+                language=language,
+                fingerprint=prompt_fingerprint(system, TEMPLATES[schema], schema.model_json_schema()),
+                max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            )
+            caches.append(cache)
+        options = dict(
+            on_result=on_result,
+            resilience=resilience,
+            timeout=args.timeout,
+            controller=controller,
+            output_mode=args.output_mode,
+            schema=schema
+        )
+        if loop is not None:
+            return loop.run_until_complete(process_all_items_async(
+                items, model_name, language, args.max_workers, limiter, cache, **options
+            ))
+        return process_all_items(items, model_name, language, args.max_workers, limiter, cache, **options)
+
+    journal = Journal(journal_path)
+    for item in reused:
+        journal.append(item)
+
+    # 并行处理所有数据，每完成一篇就写入日志
+    if args.tiered:
+        processed_data, report = process_tiered(
+            pending_data, run, limiter, args.triage_threshold, parse_keywords(args.deep_keywords), journal.append
+        )
+    else:
+        processed_data = run(pending_data, Structure, lambda idx, item: journal.append(item))
+    journal.close()
+    if loop is not None:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+    if limiter.enabled:
+        print(limiter.summary(), file=sys.stderr)
+    print(resilience.summary(), file=sys.stderr)
+    if controller is not None:
+        print(controller.summary(), file=sys.stderr)
+        if args.concurrency_trace:
+            rows = controller.export_trace(args.concurrency_trace)
+            print(f'Wrote concurrency trace ({rows} rows): {args.concurrency_trace}', file=sys.stderr)
+    for cache in caches:
+        cache.close()
+        print(cache.summary(), file=sys.stderr)
+    if args.tiered:
+        print(report.format(), file=sys.stderr)
     
-    # 保存结果
-    with open(target_file, "w") as f:
-        for item in processed_data:
-            if item is not None:
-                f.write(json.dumps(item) + "\n")
+    # 按输入顺序原子写出最终文件，成功后才删除日志
+    results = {item['id']: item for item in processed_data if item is not None}
+    results.update((item['id'], item) for item in reused)
+    results.update(completed)
+    if dedup is not None:
+        counts = apply_duplicates(results, data, duplicates)
+        # 完整分析成功的结果加入索引，供以后的近似重复复用（只做了初筛的结果不加入）
+        for item in data:
+            result = results.get(item['id'])
+            if result is not None and is_completed(result) and result['AI'].get('analysis_tier') != 'triage':
+                dedup.add(item, ai=analysis(result['AI']), fingerprint=dedup_fingerprint)
+        print(dedup.summary(), file=sys.stderr)
+        dedup.close()
+        print(f"Near duplicates: {counts['reused']} reused, {counts['copied']} copied within the batch, "
+              f"{counts['flagged']} flagged", file=sys.stderr)
+    write_jsonl_atomic(target_file, (results[item['id']] for item in data if item['id'] in results))
+    journal.discard()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,92 @@
+"""
+处理结果的追加日志与原子写入
+
+处理过程中每完成一篇就追加一行到 ``<输出文件>.journal``，崩溃后可以用 --resume 跳过
+已完成的论文；全部完成后按输入顺序写出最终文件（先写临时文件再 os.replace），
+然后删除日志。
+
+JSONL 的编解码与 src 共用 src/serialization.py（安装了 orjson 时使用 orjson）。
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List
+
+from shared import dumps, iter_records, loads
+
+
+def load_jsonl(path: str) -> List[Dict]:
+    """读取输入的 JSONL 文件（不跳过任何错误）"""
+    return list(iter_records(path, "json"))
+
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    """读取 JSONL 文件；文件不存在时为空，末尾被截断的行会被跳过"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield loads(line)
+            except ValueError:
+                # 崩溃时写了一半的最后一行
+                continue
+
+
+def write_jsonl_atomic(path: str, items: Iterable[Dict]) -> int:
+    """写入 JSONL：先写同目录的临时文件并 fsync，再原子替换目标文件，返回写入的行数"""
+    tmp_path = path + ".tmp"
+    count = 0
+    with open(tmp_path, "wb") as f:
+        for item in items:
+            f.write(dumps(item) + b"\n")
+            count += 1
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+class Journal:
+    """
+    追加写入的结果日志（线程安全）
+
+    每条记录单独一次 write 并立即 flush；每 fsync_every 条 fsync 一次。
+
+    Args:
+        path: 日志文件路径
+        fsync_every: fsync 间隔（条）
+    """
+
+    def __init__(self, path: str, fsync_every: int = 50):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.written = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+
+    def append(self, item: Dict) -> None:
+        line = dumps(item) + b"\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.written += 1
+            if self.written % self.fsync_every == 0:
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def discard(self) -> None:
+        """关闭并删除日志（最终文件写出之后调用）"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,192 @@
+"""
+enhance.py 的压测工具
+
+用给定的数据文件和若干并发数依次运行 process_all_items（或异步版本），报告吞吐量、
+请求延迟的 p50/p95/p99、回退率（结果含失败占位值的论文比例）以及重试情况。
+加 --mock 时在进程内启动 mock_server.py，不消耗真实额度。
+
+请求延迟来自 AIMDController 的轨迹：固定并发时把上下限都设成同一个值，它只负责计时。
+进程内的模拟服务与客户端共用 GIL，测几十以上的并发时请单独运行 mock_server.py，
+再通过 OPENAI_BASE_URL 指向它（不加 --mock）。
+
+用法（在 ai 目录下运行）:
+    python loadtest.py --data ../data/2025-11-08.jsonl --mock --workers 1,4,16,64 --latency lognormal:0.8,0.4
+    python loadtest.py --data ../data/2025-11-08.jsonl --mock --rate_429 0.05 --malformed 0.05 --workers 16 --adaptive
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from journal import load_jsonl
+from mock_server import add_options_arguments, options_from_args, start_in_thread
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load-test the enhancement stage")
+    parser.add_argument("--data", type=str, required=True, help="jsonline data file")
+    parser.add_argument("--limit", type=int, default=0, help="Only use the first N papers (0 = all)")
+    parser.add_argument("--workers", type=str, default="1,4,16", help="Comma-separated worker counts to test")
+    parser.add_argument("--engine", choices=["async", "thread"], default="async")
+    parser.add_argument("--adaptive", action="store_true", help="Use AIMD concurrency with --workers as the ceiling")
+    parser.add_argument("--no_retry", action="store_true", help="Disable error-classified retries")
+    parser.add_argument("--output_mode", choices=["function_calling", "json_schema"], default="function_calling")
+    parser.add_argument("--mock", action="store_true", help="Start the bundled mock server in-process")
+    parser.add_argument("--json", type=str, default=None, help="Also write the results to this JSON file")
+    add_options_arguments(parser)
+    return parser.parse_args()
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """最近秩百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def _setup(workers: int, args):
+    from concurrency import AIMDController
+    from resilience import Resilience
+
+    if args.adaptive:
+        controller = AIMDController(1, workers)
+    else:
+        controller = AIMDController(workers, workers, initial=workers)
+    return controller, None if args.no_retry else Resilience()
+
+
+def _stats(results: List[Dict], workers: int, controller, elapsed: float) -> Dict:
+    from enhance import is_completed
+
+    latencies = [latency for _, _, _, _, latency in controller.trace]
+    outcomes = [outcome for _, _, _, outcome, _ in controller.trace]
+    fallbacks = sum(1 for item in results if item is None or not is_completed(item))
+    return {
+        "workers": workers,
+        "items": len(results),
+        "seconds": elapsed,
+        "throughput": len(results) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "requests": len(outcomes),
+        "rate_limited": outcomes.count("rate_limit"),
+        "errors": sum(1 for o in outcomes if o not in ("ok", "rate_limit")),
+        "fallback_rate": fallbacks / len(results) if results else 0.0,
+        "final_concurrency": int(controller.limit),
+    }
+
+
+def run_thread(data: List[Dict], workers: int, args, model_name: str, language: str) -> Dict:
+    """用线程引擎和一个并发数跑一遍，返回统计"""
+    from enhance import process_all_items
+
+    controller, resilience = _setup(workers, args)
+    start = time.perf_counter()
+    results = process_all_items(
+        [dict(item) for item in data], model_name, language, workers,
+        resilience=resilience, controller=controller, output_mode=args.output_mode
+    )
+    return _stats(results, workers, controller, time.perf_counter() - start)
+
+
+async def run_all_async(data: List[Dict], worker_counts: List[int], args, model_name: str, language: str,
+                        server=None) -> List[Dict]:
+    """
+    用异步引擎依次跑各个并发数
+
+    所有轮次共用一个事件循环：langchain-openai 会复用异步 HTTP 客户端，
+    每轮 asyncio.run 一次会让它绑定到已关闭的事件循环上。
+    """
+    from enhance import process_all_items_async
+
+    rows = []
+    for workers in worker_counts:
+        controller, resilience = _setup(workers, args)
+        start = time.perf_counter()
+        results = await process_all_items_async(
+            [dict(item) for item in data], model_name, language, workers,
+            resilience=resilience, controller=controller, output_mode=args.output_mode
+        )
+        rows.append(_stats(results, workers, controller, time.perf_counter() - start))
+        _print_server_stats(server)
+    return rows
+
+
+def _print_server_stats(server) -> None:
+    if server is not None:
+        print(f"Mock server counts (cumulative): {server.state.stats()}", file=sys.stderr)
+
+
+def format_table(rows: List[Dict]) -> str:
+    def ms(value):
+        return f"{value * 1000:8.0f}" if value is not None else "     n/a"
+
+    lines = [
+        f"{'workers':>7} {'items':>6} {'secs':>7} {'items/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'reqs':>6} {'429':>5} {'errors':>6} {'fallback':>8} {'conc':>5}"
+    ]
+    for r in rows:
+        lines.append(
+            f"{r['workers']:>7} {r['items']:>6} {r['seconds']:>7.1f} {r['throughput']:>8.2f} "
+            f"{ms(r['p50'])} {ms(r['p95'])} {ms(r['p99'])} {r['requests']:>6} {r['rate_limited']:>5} "
+            f"{r['errors']:>6} {r['fallback_rate']:>8.1%} {r['final_concurrency']:>5}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    args = parse_args()
+
+    server = None
+    if args.mock:
+        server, base_url = start_in_thread(options_from_args(args))
+        os.environ["OPENAI_BASE_URL"] = base_url
+        os.environ.setdefault("OPENAI_API_KEY", "mock")
+        os.environ.setdefault("MODEL_NAME", "mock")
+        print(f"Mock server: {base_url}", file=sys.stderr)
+    else:
+        print(f"Using {os.environ.get('OPENAI_BASE_URL', 'the default OpenAI endpoint')} "
+              f"(this consumes real quota)", file=sys.stderr)
+
+    # enhance 在导入时加载 .env，mock 的环境变量要在此之前设置
+    import enhance  # noqa: F401
+
+    model_name = os.environ.get("MODEL_NAME", "deepseek-chat")
+    language = os.environ.get("LANGUAGE", "Chinese")
+
+    data = []
+    seen = set()
+    for item in load_jsonl(args.data):
+        if item["id"] not in seen:
+            seen.add(item["id"])
+            data.append(item)
+    if args.limit:
+        data = data[:args.limit]
+
+    worker_counts = [int(w) for w in args.workers.split(",") if w.strip()]
+    if args.engine == "async":
+        rows = asyncio.run(run_all_async(data, worker_counts, args, model_name, language, server))
+    else:
+        rows = []
+        for workers in worker_counts:
+            rows.append(run_thread(data, workers, args, model_name, language))
+            _print_server_stats(server)
+
+    print(format_table(rows))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+本地 OpenAI 兼容的模拟服务
+
+实现 ``POST /v1/chat/completions`` 中 ChatOpenAI(...).with_structured_output(Structure, ...)
+用到的部分：请求带 tools 时返回对第一个工具的 tool_calls（参数按工具的 JSON Schema
+生成），带 response_format=json_schema 时在 content 中返回 JSON，否则返回普通文本。
+可以配置延迟分布，并按概率注入 429、5xx 和损坏的 JSON，用来在不消耗额度的情况下测试
+并发、限速、重试和输出修复。``GET /stats`` 返回请求计数。
+
+用法:
+    python mock_server.py --port 8765 --latency lognormal:0.8,0.5 --rate_429 0.02 --malformed 0.05
+    # 然后 OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=mock python enhance.py ...
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from shared import estimate_tokens
+
+# 损坏 JSON 的几种形式（与 benchmarks/fixtures/structure_outputs.jsonl 中的类别对应）
+MALFORMED_KINDS = ("truncate", "latex", "quotes")
+
+
+def parse_latency(spec: str):
+    """
+    解析延迟分布，返回一个无参函数，每次调用给出一次延迟（秒）
+
+    支持 ``fixed:0.5``、``uniform:0.2,1.5``、``lognormal:中位数,sigma``、``exp:均值``。
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(values[0]), values[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1.0 / values[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+@dataclass
+class MockOptions:
+    """模拟服务的行为参数（比例均为 0-1 的概率）"""
+
+    latency: str = "fixed:0"
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    malformed: float = 0.0
+    max_in_flight: int = 0      # 同时处理的请求超过该值时返回 429（0 表示不限）
+    field_chars: int = 60       # 每个字段生成的字符数
+
+
+def _sample_value(name: str, schema: Dict, chars: int):
+    kind = schema.get("type", "string")
+    if kind in ("integer", "number"):
+        return random.randint(1, 10)
+    if kind == "boolean":
+        return True
+    if kind == "array":
+        return []
+    if kind == "object":
+        return {}
+    text = f"模拟的 {name} 内容，"
+    return (text * (chars // len(text) + 1))[:chars]
+
+
+def build_arguments(parameters: Dict, chars: int) -> Dict:
+    """按 JSON Schema 的 properties 生成参数"""
+    properties = parameters.get("properties", {})
+    return {name: _sample_value(name, schema, chars) for name, schema in properties.items()}
+
+
+def corrupt(arguments: str, kind: str) -> str:
+    """把合法的参数 JSON 变成一种常见的损坏形式"""
+    if kind == "truncate":
+        return arguments[: max(1, int(len(arguments) * random.uniform(0.3, 0.9)))]
+    if kind == "latex":
+        # 未转义的 LaTeX 命令（\alpha 为非法转义）
+        return arguments.replace("内容", "内容 \\alpha_i = \\sum_j w_{ij}", 1)
+    # 未转义的内部引号
+    return arguments.replace("内容", '"内容"', 1)
+
+
+class MockState:
+    """所有处理线程共享的计数"""
+
+    def __init__(self, options: MockOptions):
+        self.options = options
+        self.sample_latency = parse_latency(options.latency)
+        self.counts = Counter()
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def enter(self) -> int:
+        with self.lock:
+            self.in_flight += 1
+            self.counts["requests"] += 1
+            return self.in_flight
+
+    def leave(self, outcome: str) -> None:
+        with self.lock:
+            self.in_flight -= 1
+            self.counts[outcome] += 1
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return dict(self.counts, in_flight=self.in_flight)
+
+
+def _completion(body: Dict, options: MockOptions, malformed: bool) -> Tuple[Dict, str]:
+    """构造 chat.completion 响应，返回 (响应, 结果类别)"""
+    prompt_text = json.dumps(body.get("messages", []), ensure_ascii=False)
+    message: Dict = {"role": "assistant", "content": None}
+    finish_reason = "stop"
+    outcome = "ok"
+
+    tools = body.get("tools") or []
+    response_format = body.get("response_format") or {}
+    if tools:
+        function = tools[0].get("function", {})
+        arguments = json.dumps(build_arguments(function.get("parameters", {}), options.field_chars),
+                               ensure_ascii=False)
+        if malformed:
+            arguments = corrupt(arguments, random.choice(MALFORMED_KINDS))
+            outcome = "malformed"
+        message["tool_calls"] = [{
+            "id": f"call_{random.getrandbits(48):012x}",
+            "type": "function",
+            "function": {"name": function.get("name", "tool"), "arguments": arguments},
+        }]
+        finish_reason = "tool_calls"
+        completion_text = arguments
+    elif response_format.get("type") == "json_schema":
+        schema = response_format.get("json_schema", {}).get("schema", {})
+        content = json.dumps(build_arguments(schema, options.field_chars), ensure_ascii=False)
+        if malformed:
+            content = corrupt(content, random.choice(MALFORMED_KINDS))
+            outcome = "malformed"
+        message["content"] = content
+        completion_text = content
+    else:
+        message["content"] = "模拟回复"
+        completion_text = message["content"]
+
+    prompt_tokens = estimate_tokens(prompt_text)
+    completion_tokens = estimate_tokens(completion_text)
+    return {
+        "id": f"chatcmpl-mock-{random.getrandbits(48):012x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }, outcome
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: MockState = None  # 由 make_server 设置
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: Dict, headers: Optional[Dict] = None) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str, kind: str, headers: Optional[Dict] = None) -> None:
+        self._send(status, {"error": {"message": message, "type": kind, "code": status}}, headers)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send(200, self.state.stats())
+        elif self.path.rstrip("/").endswith("/models"):
+            self._send(200, {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]})
+        else:
+            self._error(404, "not found", "invalid_request_error")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._error(404, "not found", "invalid_request_error")
+            return
+        try:
+            body = json.loads(raw)
+        except json.JSONDecodeError:
+            self._error(400, "invalid JSON body", "invalid_request_error")
+            return
+
+        state = self.state
+        options = state.options
+        in_flight = state.enter()
+        outcome = "ok"
+        try:
+            if options.max_in_flight and in_flight > options.max_in_flight:
+                outcome = "rate_limited"
+                self._error(429, "Too many concurrent requests", "rate_limit_error", {"retry-after": "1"})
+                return
+            roll = random.random()
+            if roll < options.rate_429:
+                outcome = "rate_limited"
+                self._error(429, "Rate limit reached", "rate_limit_error", {"retry-after": "1"})
+                return
+            time.sleep(max(0.0, state.sample_latency()))
+            if roll < options.rate_429 + options.rate_5xx:
+                outcome = "server_error"
+                self._error(random.choice((500, 502, 503)), "Injected server error", "server_error")
+                return
+            response, outcome = _completion(body, options, random.random() < options.malformed)
+            self._send(200, response)
+        finally:
+            state.leave(outcome)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0,
+                options: Optional[MockOptions] = None) -> ThreadingHTTPServer:
+    """创建服务（port=0 时自动选择端口），调用方负责 serve_forever / shutdown"""
+    state = MockState(options or MockOptions())
+    handler = type("BoundMockHandler", (MockHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+
+def start_in_thread(options: Optional[MockOptions] = None, host: str = "127.0.0.1",
+                    port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """在后台线程中启动服务，返回 (服务, base_url)"""
+    server = make_server(host, port, options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def add_options_arguments(parser: argparse.ArgumentParser) -> None:
+    """mock_server.py 与 loadtest.py 共用的行为参数"""
+    parser.add_argument("--latency", type=str, default="lognormal:0.8,0.4",
+                        help="Latency distribution: fixed:S | uniform:A,B | lognormal:MEDIAN,SIGMA | exp:MEAN")
+    parser.add_argument("--rate_429", type=float, default=0.0, help="Probability of an injected 429")
+    parser.add_argument("--rate_5xx", type=float, default=0.0, help="Probability of an injected 5xx")
+    parser.add_argument("--malformed", type=float, default=0.0, help="Probability of malformed tool arguments")
+    parser.add_argument("--max_in_flight", type=int, default=0,
+                        help="Return 429 when more requests than this are in flight (0 = unlimited)")
+    parser.add_argument("--field_chars", type=int, default=60, help="Characters generated per field")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+
+
+def options_from_args(args: argparse.Namespace) -> MockOptions:
+    if args.seed is not None:
+        random.seed(args.seed)
+    return MockOptions(
+        latency=args.latency,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        malformed=args.malformed,
+        max_in_flight=args.max_in_flight,
+        field_chars=args.field_chars,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible mock server")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_options_arguments(parser)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, options_from_args(args))
+    print(f"Mock OpenAI server on http://{args.host}:{server.server_address[1]}/v1", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+RPM / TPM 令牌桶限速器
+
+服务商（DeepSeek、阿里百炼等）同时限制每分钟请求数（RPM）和每分钟 token 数（TPM）。
+每次调用前按估计的 prompt + completion token 数申请额度，两个桶都够用时才发出请求；
+拿到实际用量后可以用 reconcile 修正 TPM 桶。线程引擎和异步引擎共用同一个实例。
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+# 统计利用率的时间窗口（秒）
+WINDOW = 60.0
+
+
+class _Bucket:
+    """
+    允许透支的令牌桶：申请时立即扣减，余额为负时返回需要等待的秒数
+
+    先到先得，等待时间不会因为后来的小请求而变长。
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # 单次申请超过桶容量时按容量计算，否则永远等不到
+        self.level -= min(amount, self.capacity)
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def refund(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """
+    RPM / TPM 双令牌桶
+
+    Args:
+        rpm: 每分钟请求数上限（0 或 None 表示不限制）
+        tpm: 每分钟 token 数上限（0 或 None 表示不限制）
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.rpm = rpm or None
+        self.tpm = tpm or None
+        self._requests = _Bucket(self.rpm) if self.rpm else None
+        self._tokens = _Bucket(self.tpm) if self.tpm else None
+        self._lock = threading.Lock()
+        self._history: deque = deque()  # (时间, 请求数, token 数)
+        self.total_requests = 0
+        self.total_tokens = 0
+        self.total_wait = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._requests is not None or self._tokens is not None
+
+    def _reserve(self, tokens: int) -> float:
+        """登记一次请求，返回需要等待的秒数"""
+        now = time.monotonic()
+        with self._lock:
+            wait = 0.0
+            if self._requests is not None:
+                wait = max(wait, self._requests.reserve(1, now))
+            if self._tokens is not None:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+            self._history.append((now + wait, 1, tokens))
+            self.total_requests += 1
+            self.total_tokens += tokens
+            self.total_wait += wait
+        return wait
+
+    def acquire(self, tokens: int) -> float:
+        """申请一次调用的额度（阻塞当前线程），返回实际等待的秒数"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int) -> float:
+        """acquire 的异步版本，只挂起当前协程"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def reconcile(self, estimated: int, actual: int) -> None:
+        """用实际 token 用量修正 TPM 桶（估高了退回额度，估低了补扣）"""
+        diff = actual - estimated
+        if not diff:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self.total_tokens += diff
+            self._history.append((now, 0, diff))
+            if self._tokens is not None:
+                if diff < 0:
+                    self._tokens.refund(-diff, now)
+                else:
+                    self._tokens.reserve(diff, now)
+
+    def utilisation(self) -> Dict[str, float]:
+        """
+        最近一分钟的用量
+
+        Returns:
+            {"rpm": 请求数, "tpm": token 数, "rpm_ratio": 占上限比例, "tpm_ratio": 占上限比例}
+            （未设置上限的比例为 0）
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._history and self._history[0][0] < now - WINDOW:
+                self._history.popleft()
+            requests = sum(count for _, count, _ in self._history)
+            tokens = sum(amount for _, _, amount in self._history)
+        return {
+            "rpm": requests,
+            "tpm": tokens,
+            "rpm_ratio": requests / self.rpm if self.rpm else 0.0,
+            "tpm_ratio": tokens / self.tpm if self.tpm else 0.0,
+        }
+
+    def format_utilisation(self) -> str:
+        """进度条后缀用的简短文本"""
+        u = self.utilisation()
+        parts = [f"rpm {u['rpm']:.0f}" + (f"/{self.rpm:.0f}" if self.rpm else "")]
+        parts.append(f"tpm {u['tpm']:.0f}" + (f"/{self.tpm:.0f}" if self.tpm else ""))
+        return " ".join(parts)
+
+    def summary(self) -> str:
+        """运行结束后的统计"""
+        return (
+            f"Rate limiter: {self.total_requests} requests, ~{self.total_tokens} tokens, "
+            f"waited {self.total_wait:.1f}s in total (limits: rpm={self.rpm or '∞'}, tpm={self.tpm or '∞'})"
+        )
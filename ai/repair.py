@@ -0,0 +1,296 @@
+"""
+结构化输出的容错修复
+
+模型返回的 Structure 参数经常不是合法 JSON：LaTeX 命令没有转义（``\\alpha``、``\\frac``）、
+字段值里夹着未转义的双引号、输出被截断、外面包了 Markdown 代码块等。这里的解析器
+逐字符读取 ``{"字段": "值", ...}``，按上下文判断每个反斜杠和引号的含义，尽量多地
+恢复完整字段，不需要再调用一次 API。
+
+合法的转义（``\\n``、``\\"``、``\\uXXXX``）保持原义；``\\b``、``\\f`` 以及后面紧跟
+常见 LaTeX 命令名的 ``\\n``、``\\r``、``\\t`` 按字面的反斜杠处理。被截断的最后一个字段
+值不完整，直接丢弃。
+
+只依赖标准库，benchmarks/bench_structure_repair.py 可以单独运行。
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 与合法 JSON 转义冲突的 LaTeX 命令（按转义字母分组，只收录不会与正常文本混淆的）
+_LATEX_AFTER_ESCAPE = {
+    "n": ("nu", "nabla", "natural", "nearrow", "neq", "neg", "nexists", "notin", "nonumber", "noindent",
+          "nolimits", "newline", "newcommand", "nleq", "ngeq", "nless", "ngtr", "nmid", "nparallel", "nsim",
+          "ncong", "nsubseteq", "nsupseteq", "nleftarrow", "nrightarrow", "nLeftarrow", "nRightarrow",
+          "normalsize", "nwarrow"),
+    "t": ("theta", "times", "text", "textbf", "textit", "textrm", "texttt", "textsf", "textsc",
+          "textup", "textnormal", "textstyle", "tilde", "tan", "tanh", "therefore", "thicksim",
+          "thickapprox", "triangle", "triangleq", "triangleleft", "triangleright", "tfrac", "tbinom", "top",
+          "tau", "to", "tiny", "textwidth"),
+    "r": ("rho", "right", "rangle", "rightarrow", "rceil", "rfloor", "rm", "rbrace", "rbrack"),
+}
+_COMMAND_RE = re.compile(r"[A-Za-z]+")
+
+# 值字符串中的 " 后面是这些内容时才视为字符串结束，否则是未转义的内部引号
+_VALUE_CLOSE_RE = re.compile(r'\s*(?:$|[}\]]|,\s*(?:$|[}\]]|"[^"\\\n]{0,64}(?:$|"\s*:)))')
+_KEY_CLOSE_RE = re.compile(r"\s*(?:$|:)")
+_FENCE_RE = re.compile(r"^\s*```[A-Za-z]*\s*|\s*```\s*$")
+_TOKEN_RE = re.compile(r"[^,}\]]*")
+_HEX4_RE = re.compile(r"[0-9a-fA-F]{4}")
+
+_CONTROL_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", '"': '"', "\\": "\\", "/": "/"}
+
+
+@dataclass
+class RepairReport:
+    """一次修复的统计"""
+
+    latex_escapes: int = 0      # 按字面保留的反斜杠
+    inner_quotes: int = 0       # 视为字符串内容的引号
+    truncated: bool = False     # 输出在字段中途结束
+    dropped: List[str] = field(default_factory=list)  # 因截断丢弃的字段
+
+
+def _is_latex(text: str, pos: int) -> bool:
+    """text[pos] 是转义字母，判断 ``\\`` + text[pos:] 是否是 LaTeX 命令"""
+    letter = text[pos]
+    if letter in "bf":
+        # 文本里不会出现退格和换页符
+        return True
+    match = _COMMAND_RE.match(text, pos)
+    if not match:
+        return False
+    word = match.group(0)
+    if letter == "r":
+        # 回车同样不会出现在正文里，只要后面是字母就按 LaTeX 处理
+        return len(word) > 1 or word in _LATEX_AFTER_ESCAPE["r"]
+    return word in _LATEX_AFTER_ESCAPE.get(letter, ())
+
+
+def _read_string(text: str, pos: int, is_key: bool, report: RepairReport) -> Tuple[str, int, bool]:
+    """
+    从 text[pos]（开头的引号之后）读取一个字符串
+
+    Returns:
+        (内容, 结束引号之后的位置, 是否完整)
+    """
+    closer = _KEY_CLOSE_RE if is_key else _VALUE_CLOSE_RE
+    chars = []
+    n = len(text)
+    while pos < n:
+        c = text[pos]
+        if c == "\\":
+            if pos + 1 >= n:
+                break
+            nxt = text[pos + 1]
+            if nxt == "u" and _HEX4_RE.fullmatch(text[pos + 2:pos + 6]):
+                chars.append(chr(int(text[pos + 2:pos + 6], 16)))
+                pos += 6
+            elif nxt in "bfnrt" and _is_latex(text, pos + 1):
+                chars.append("\\")
+                report.latex_escapes += 1
+                pos += 1
+            elif nxt in _CONTROL_ESCAPES:
+                chars.append(_CONTROL_ESCAPES[nxt])
+                pos += 2
+            else:
+                # 非法转义（\alpha、\sum、\( …）：保留反斜杠本身
+                chars.append("\\")
+                report.latex_escapes += 1
+                pos += 1
+            continue
+        if c == '"':
+            if closer.match(text, pos + 1):
+                return "".join(chars), pos + 1, True
+            chars.append('"')
+            report.inner_quotes += 1
+            pos += 1
+            continue
+        chars.append(c)
+        pos += 1
+    return "".join(chars), n, False
+
+
+def _match_bracket(text: str, pos: int) -> Optional[int]:
+    """text[pos] 为 { 或 [，返回匹配的右括号之后的位置（考虑字符串）"""
+    depth = 0
+    in_string = False
+    i = pos
+    while i < len(text):
+        c = text[i]
+        if in_string:
+            if c == "\\":
+                i += 1
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            depth += 1
+        elif c in "}]":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return None
+
+
+def _read_value(text: str, pos: int, report: RepairReport) -> Tuple[Any, int, bool]:
+    """读取一个值，返回 (值, 结束位置, 是否完整)"""
+    if text[pos] == '"':
+        return _read_string(text, pos + 1, False, report)
+    if text[pos] in "{[":
+        end = _match_bracket(text, pos)
+        if end is None:
+            return None, len(text), False
+        raw = text[pos:end]
+        if text[pos] == "{":
+            nested, _ = parse_object(raw)
+            return nested, end, True
+        try:
+            return json.loads(raw, strict=False), end, True
+        except json.JSONDecodeError:
+            return raw, end, True
+    match = _TOKEN_RE.match(text, pos)
+    token = match.group(0).strip()
+    end = match.end()
+    if end >= len(text):
+        return None, end, False
+    try:
+        return json.loads(token), end, True
+    except json.JSONDecodeError:
+        return token, end, True
+
+
+def parse_object(text: str) -> Tuple[Dict[str, Any], RepairReport]:
+    """
+    容错解析一个 JSON 对象
+
+    从第一个 { 开始读取键值对，遇到无法继续的位置就停止，返回已经完整读到的字段。
+
+    Returns:
+        (字段字典, 修复统计)
+    """
+    report = RepairReport()
+    result: Dict[str, Any] = {}
+    text = _FENCE_RE.sub("", text)
+    pos = text.find("{")
+    if pos < 0:
+        return result, report
+    pos += 1
+    n = len(text)
+    while True:
+        while pos < n and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= n:
+            report.truncated = True
+            break
+        if text[pos] in "}]":
+            break
+        if text[pos] != '"':
+            # 无法识别的内容（如未加引号的键），到此为止
+            break
+        key, pos, complete = _read_string(text, pos + 1, True, report)
+        while pos < n and text[pos] in " \t\r\n":
+            pos += 1
+        if not complete or pos >= n or text[pos] != ":":
+            report.truncated = report.truncated or pos >= n
+            break
+        pos += 1
+        while pos < n and text[pos] in " \t\r\n":
+            pos += 1
+        if pos >= n:
+            report.truncated = True
+            report.dropped.append(key)
+            break
+        value, pos, complete = _read_value(text, pos, report)
+        if not complete:
+            report.truncated = True
+            report.dropped.append(key)
+            break
+        result[key] = value
+    return result, report
+
+
+def _unwrap(data: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """处理 {"Structure": {...}}、{"arguments": {...}} 这类多包了一层的输出"""
+    fields = set(fields)
+    if fields & data.keys():
+        return data
+    for value in data.values():
+        if isinstance(value, dict) and fields & value.keys():
+            return value
+    return data
+
+
+def salvage_fields(text: Optional[str], fields: Iterable[str]) -> Dict[str, str]:
+    """
+    从原始输出中恢复尽可能多的字段
+
+    Args:
+        text: 模型输出的参数字符串（或消息正文）
+        fields: 需要的字段名
+
+    Returns:
+        非空的字段值（数字等非字符串值会转换成字符串）
+    """
+    if not text:
+        return {}
+    fields = list(fields)
+    data, _ = parse_object(text)
+    data = _unwrap(data, fields)
+    salvaged = {}
+    for name in fields:
+        value = data.get(name)
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            value = json.dumps(value, ensure_ascii=False)
+        value = value.strip()
+        if value:
+            salvaged[name] = value
+    return salvaged
+
+
+def restore_latex(value: str) -> str:
+    """
+    修正已被标准 JSON 解析器吃掉的 LaTeX 反斜杠
+
+    例如 ``"\\frac"`` 会被解析成换页符 + ``rac``、``"\\theta"`` 成为制表符 + ``heta``。
+    """
+    if not any(c in value for c in "\b\f\n\r\t"):
+        return value
+    out = []
+    for i, c in enumerate(value):
+        letter = {"\b": "b", "\f": "f", "\n": "n", "\r": "r", "\t": "t"}.get(c)
+        if letter is not None and _is_latex(letter + value[i + 1:i + 40], 0):
+            out.append("\\" + letter)
+        else:
+            out.append(c)
+    return "".join(out)
+
+
+def raw_payload(message: Any) -> Optional[str]:
+    """
+    从模型返回的原始消息中取出结构化参数字符串
+
+    依次查找：解析失败的工具调用、additional_kwargs 中的原始 tool_calls、
+    已解析的工具调用参数（字段校验失败时）、消息正文（json_schema 模式）。
+    """
+    if message is None:
+        return None
+    for call in getattr(message, "invalid_tool_calls", None) or []:
+        if call.get("args"):
+            return call["args"]
+    for call in (getattr(message, "additional_kwargs", None) or {}).get("tool_calls") or []:
+        arguments = (call.get("function") or {}).get("arguments")
+        if arguments:
+            return arguments
+    for call in getattr(message, "tool_calls", None) or []:
+        if call.get("args"):
+            return json.dumps(call["args"], ensure_ascii=False)
+    content = getattr(message, "content", None)
+    if isinstance(content, str) and content.strip():
+        return content
+    return None
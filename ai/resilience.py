@@ -0,0 +1,238 @@
+"""
+LLM 调用的错误分类、重试与熔断
+
+把异常分成 rate_limit / timeout / server / parse / other 五类，每类有各自的重试次数和
+退避基数（指数退避 + 全抖动，限流时优先使用服务端的 Retry-After）。连续出现
+timeout / server 错误达到阈值时熔断器打开，暂停所有新的调用，冷却后只放行一个探测
+请求，成功才恢复。运行结束时按类别报告失败次数。
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import langchain_core.exceptions
+
+T = TypeVar("T")
+
+ERROR_KINDS = ("rate_limit", "timeout", "server", "parse", "other")
+
+# 说明服务不可用的错误类别，计入熔断器
+OUTAGE_KINDS = ("timeout", "server")
+
+
+def _status_code(e: Exception) -> Optional[int]:
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(e: Exception) -> str:
+    """
+    错误类别
+
+    按异常类型和 HTTP 状态码判断，不直接依赖 openai / httpx 的异常类，
+    换用其他兼容 OpenAI 的客户端也能分类。
+    """
+    if isinstance(e, langchain_core.exceptions.OutputParserException):
+        return "parse"
+    name = type(e).__name__
+    status = _status_code(e)
+    if status == 429 or name == "RateLimitError":
+        return "rate_limit"
+    if isinstance(e, (TimeoutError, asyncio.TimeoutError)) or "Timeout" in name:
+        return "timeout"
+    if (status is not None and status >= 500) or name in ("InternalServerError", "APIConnectionError"):
+        return "server"
+    return "other"
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    """429 响应中的 Retry-After（秒）"""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    每类错误的最大重试次数与退避基数（秒）
+
+    parse 错误重试一次（同一 Prompt 再采样一次通常就能得到合法 JSON），
+    other（如 401、400）重试没有意义。
+    """
+
+    max_retries: Dict[str, int] = field(default_factory=lambda: {
+        "rate_limit": 5, "timeout": 3, "server": 3, "parse": 1, "other": 0,
+    })
+    base_delay: Dict[str, float] = field(default_factory=lambda: {
+        "rate_limit": 2.0, "timeout": 1.0, "server": 2.0, "parse": 0.0, "other": 0.0,
+    })
+    max_delay: float = 60.0
+
+    def delay(self, kind: str, attempt: int, e: Exception) -> Optional[float]:
+        """第 attempt 次（从 0 开始）失败后的等待秒数；不再重试时返回 None"""
+        if attempt >= self.max_retries.get(kind, 0):
+            return None
+        if kind == "rate_limit":
+            retry_after = _retry_after(e)
+            if retry_after is not None:
+                return min(retry_after, self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay.get(kind, 0.0) * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    Args:
+        threshold: 连续多少次 timeout / server 错误后打开（0 表示关闭熔断）
+        cooldown: 打开后暂停的秒数，之后放行一个探测请求
+    """
+
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.times_opened = 0
+        self.paused = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """返回需要等待的秒数，0 表示可以发出请求"""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == "closed":
+                return 0.0
+            if self.state == "open":
+                if now < self.open_until:
+                    self.paused += self.open_until - now
+                    return self.open_until - now
+                self.state = "half_open"
+                self.probing = False
+            if not self.probing:
+                self.probing = True
+                return 0.0
+            self.paused += self.POLL_INTERVAL
+            return self.POLL_INTERVAL
+
+    def wait(self) -> None:
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def wait_async(self) -> None:
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def record(self, kind: Optional[str]) -> None:
+        """登记一次调用的结果（kind 为 None 表示成功）"""
+        with self._lock:
+            if kind not in OUTAGE_KINDS:
+                # 成功或非服务故障的错误都说明服务可用
+                self.state = "closed"
+                self.failures = 0
+                self.probing = False
+                return
+            self.failures += 1
+            if self.threshold and (self.state == "half_open" or self.failures >= self.threshold):
+                if self.state == "closed":
+                    self.times_opened += 1
+                self.state = "open"
+                self.open_until = time.monotonic() + self.cooldown
+                self.probing = False
+
+
+class Resilience:
+    """
+    带重试和熔断的调用包装，线程引擎和异步引擎共用同一个实例
+
+    Args:
+        policy: 重试策略
+        breaker: 熔断器
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None):
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.errors = Counter()     # 每类错误出现的次数（含重试成功的）
+        self.gave_up = Counter()    # 重试用尽后仍失败的论文数
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def _on_error(self, kind: str, attempt: int, e: Exception) -> Optional[float]:
+        self.breaker.record(kind)
+        delay = self.policy.delay(kind, attempt, e)
+        with self._lock:
+            self.errors[kind] += 1
+            if delay is None:
+                self.gave_up[kind] += 1
+            else:
+                self.retries += 1
+        return delay
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """调用 fn，按错误类别重试；重试用尽时抛出最后一次的异常"""
+        attempt = 0
+        while True:
+            self.breaker.wait()
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._on_error(classify_error(e), attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            else:
+                self.breaker.record(None)
+                return result
+
+    async def call_async(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """call 的异步版本"""
+        attempt = 0
+        while True:
+            await self.breaker.wait_async()
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._on_error(classify_error(e), attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                self.breaker.record(None)
+                return result
+
+    def summary(self) -> str:
+        """运行结束后的统计"""
+        if not self.errors:
+            return "LLM errors: none"
+        parts = [
+            f"{kind} {self.errors[kind]} (gave up {self.gave_up[kind]})"
+            for kind in ERROR_KINDS if self.errors[kind]
+        ]
+        return (
+            f"LLM errors: {', '.join(parts)}; {self.retries} retries, "
+            f"circuit opened {self.breaker.times_opened}x, workers paused {self.breaker.paused:.1f}s in total"
+        )
@@ -0,0 +1,16 @@
+"""
+与 src 共用的代码
+
+ai 下的脚本在 ai 目录中运行，这里把仓库根目录加入 sys.path 后再从 src 导入，
+其他模块统一从这里取用。
+"""
+
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from src.serialization import dumps, iter_records, loads  # noqa: E402,F401
+from src.tokens import estimate_tokens  # noqa: E402,F401
@@ -40,4 +40,17 @@ class Structure(BaseModel):
     )
     summary_layman: str = Field(
         description="一句话总结（大白话版）：用一个10岁小孩都能听懂的比喻或说法，概括论文最核心的观点"
-    )
\ No newline at end of file
+    )
+
+class TriageStructure(BaseModel):
+    """初筛输出结构 - 只给出一句话总结和价值评分，用于决定是否做完整分析"""
+
+    summary_core: str = Field(
+        description="一句话总结（核心价值）：将问题、视角、方法和发现四个要素熔合成一个单一、连贯、通顺且凝练的句子"
+    )
+    value_score: str = Field(
+        description="价值评分：高价值（立即深度处理）/中等价值（有趣但不紧急）/低价值（可能跳过）"
+    )
+    score: int = Field(
+        description="价值分数：1-10 的整数，10 表示最值得深入研究；高价值 8-10，中等价值 5-7，低价值 1-4"
+    )
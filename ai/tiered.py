@@ -0,0 +1,116 @@
+"""
+分级增强：先用 TriageStructure 做便宜的初筛，只对高分或命中关键词的论文做完整分析
+
+命中关键词的论文跳过初筛直接做完整分析；初筛失败（拿不到分数）的论文也做完整分析，
+宁可多花一次调用也不漏掉好论文。只做了初筛的论文，其余字段填入 TRIAGE_ONLY_TEXT，
+to_md/convert.py 和前端要求的 11 个字段仍然齐全。
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+# 只做了初筛的论文中未分析字段的占位值（is_completed 不把它当作完整结果，--resume 会重新处理）
+TRIAGE_ONLY_TEXT = "初筛价值较低，未做深度分析"
+
+
+def parse_keywords(text: Optional[str]) -> List[str]:
+    """逗号分隔的关键词（忽略大小写）"""
+    return [k.strip().lower() for k in (text or "").split(",") if k.strip()]
+
+
+def matches_keywords(item: Dict, keywords: Iterable[str]) -> bool:
+    """标题或摘要中是否包含任一关键词"""
+    text = f"{item.get('title', '')}\n{item.get('summary', '')}".lower()
+    return any(k in text for k in keywords)
+
+
+def triage_score(ai: Dict) -> Optional[int]:
+    """初筛结果中的分数，缺失或无法解析时返回 None"""
+    try:
+        return max(1, min(10, int(ai.get("score"))))
+    except (TypeError, ValueError):
+        return None
+
+
+def expand_triage(item: Dict, fields: Iterable[str]) -> Dict:
+    """把初筛结果补全为完整的 AI 字段"""
+    triage = item["AI"]
+    ai = {field: TRIAGE_ONLY_TEXT for field in fields}
+    ai["summary_core"] = triage["summary_core"]
+    ai["value_score"] = triage["value_score"]
+    ai["analysis_tier"] = "triage"
+    ai["triage_score"] = triage_score(triage)
+    item["AI"] = ai
+    return item
+
+
+@dataclass
+class TieredReport:
+    """分级模式的调用量与耗时统计"""
+
+    papers: int = 0
+    keyword_deep: int = 0       # 命中关键词，跳过初筛
+    triaged: int = 0
+    score_deep: int = 0         # 初筛分数达到阈值
+    failed_deep: int = 0        # 初筛失败
+    triage_tokens: int = 0
+    deep_tokens: int = 0
+    triage_seconds: float = 0.0
+    deep_seconds: float = 0.0
+    estimated_deep_tokens_per_paper: float = 0.0  # 没有实际深度调用时使用的估计值
+
+    @property
+    def deep(self) -> int:
+        return self.keyword_deep + self.score_deep + self.failed_deep
+
+    @property
+    def triage_only(self) -> int:
+        return self.papers - self.deep
+
+    def all_deep_estimate(self):
+        """全部做完整分析时的 (token 数, 秒数) 估计，按本次深度分析的平均值外推"""
+        if self.deep and self.deep_tokens:
+            tokens = self.deep_tokens / self.deep * self.papers
+        else:
+            tokens = self.estimated_deep_tokens_per_paper * self.papers
+        seconds = self.deep_seconds / self.deep * self.papers if self.deep else None
+        return tokens, seconds
+
+    def format(self) -> str:
+        tokens_used = self.triage_tokens + self.deep_tokens
+        seconds_used = self.triage_seconds + self.deep_seconds
+        all_tokens, all_seconds = self.all_deep_estimate()
+        lines = [
+            f"Tiered enhancement: {self.papers} papers, {self.triaged} triaged, {self.deep} deep "
+            f"({self.keyword_deep} keyword, {self.score_deep} score, {self.failed_deep} triage failed), "
+            f"{self.triage_only} triage only",
+            f"  API tokens (cache hits are free): {self.triage_tokens} triage + {self.deep_tokens} deep = {tokens_used} "
+            f"vs ~{all_tokens:.0f} all deep (saved ~{all_tokens - tokens_used:.0f}, "
+            f"{(1 - tokens_used / all_tokens) if all_tokens else 0:.0%})",
+        ]
+        if all_seconds is not None:
+            lines.append(
+                f"  wall clock: {self.triage_seconds:.1f}s triage + {self.deep_seconds:.1f}s deep = {seconds_used:.1f}s "
+                f"vs ~{all_seconds:.1f}s all deep (saved ~{all_seconds - seconds_used:.1f}s)"
+            )
+        else:
+            lines.append(f"  wall clock: {seconds_used:.1f}s (no deep analysis to extrapolate from)")
+        return "\n".join(lines)
+
+
+class Stopwatch:
+    """记录一个阶段的耗时和限速器记录的 token 增量"""
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.tokens_before = self.limiter.total_tokens
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+        self.tokens = self.limiter.total_tokens - self.tokens_before
+        return False
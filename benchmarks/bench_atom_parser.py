@@ -0,0 +1,144 @@
+"""
+Benchmark: arXiv Atom feed parser
+
+在 2,000 条目的 Atom feed 上测量 src/atom.py 的单条目解析成本；若安装了 feedparser，
+同时测量原先 feedparser + _parse_entry 的方案作为对照。
+Measures per-entry cost of src/atom.py on a 2,000-entry Atom feed, and of the
+previous feedparser + _parse_entry path when feedparser is installed.
+
+fixture 由 build_feed() 按 arXiv API 的实际格式确定性生成（约 4 MB，不入库）。
+The fixture is generated deterministically by build_feed() in the arXiv API
+format (~4 MB, so it is not committed).
+
+Usage:
+    python benchmarks/bench_atom_parser.py [--entries 2000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.atom import _parse_date, parse_atom  # noqa: E402
+from src.models import Paper  # noqa: E402
+
+WORDS = (
+    "model vision language diffusion transformer attention token image video retrieval "
+    "graph sparse robust efficient learning training scaling benchmark agent reasoning"
+).split()
+CATEGORIES = ["cs.CV", "cs.CL", "cs.LG", "cs.AI", "cs.RO", "stat.ML", "eess.IV"]
+
+
+def build_feed(n: int, seed: int = 0) -> bytes:
+    """生成 n 个条目的 arXiv API Atom feed / Build an n-entry arXiv API Atom feed"""
+    rng = random.Random(seed)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom">\n'
+        '  <title type="html">ArXiv Query: search_query=cat:cs.CV</title>\n'
+        f'  <opensearch:totalResults>{n}</opensearch:totalResults>\n'
+    ]
+    for i in range(n):
+        arxiv_id = f"2401.{i:05d}"
+        # 同一天内的提交时间相同的情况很常见 / Many papers share a timestamp
+        published = f"2024-01-{1 + i // 200:02d}T{(i // 40) % 24:02d}:00:00Z"
+        primary = rng.choice(CATEGORIES)
+        cats = [primary] + rng.sample([c for c in CATEGORIES if c != primary], rng.randint(0, 2))
+        title = " ".join(rng.choice(WORDS) for _ in range(10))
+        summary = "\n  ".join(" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(12))
+        authors = "".join(
+            f"    <author>\n      <name>Author {rng.randint(1, 5000)}</name>\n    </author>\n"
+            for _ in range(rng.randint(2, 8))
+        )
+        categories = "".join(
+            f'    <category term="{c}" scheme="http://arxiv.org/schemas/atom"/>\n' for c in cats
+        )
+        parts.append(
+            "  <entry>\n"
+            f"    <id>http://arxiv.org/abs/{arxiv_id}v1</id>\n"
+            f"    <updated>{published}</updated>\n"
+            f"    <published>{published}</published>\n"
+            f"    <title>{title}</title>\n"
+            f"    <summary>  {summary}\n</summary>\n"
+            f"{authors}"
+            f'    <arxiv:comment xmlns:arxiv="http://arxiv.org/schemas/atom">12 pages</arxiv:comment>\n'
+            f'    <link href="http://arxiv.org/abs/{arxiv_id}v1" rel="alternate" type="text/html"/>\n'
+            f'    <link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}v1" rel="related" type="application/pdf"/>\n'
+            f'    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="{primary}" '
+            f'scheme="http://arxiv.org/schemas/atom"/>\n'
+            f"{categories}"
+            "  </entry>\n"
+        )
+    parts.append("</feed>\n")
+    return "".join(parts).encode("utf-8")
+
+
+def parse_with_feedparser(feed_bytes: bytes):
+    """原 fetcher 的 feedparser + _parse_entry 方案 / The previous feedparser path"""
+    import feedparser
+
+    papers = []
+    for entry in feedparser.parse(feed_bytes).entries:
+        try:
+            arxiv_id = entry.id.split("/abs/")[-1].split("v")[0]
+            papers.append(Paper(
+                title=entry.title.replace("\n", " ").strip(),
+                abstract=entry.summary.replace("\n", " ").strip(),
+                authors=[author.name for author in entry.authors],
+                arxiv_id=arxiv_id,
+                arxiv_url=f"https://arxiv.org/abs/{arxiv_id}",
+                published_date=datetime.strptime(entry.published, "%Y-%m-%dT%H:%M:%SZ"),
+                categories=[tag.term for tag in entry.tags],
+            ))
+        except Exception:
+            continue
+    return papers
+
+
+def bench(func, feed_bytes: bytes, repeat: int):
+    best = float("inf")
+    papers = []
+    for _ in range(repeat):
+        _parse_date.cache_clear()
+        start = time.perf_counter()
+        papers = func(feed_bytes)
+        best = min(best, time.perf_counter() - start)
+    return best, papers
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=2000, help="entries in the generated feed")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    feed_bytes = build_feed(args.entries)
+    print(f"Feed: {args.entries} entries, {len(feed_bytes) / 1e6:.1f} MB")
+
+    elapsed, papers = bench(parse_atom, feed_bytes, args.repeat)
+    assert len(papers) == args.entries, f"parsed {len(papers)} of {args.entries} entries"
+    print(f"lxml iterparse : {elapsed * 1000:8.1f} ms total, {elapsed * 1e6 / args.entries:6.1f} µs/entry")
+    info = _parse_date.cache_info()
+    print(f"  date cache   : {info.hits} hits / {info.misses} misses")
+
+    try:
+        import feedparser  # noqa: F401
+    except ImportError:
+        print("feedparser     : not installed, baseline skipped")
+        return
+
+    base_elapsed, base_papers = bench(parse_with_feedparser, feed_bytes, args.repeat)
+    assert [p.arxiv_id for p in base_papers] == [p.arxiv_id for p in papers]
+    print(f"feedparser     : {base_elapsed * 1000:8.1f} ms total, {base_elapsed * 1e6 / args.entries:6.1f} µs/entry")
+    print(f"speedup        : {base_elapsed / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: embedding topic matcher
+
+用本地 HashingEmbedder 测量 src/embedding.py 的三种情况：首次筛选（编码 + 写缓存）、
+次日重跑（全部命中缓存）、以及换一批母题重新筛选（只有一次矩阵乘法）。
+Measures src/embedding.py with the local HashingEmbedder: a cold run (embed and
+fill the cache), a warm re-run (all cache hits) and re-filtering against new
+topics with the paper matrix already in memory (a single matrix multiply).
+
+Usage:
+    python benchmarks/bench_embedding_match.py [--papers 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.embedding import EmbeddingCache, HashingEmbedder, TopicMatcher  # noqa: E402
+from src.models import Paper  # noqa: E402
+
+WORDS = (
+    "model vision language diffusion transformer attention token image video retrieval "
+    "graph sparse robust efficient learning training scaling benchmark agent reasoning "
+    "tool planning interpretability autoencoder circuit knowledge generation long"
+).split()
+TOPICS = [
+    "agent tool calling optimization",
+    "agent planning reasoning",
+    "efficient long video understanding",
+    "video generation quality",
+    "knowledge graph retrieval augmented generation",
+    "sparse autoencoder interpretability",
+]
+
+
+def build_papers(n: int, seed: int = 0) -> list[Paper]:
+    rng = random.Random(seed)
+    return [
+        Paper(
+            title=" ".join(rng.choice(WORDS) for _ in range(10)),
+            abstract=" ".join(rng.choice(WORDS) for _ in range(150)),
+            authors=["Author"],
+            arxiv_id=f"2401.{i:05d}",
+            arxiv_url=f"https://arxiv.org/abs/2401.{i:05d}",
+            published_date=datetime(2024, 1, 1),
+            categories=["cs.AI"],
+        )
+        for i in range(n)
+    ]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=20_000, help="number of papers")
+    args = parser.parse_args()
+
+    papers = build_papers(args.papers)
+    embedder = HashingEmbedder()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "embeddings.sqlite")
+
+        cache = EmbeddingCache(path)
+        cold, matches = timed(lambda: TopicMatcher(embedder, cache).match(papers, TOPICS))
+        cache.close()
+
+        cache = EmbeddingCache(path)
+        matcher = TopicMatcher(embedder, cache)
+        warm, warm_matches = timed(lambda: matcher.match(papers, TOPICS))
+        assert cache.misses == 0
+        assert [p.arxiv_id for p, _, _ in warm_matches] == [p.arxiv_id for p, _, _ in matches]
+
+        paper_matrix = matcher.embed_papers(papers)
+        new_topics = [t + " benchmark" for t in TOPICS]
+        topic_matrix = matcher.embed_topics(new_topics)
+        refilter, _ = timed(lambda: paper_matrix @ topic_matrix.T)
+        cache.close()
+
+    n = args.papers
+    print(f"Papers: {n}, topics: {len(TOPICS)}, matched: {len(matches)}")
+    print(f"cold (embed + cache) : {cold * 1000:9.1f} ms  ({cold * 1e6 / n:6.1f} µs/paper)")
+    print(f"warm (cache hits)    : {warm * 1000:9.1f} ms  ({warm * 1e6 / n:6.1f} µs/paper)")
+    print(f"re-filter (matmul)   : {refilter * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Micro-benchmark: arXiv /new listing parser
+
+比较单次遍历的 lxml 解析器（daily_arxiv/daily_arxiv/listing.py）与原先基于
+CSS/XPath 选择器的 ArxivSpider.parse 逻辑：先确认两者在保存的列表页上输出完全一致，
+再报告每页解析耗时。
+Compares the single-pass lxml parser with the previous selector-based
+ArxivSpider.parse logic: checks both give identical output on saved listing
+pages, then reports per-page parse time.
+
+Usage:
+    python benchmarks/bench_listing_parser.py
+    python benchmarks/bench_listing_parser.py --repeat 50 path/to/saved_new_page.html
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "daily_arxiv"))
+
+from scrapy.selector import Selector  # noqa: E402
+
+from daily_arxiv.listing import parse_listing  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "arxiv_list_*.html")
+
+
+def parse_with_selectors(body: bytes):
+    """原 ArxivSpider.parse 的提取逻辑 / Extraction logic of the old ArxivSpider.parse"""
+    response = Selector(text=body.decode("utf-8"))
+    anchors = []
+    for li in response.css("div[id=dlpage] ul li"):
+        href = li.css("a::attr(href)").get()
+        if href and "item" in href:
+            anchors.append(int(href.split("item")[-1]))
+
+    results = []
+    for paper in response.css("dl dt"):
+        paper_anchor = paper.css("a[name^='item']::attr(name)").get()
+        if not paper_anchor:
+            continue
+        paper_id = int(paper_anchor.split("item")[-1])
+        if anchors and paper_id >= anchors[-1]:
+            continue
+        abstract_link = paper.css("a[title='Abstract']::attr(href)").get()
+        if not abstract_link:
+            continue
+        arxiv_id = abstract_link.split("/")[-1]
+        paper_dd = paper.xpath("following-sibling::dd[1]")
+        if not paper_dd:
+            continue
+        subjects_text = paper_dd.css(".list-subjects .primary-subject::text").get()
+        if not subjects_text:
+            subjects_text = paper_dd.css(".list-subjects::text").get()
+        categories = tuple(re.findall(r'\(([^)]+)\)', subjects_text)) if subjects_text else ()
+        results.append((arxiv_id, bool(subjects_text), categories))
+    return results
+
+
+def parse_single_pass(body: bytes):
+    listing = parse_listing(body, "utf-8")
+    anchors = listing.anchors
+    return [
+        (entry.arxiv_id, bool(entry.subjects_text), entry.categories)
+        for entry in listing.entries
+        if not (anchors and entry.anchor >= anchors[-1])
+    ]
+
+
+def bench(func, body: bytes, repeat: int) -> float:
+    """Best-of-``repeat`` wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(body)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*", help="saved listing HTML pages (default: benchmarks/fixtures)")
+    parser.add_argument("--repeat", type=int, default=20, help="timing repetitions per page")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(FIXTURES))
+    if not files:
+        print("No listing fixtures found", file=sys.stderr)
+        sys.exit(1)
+
+    failed = False
+    for path in files:
+        with open(path, "rb") as f:
+            body = f.read()
+
+        expected = parse_with_selectors(body)
+        actual = parse_single_pass(body)
+        if expected != actual:
+            failed = True
+            print(f"❌ {os.path.basename(path)}: output differs from selector-based parser", file=sys.stderr)
+            for old, new in zip(expected, actual):
+                if old != new:
+                    print(f"   first difference: {old} != {new}", file=sys.stderr)
+                    break
+            else:
+                print(f"   entry count: {len(expected)} != {len(actual)}", file=sys.stderr)
+            continue
+
+        old_ms = bench(parse_with_selectors, body, args.repeat)
+        new_ms = bench(parse_single_pass, body, args.repeat)
+        print(
+            f"{os.path.basename(path)}: {len(actual)} entries | "
+            f"selectors {old_ms:.2f} ms | single-pass {new_ms:.2f} ms | "
+            f"{old_ms / new_ms:.1f}x, {new_ms * 1000 / max(len(actual), 1):.1f} µs/entry"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark: paper model memory footprint
+
+用 tracemalloc 比较 10 万篇论文在三种表示下的内存占用：原先的普通 dataclass、
+slots + 字符串驻留的 Paper，以及列式 PaperBatch；并比较按类别/日期筛选的耗时。
+Compares the tracemalloc footprint of 100k papers as plain dataclasses, as
+slotted + interned Paper objects, and as a columnar PaperBatch, plus the time
+to filter them by category and date.
+
+Usage:
+    python benchmarks/bench_models_memory.py [--papers 100000]
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.batch import PaperBatch  # noqa: E402
+from src.models import Paper  # noqa: E402
+
+WORDS = (
+    "model vision language diffusion transformer attention token image video retrieval "
+    "graph sparse robust efficient learning training scaling benchmark agent reasoning"
+).split()
+CATEGORIES = ["cs.CV", "cs.CL", "cs.LG", "cs.AI", "cs.RO", "stat.ML", "eess.IV"]
+
+
+@dataclass
+class LegacyPaper:
+    """原先的 Paper 定义（无 slots、无驻留）/ The previous Paper definition"""
+
+    title: str
+    abstract: str
+    authors: list[str]
+    arxiv_id: str
+    arxiv_url: str
+    published_date: datetime
+    categories: list[str]
+
+
+def build_records(n: int, seed: int = 0) -> list[tuple]:
+    """
+    生成 n 条论文字段元组 / Build n paper field tuples
+
+    作者名、类别每次都新建字符串，模拟解析器逐条产出时的情况。
+    Author and category strings are rebuilt per record, as a parser would.
+    """
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    records = []
+    for i in range(n):
+        arxiv_id = f"24{i // 30000 + 1:02d}.{i % 30000:05d}"
+        primary = rng.choice(CATEGORIES)
+        cats = [primary] + rng.sample([c for c in CATEGORIES if c != primary], rng.randint(0, 2))
+        records.append((
+            " ".join(rng.choice(WORDS) for _ in range(10)),
+            " ".join(rng.choice(WORDS) for _ in range(150)),
+            ["".join(["Author ", str(rng.randint(1, 20000))]) for _ in range(rng.randint(2, 8))],
+            arxiv_id,
+            f"https://arxiv.org/abs/{arxiv_id}",
+            base + timedelta(minutes=i),
+            ["".join(c) for c in cats],
+        ))
+    return records
+
+
+def measure(build):
+    """返回 (结果, 峰值后保留的字节数) / Return (result, bytes retained)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=100_000, help="number of papers")
+    args = parser.parse_args()
+
+    n = args.papers
+
+    # 每种对象表示都从新生成的记录构建，文本本身也计入；PaperBatch 从 Paper 列表构建，
+    # 只计入它自己的列缓冲区
+    # Each object representation is built from fresh records so its text is
+    # counted; PaperBatch is built from the Paper list and only its own buffers count
+    legacy, legacy_bytes = measure(lambda: [LegacyPaper(*r) for r in build_records(n)])
+    del legacy
+    slotted, slotted_bytes = measure(lambda: [Paper(*r) for r in build_records(n)])
+    batch, batch_bytes = measure(lambda: PaperBatch.from_papers(slotted))
+
+    assert batch.to_papers()[:100] == slotted[:100]
+
+    print(f"{'representation':<22}{'MB':>10}{'bytes/paper':>14}")
+    for name, size in (
+        ("dataclass (legacy)", legacy_bytes),
+        ("slots + intern", slotted_bytes),
+        ("PaperBatch", batch_bytes),
+    ):
+        print(f"{name:<22}{size / 1e6:>10.1f}{size / n:>14.0f}")
+
+    wanted = {"cs.CV", "cs.CL"}
+    start, end = datetime(2024, 1, 10), datetime(2024, 2, 10)
+
+    def filter_objects():
+        return [
+            p for p in slotted
+            if any(c in wanted for c in p.categories) and start <= p.published_date < end
+        ]
+
+    def filter_batch():
+        return batch.select(batch.category_mask(wanted) & batch.date_mask(start, end))
+
+    assert [p.arxiv_id for p in filter_objects()] == filter_batch().column("arxiv_id")
+
+    obj_time = best_of(filter_objects)
+    batch_time = best_of(lambda: batch.category_mask(wanted) & batch.date_mask(start, end))
+    select_time = best_of(filter_batch)
+    print(f"filter (list comp)    : {obj_time * 1000:8.2f} ms")
+    print(f"filter (batch mask)   : {batch_time * 1000:8.2f} ms  ({obj_time / batch_time:.1f}x)")
+    print(f"filter + select       : {select_time * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: paper serialization backends
+
+比较 10,000 篇论文在各后端下的编码/解码耗时与体积：标准库 json（原先各阶段的做法）、
+src/serialization.py 的 json 后端（有 orjson 时使用 orjson）以及 msgpack。
+Compares encode/decode time and size for 10,000 papers: stdlib json on plain
+dicts (what the stages did before), the src/serialization.py json backend
+(orjson when installed) and msgpack.
+
+Usage:
+    python benchmarks/bench_serialization.py [--papers 10000] [--repeat 5]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src import serialization  # noqa: E402
+from src.models import Paper  # noqa: E402
+
+WORDS = (
+    "model vision language diffusion transformer attention token image video retrieval "
+    "graph sparse robust efficient learning training scaling benchmark agent reasoning"
+).split()
+CATEGORIES = ["cs.CV", "cs.CL", "cs.LG", "cs.AI", "cs.RO", "stat.ML", "eess.IV"]
+
+
+def build_papers(n: int, seed: int = 0) -> list[Paper]:
+    """生成 n 篇论文 / Build n papers"""
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    papers = []
+    for i in range(n):
+        arxiv_id = f"2401.{i:05d}"
+        papers.append(Paper(
+            title=" ".join(rng.choice(WORDS) for _ in range(10)),
+            abstract=" ".join(rng.choice(WORDS) for _ in range(150)),
+            authors=[f"Author {rng.randint(1, 20000)}" for _ in range(rng.randint(2, 8))],
+            arxiv_id=arxiv_id,
+            arxiv_url=f"https://arxiv.org/abs/{arxiv_id}",
+            published_date=base + timedelta(minutes=i),
+            categories=rng.sample(CATEGORIES, rng.randint(1, 3)),
+        ))
+    return papers
+
+
+def stdlib_write(papers) -> bytes:
+    """原先的做法：逐条 dict + json.dumps / The previous per-stage approach"""
+    buf = io.StringIO()
+    for p in papers:
+        record = {
+            "title": p.title, "abstract": p.abstract, "authors": p.authors,
+            "arxiv_id": p.arxiv_id, "arxiv_url": p.arxiv_url,
+            "published_date": p.published_date.isoformat(), "categories": p.categories,
+        }
+        buf.write(json.dumps(record) + "\n")
+    return buf.getvalue().encode("utf-8")
+
+
+def stdlib_read(data: bytes) -> list[dict]:
+    return [json.loads(line) for line in data.decode("utf-8").splitlines()]
+
+
+def best_of(func, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=10_000, help="number of papers")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    papers = build_papers(args.papers)
+
+    print(f"{'backend':<20}{'encode ms':>11}{'decode ms':>11}{'MB':>8}")
+    enc, data = best_of(lambda: stdlib_write(papers), args.repeat)
+    dec, _ = best_of(lambda: stdlib_read(data), args.repeat)
+    print(f"{'json (dicts)':<20}{enc * 1000:>11.1f}{dec * 1000:>11.1f}{len(data) / 1e6:>8.1f}")
+
+    formats = ["json"] + (["msgpack"] if serialization.msgpack is not None else [])
+    for fmt in formats:
+        def write():
+            buf = io.BytesIO()
+            serialization.write_papers(buf, papers, fmt)
+            return buf.getvalue()
+
+        enc, data = best_of(write, args.repeat)
+        dec, restored = best_of(lambda: serialization.read_papers(io.BytesIO(data), fmt), args.repeat)
+        assert restored == papers
+        name = "orjson" if fmt == "json" and serialization.orjson is not None else fmt
+        print(f"{name + ' (Paper)':<20}{enc * 1000:>11.1f}{dec * 1000:>11.1f}{len(data) / 1e6:>8.1f}")
+
+    if serialization.msgpack is None:
+        print("msgpack            : not installed, skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: structured-output salvage rate
+
+用 benchmarks/fixtures/structure_outputs.jsonl 中的损坏输出（LaTeX 转义、未转义引号、
+截断、代码块包裹等；这些样本是按常见故障手工构造的，并非线上采集）比较旧的回退方式（按 "Function Structure arguments:" 切分异常信息、
+把所有反斜杠加倍后 json.loads）与 ai/repair.py 的容错解析：恢复出的字段数、与期望值
+完全一致的字段数以及解析耗时。
+Compares the old fallback (split the exception message, double every backslash,
+json.loads) with the tolerant parser in ai/repair.py on the fixture corpus
+(synthetic, hand-built to reproduce the usual failure modes, not captured output):
+fields recovered, fields recovered with the exact expected value, and parse time.
+
+Usage:
+    python benchmarks/bench_structure_repair.py [--repeat 200] [--verbose]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ai"))
+
+from repair import salvage_fields  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "structure_outputs.jsonl")
+FIELDS = [
+    "core_problem", "key_insight", "method", "method_formula", "core_finding", "mechanism_insight",
+    "action_value", "transferability", "value_score", "summary_core", "summary_layman",
+]
+
+
+def legacy_salvage(raw: str) -> dict:
+    """enhance.py 原来的回退逻辑（异常信息格式与 langchain 的 OutputParserException 相同）"""
+    error_msg = f"Function Structure arguments:\n\n{raw}\n\nare not valid JSON. Received JSONDecodeError"
+    try:
+        json_str = error_msg.split("Function Structure arguments:", 1)[1].strip().split('are not valid JSON')[0].strip()
+        json_str = json_str.replace('\\', '\\\\')
+        data = json.loads(json_str)
+    except Exception:
+        return {}
+    return {k: str(data[k]) for k in FIELDS if isinstance(data, dict) and data.get(k) not in (None, "")}
+
+
+def score(salvage, cases):
+    recovered = correct = 0
+    per_case = []
+    for case in cases:
+        got = salvage(case["raw"])
+        expected = case["expected"]
+        ok = sum(got.get(k) == v for k, v in expected.items())
+        recovered += sum(k in got for k in expected)
+        correct += ok
+        per_case.append((case["case"], ok, len(expected)))
+    return recovered, correct, per_case
+
+
+def timed(salvage, cases, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            salvage(case["raw"])
+    return (time.perf_counter() - start) / (repeat * len(cases))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200, help="timing repetitions over the corpus")
+    parser.add_argument("--verbose", action="store_true", help="print per-case results")
+    args = parser.parse_args()
+
+    with open(FIXTURES, encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    total = sum(len(c["expected"]) for c in cases)
+
+    candidates = {
+        "legacy (split + double backslashes)": legacy_salvage,
+        "repair.salvage_fields": lambda raw: salvage_fields(raw, FIELDS),
+    }
+    print(f"Fixtures: {len(cases)} broken outputs, {total} salvageable fields")
+    for name, salvage in candidates.items():
+        recovered, correct, per_case = score(salvage, cases)
+        per_item = timed(salvage, cases, args.repeat)
+        print(
+            f"{name:38s}: recovered {recovered:3d}/{total} ({recovered / total:6.1%}), "
+            f"exact {correct:3d}/{total} ({correct / total:6.1%}), {per_item * 1e6:7.1f} µs/output"
+        )
+        if args.verbose:
+            for case, ok, expected in per_case:
+                print(f"    {case:36s} {ok:2d}/{expected}")
+
+
+if __name__ == "__main__":
+    main()
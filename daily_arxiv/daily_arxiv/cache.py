@@ -0,0 +1,192 @@
+"""
+Local on-disk caches for the crawler.
+
+MetadataCache keeps the arXiv metadata that DailyArxivPipeline fills in, so
+that papers seen on an earlier day (cross-lists, replacements, local re-runs
+of ``scrapy crawl arxiv``) are resolved without a network call.
+
+OpenReviewIndex maps neurips.cc paper IDs to their OpenReview forum and PDF
+URLs, so NeuripsSpider only fetches detail pages for papers it has not
+resolved before.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Optional
+
+
+class MetadataCache:
+    """
+    SQLite cache of arXiv metadata keyed by (arXiv ID, version).
+
+    Entries older than ``ttl`` seconds are treated as missing and evicted on
+    open; when the table grows past ``max_entries`` the oldest rows are dropped.
+    A ``ttl`` of 0 disables expiry.
+    """
+
+    FIELDS = ("authors", "title", "categories", "comment", "summary")
+
+    def __init__(self, path: str, ttl: float = 30 * 86400, max_entries: int = 200000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS arxiv_metadata (
+                arxiv_id   TEXT NOT NULL,
+                version    INTEGER NOT NULL,
+                data       TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (arxiv_id, version)
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_arxiv_metadata_fetched ON arxiv_metadata (fetched_at)"
+        )
+        self.conn.commit()
+        self.evict()
+
+    def get(self, arxiv_id: str, version: Optional[int] = None) -> Optional[Dict]:
+        """
+        Look up cached metadata.
+
+        Args:
+            arxiv_id: arXiv ID without version (e.g. "2401.12345")
+            version: Specific version, or None for the newest cached one
+
+        Returns:
+            Dict with the FIELDS keys, or None on a miss
+        """
+        query = "SELECT data FROM arxiv_metadata WHERE arxiv_id = ?"
+        params = [arxiv_id]
+        if version is not None:
+            query += " AND version = ?"
+            params.append(version)
+        if self.ttl:
+            query += " AND fetched_at >= ?"
+            params.append(time.time() - self.ttl)
+        query += " ORDER BY version DESC LIMIT 1"
+
+        row = self.conn.execute(query, params).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put_many(self, entries) -> None:
+        """
+        Store metadata for several papers in one transaction.
+
+        Args:
+            entries: Iterable of (arxiv_id, version, metadata dict)
+        """
+        now = time.time()
+        rows = [
+            (arxiv_id, version, json.dumps({k: data.get(k) for k in self.FIELDS}, ensure_ascii=False), now)
+            for arxiv_id, version, data in entries
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO arxiv_metadata (arxiv_id, version, data, fetched_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def evict(self) -> int:
+        """Drop expired rows and trim to ``max_entries``. Returns rows removed."""
+        removed = 0
+        with self.conn:
+            if self.ttl:
+                cur = self.conn.execute(
+                    "DELETE FROM arxiv_metadata WHERE fetched_at < ?", (time.time() - self.ttl,)
+                )
+                removed += cur.rowcount
+            if self.max_entries:
+                cur = self.conn.execute(
+                    """
+                    DELETE FROM arxiv_metadata WHERE rowid IN (
+                        SELECT rowid FROM arxiv_metadata ORDER BY fetched_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+                removed += cur.rowcount
+        return removed
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class OpenReviewIndex:
+    """
+    SQLite mapping from a neurips.cc paper ID to its OpenReview links.
+
+    Only papers whose detail page actually had an OpenReview link are stored;
+    the rest are retried on the next crawl.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS neurips_openreview (
+                year           TEXT NOT NULL,
+                paper_id       TEXT NOT NULL,
+                openreview_url TEXT NOT NULL,
+                pdf            TEXT NOT NULL,
+                resolved_at    REAL NOT NULL,
+                PRIMARY KEY (year, paper_id)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def get(self, year: str, paper_id: str) -> Optional[Dict]:
+        """
+        Args:
+            year: Conference year (e.g. "2024")
+            paper_id: neurips.cc paper ID (e.g. "97958")
+
+        Returns:
+            {"openreview_url": ..., "pdf": ...} or None if not resolved yet
+        """
+        row = self.conn.execute(
+            "SELECT openreview_url, pdf FROM neurips_openreview WHERE year = ? AND paper_id = ?",
+            (str(year), paper_id),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"openreview_url": row[0], "pdf": row[1]}
+
+    def put(self, year: str, paper_id: str, openreview_url: str, pdf: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO neurips_openreview (year, paper_id, openreview_url, pdf, resolved_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (str(year), paper_id, openreview_url, pdf, time.time()),
+            )
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM neurips_openreview").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
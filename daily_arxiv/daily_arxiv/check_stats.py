@@ -8,11 +8,14 @@
 - 删除重复论文条目，保留新内容 / Remove duplicate papers, keep new content
 - 根据去重后的结果决定工作流是否继续 / Decide workflow continuation based on deduplication results
 """
-import json
 import sys
 import os
 from datetime import datetime, timedelta
 
+# 把仓库根目录加入 sys.path，与 src 共用 JSONL 序列化 / Share JSONL serialization with src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from src.serialization import iter_records, write_records  # noqa: E402
+
 def load_papers_data(file_path):
     """
     从jsonl文件中加载完整的论文数据
@@ -31,12 +34,9 @@ def load_papers_data(file_path):
     papers = []
     ids = set()
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    data = json.loads(line)
-                    papers.append(data)
-                    ids.add(data.get('id', ''))
+        for data in iter_records(file_path, 'json'):
+            papers.append(data)
+            ids.add(data.get('id', ''))
         return papers, ids
     except Exception as e:
         print(f"Error reading {file_path}: {e}", file=sys.stderr)
@@ -52,9 +52,7 @@ def save_papers_data(papers, file_path):
         file_path (str): 文件路径 / File path
     """
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for paper in papers:
-                f.write(json.dumps(paper, ensure_ascii=False) + '\n')
+        write_records(file_path, papers, 'json')
         return True
     except Exception as e:
         print(f"Error saving {file_path}: {e}", file=sys.stderr)
@@ -0,0 +1,138 @@
+"""
+Single-pass parser for arXiv ``/list/{cat}/new`` pages.
+
+ArxivSpider used to run a CSS selector per ``dt``, an XPath
+``following-sibling::dd[1]`` lookup per entry and another pair of selectors
+on the subjects line. This module builds the lxml tree once and walks the
+``dt``/``dd`` pairs directly, pulling the anchor index, arXiv ID and
+primary/secondary subjects in the same pass.
+
+The extracted values match the old selector-based code exactly, including its
+fallbacks; ``benchmarks/bench_listing_parser.py`` checks this against saved
+listing pages and times both versions.
+"""
+
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from lxml import etree
+
+_CATEGORY_RE = re.compile(r"\(([^)]+)\)")
+
+
+class ListingEntry(NamedTuple):
+    anchor: int                      # item 序号 / index from <a name="itemN">
+    arxiv_id: str                    # 如 2411.00001 / e.g. 2411.00001
+    subjects_text: Optional[str]     # 主分类文本（与旧实现一致）/ primary subject text as before
+    categories: Tuple[str, ...]      # subjects_text 中括号内的分类 / codes found in subjects_text
+    secondary: Tuple[str, ...]       # 主分类之后的交叉分类 / cross-list codes after the primary
+
+
+class Listing(NamedTuple):
+    anchors: List[int]               # 页首各分区链接（#itemN）/ section links at the top of the page
+    entries: List[ListingEntry]
+
+
+def parse_listing(body: bytes, encoding: str = "utf-8") -> Listing:
+    """
+    Parse an arXiv /new listing page.
+
+    Entries without an ``itemN`` anchor, an Abstract link or a following
+    ``dd`` are dropped, as ArxivSpider.parse did.
+
+    Args:
+        body: Raw response body
+        encoding: Response encoding
+
+    Returns:
+        Listing with section anchors and entries in page order
+    """
+    parser = etree.HTMLParser(recover=True, encoding=encoding)
+    root = etree.fromstring(body, parser=parser)
+    if root is None:
+        return Listing([], [])
+
+    anchors = []
+    for li in root.xpath('//div[@id="dlpage"]//ul//li'):
+        href = None
+        for a in li.iter("a"):
+            href = a.get("href")
+            if href is not None:
+                break
+        if href and "item" in href:
+            anchors.append(int(href.split("item")[-1]))
+
+    entries = []
+    for dt in root.xpath("//dl//dt"):
+        name = None
+        abstract_link = None
+        for a in dt.iter("a"):
+            if name is None:
+                candidate = a.get("name")
+                if candidate is not None and candidate.startswith("item"):
+                    name = candidate
+            if abstract_link is None and a.get("title") == "Abstract":
+                abstract_link = a.get("href")
+        if not name:
+            continue
+        anchor = int(name.split("item")[-1])
+        if not abstract_link:
+            continue
+
+        dd = dt.getnext()
+        while dd is not None and dd.tag != "dd":
+            dd = dd.getnext()
+        if dd is None:
+            continue
+
+        subjects_text, secondary = _subjects(dd)
+        categories = tuple(_CATEGORY_RE.findall(subjects_text)) if subjects_text else ()
+        entries.append(ListingEntry(
+            anchor=anchor,
+            arxiv_id=abstract_link.split("/")[-1],
+            subjects_text=subjects_text,
+            categories=categories,
+            secondary=secondary,
+        ))
+
+    return Listing(anchors, entries)
+
+
+def _subjects(dd) -> Tuple[Optional[str], Tuple[str, ...]]:
+    """
+    Primary subject text and secondary category codes of one entry.
+
+    Mirrors ``.list-subjects .primary-subject::text`` with the
+    ``.list-subjects::text`` fallback.
+    """
+    blocks = [el for el in dd.iter() if _has_class(el, "list-subjects")]
+
+    for block in blocks:
+        for el in block.iter():
+            if el is block or not _has_class(el, "primary-subject"):
+                continue
+            text = _first_text(el)
+            if text is not None:
+                # 主分类 span 之后的文本即交叉分类，如 "; Machine Learning (cs.LG)"
+                return text, tuple(_CATEGORY_RE.findall(el.tail or ""))
+
+    for block in blocks:
+        text = _first_text(block)
+        if text is not None:
+            return text, ()
+    return None, ()
+
+
+def _has_class(el, name: str) -> bool:
+    classes = el.get("class") if isinstance(el.tag, str) else None
+    return bool(classes) and name in classes.split()
+
+
+def _first_text(el) -> Optional[str]:
+    """First direct text node of ``el`` (what ``::text`` returns with ``.get()``)."""
+    if el.text is not None:
+        return el.text
+    for child in el:
+        if child.tail is not None:
+            return child.tail
+    return None
@@ -3,7 +3,13 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import re
+import time
+
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.downloadermiddlewares.httpcache import HttpCacheMiddleware
+from scrapy.extensions.httpcache import RFC2616Policy, rfc1123_to_epoch
 
 # useful for handling different item types with a single interface
 
@@ -100,3 +106,188 @@ class DailyArxivDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class DailyArxivCachePolicy(RFC2616Policy):
+    """
+    HTTP cache policy with per-URL TTLs and an offline replay mode.
+
+    ``HTTPCACHE_TTL_RULES`` maps URL regexes to a TTL in seconds (0 = never
+    expires). Spiders override the rules in ``custom_settings``, which gives
+    each spider its own policy: arXiv ``/new`` pages expire quickly, NeurIPS
+    detail pages are kept for good. A cached page older than its TTL is
+    revalidated with If-None-Match / If-Modified-Since, and a 304 answer
+    reuses the stored body. URLs without a rule follow plain RFC 2616
+    semantics. Responses without a ``Date`` header are aged from the time the
+    cache storage saved them.
+
+    With ``HTTPCACHE_OFFLINE`` every cached response is served as fresh and
+    nothing is revalidated, which makes benchmark runs reproducible.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.offline = settings.getbool("HTTPCACHE_OFFLINE")
+        self.ttl_rules = [
+            (re.compile(pattern), int(ttl))
+            for pattern, ttl in settings.getdict("HTTPCACHE_TTL_RULES").items()
+        ]
+
+    def _ttl_for(self, url):
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return None
+
+    def should_cache_response(self, response, request):
+        if response.status == 200 and self._ttl_for(request.url) is not None:
+            return True
+        return super().should_cache_response(response, request)
+
+    def is_cached_response_fresh(self, cachedresponse, request):
+        if self.offline:
+            return True
+
+        ttl = self._ttl_for(request.url)
+        if ttl is None:
+            return super().is_cached_response_fresh(cachedresponse, request)
+        if ttl == 0:
+            return True
+
+        date = rfc1123_to_epoch(cachedresponse.headers.get(b"Date"))
+        if date is None:
+            # 没有 Date 头时按写入缓存的时间计算 / No Date header: age from when the storage saved it
+            date = request.meta.get("cache_timestamp")
+        if date is not None and time.time() - date < ttl:
+            return True
+
+        # 过期：带上 ETag / Last-Modified 条件头重新验证 / Stale: revalidate conditionally
+        self._set_conditional_validators(request, cachedresponse)
+        return False
+
+
+class DailyArxivHttpCacheMiddleware(HttpCacheMiddleware):
+    """
+    Scrapy's HttpCacheMiddleware plus the offline replay switch.
+
+    In offline mode (``HTTPCACHE_OFFLINE``) requests missing from the cache
+    are dropped instead of going to the network.
+
+    Usage:
+        scrapy crawl arxiv -s HTTPCACHE_ENABLED=1                        # cache + revalidate
+        scrapy crawl arxiv -s HTTPCACHE_ENABLED=1 -s HTTPCACHE_OFFLINE=1 # replay only
+    """
+
+    def __init__(self, settings, stats):
+        super().__init__(settings, stats)
+        if settings.getbool("HTTPCACHE_OFFLINE"):
+            self.ignore_missing = True
+
+
+class AdaptiveConcurrencyMiddleware:
+    """
+    Per-domain adaptive concurrency for the downloader.
+
+    Every download slot (one per domain) starts at the configured
+    CONCURRENT_REQUESTS_PER_DOMAIN / DOWNLOAD_DELAY. Healthy responses (below
+    ``ADAPTIVE_CONCURRENCY_TARGET_LATENCY``) shorten the delay and, once per
+    ``concurrency`` healthy responses, add one concurrent request up to
+    ``ADAPTIVE_CONCURRENCY_MAX``. A 429/5xx response or a download error halves
+    the concurrency and doubles the delay (at least the server's Retry-After).
+
+    Enabled with ``-s ADAPTIVE_CONCURRENCY_ENABLED=1``. It must sit above
+    RetryMiddleware (550) so it sees throttled responses before they are retried.
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        if not settings.getbool("ADAPTIVE_CONCURRENCY_ENABLED"):
+            raise NotConfigured
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.max_concurrency = settings.getint("ADAPTIVE_CONCURRENCY_MAX", 8)
+        self.target_latency = settings.getfloat("ADAPTIVE_CONCURRENCY_TARGET_LATENCY", 2.0)
+        self.min_delay = settings.getfloat("ADAPTIVE_CONCURRENCY_MIN_DELAY", 0.0)
+        self.max_delay = settings.getfloat("ADAPTIVE_CONCURRENCY_MAX_DELAY", 60.0)
+        self.backoff_codes = set(
+            int(code) for code in settings.getlist("ADAPTIVE_CONCURRENCY_BACKOFF_CODES", [429, 500, 502, 503, 504])
+        )
+        self._healthy = {}  # slot key -> healthy responses since last change
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        s = cls(crawler)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def process_response(self, request, response, spider):
+        key, slot = self._slot(request)
+        if slot is None:
+            return response
+
+        if response.status in self.backoff_codes:
+            self._backoff(key, slot, spider, self._retry_after(response))
+            return response
+
+        latency = request.meta.get("download_latency")
+        if latency is None:
+            # 缓存命中等未经网络的响应 / Not downloaded (e.g. served from the HTTP cache)
+            return response
+        if latency <= self.target_latency:
+            self._ramp_up(key, slot, spider)
+        else:
+            self._healthy[key] = 0
+        return response
+
+    def process_exception(self, request, exception, spider):
+        key, slot = self._slot(request)
+        if slot is not None:
+            self._backoff(key, slot, spider)
+        return None
+
+    def _slot(self, request):
+        key = request.meta.get("download_slot")
+        if key is None or self.crawler.engine is None:
+            return key, None
+        return key, self.crawler.engine.downloader.slots.get(key)
+
+    def _ramp_up(self, key, slot, spider):
+        if slot.delay > self.min_delay:
+            slot.delay = max(self.min_delay, slot.delay * 0.75)
+            if slot.delay < 0.05:
+                slot.delay = self.min_delay
+
+        healthy = self._healthy.get(key, 0) + 1
+        if healthy >= slot.concurrency and slot.concurrency < self.max_concurrency:
+            slot.concurrency += 1
+            healthy = 0
+            self.stats.inc_value("adaptive/ramp_up")
+            self.stats.max_value("adaptive/max_concurrency", slot.concurrency)
+            spider.logger.debug(f"[{key}] concurrency -> {slot.concurrency}, delay {slot.delay:.2f}s")
+        self._healthy[key] = healthy
+
+    def _backoff(self, key, slot, spider, retry_after=0.0):
+        slot.concurrency = max(1, slot.concurrency // 2)
+        slot.delay = min(self.max_delay, max(slot.delay * 2, retry_after, 0.5))
+        self._healthy[key] = 0
+        self.stats.inc_value("adaptive/backoff")
+        spider.logger.info(f"[{key}] backing off: concurrency {slot.concurrency}, delay {slot.delay:.2f}s")
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get(b"Retry-After")
+        if not value:
+            return 0.0
+        try:
+            return float(value)
+        except ValueError:
+            epoch = rfc1123_to_epoch(value)
+            return max(0.0, epoch - time.time()) if epoch is not None else 0.0
+
+    def spider_closed(self, spider):
+        if self.crawler.engine is None:
+            return
+        for key, slot in self.crawler.engine.downloader.slots.items():
+            spider.logger.info(
+                f"Adaptive concurrency [{key}]: final concurrency {slot.concurrency}, delay {slot.delay:.2f}s"
+            )
@@ -8,25 +8,321 @@
 import arxiv
 import json
 import os
+import re
 import sys
+import time
 from datetime import datetime, timedelta
+from typing import Optional
+
+from scrapy.exceptions import DropItem
+from twisted.internet import defer, threads
+
+from daily_arxiv.cache import MetadataCache
+
+
+def strip_version(short_id: str) -> str:
+    """2401.12345v2 -> 2401.12345"""
+    return re.sub(r"v\d+$", "", short_id)
+
+
+def parse_version(short_id: str) -> int:
+    """2401.12345v2 -> 2 (1 when the ID carries no version)"""
+    match = re.search(r"v(\d+)$", short_id)
+    return int(match.group(1)) if match else 1
 
 
 class DailyArxivPipeline:
-    def __init__(self):
-        self.page_size = 100
+    """
+    Fill arXiv metadata (authors, title, categories, comment, summary) for
+    scraped items.
+
+    Items are buffered and resolved with one ``arxiv.Search(id_list=...)`` per
+    batch of up to ``page_size`` IDs. The blocking arxiv client runs in the
+    reactor thread pool, and ``process_item`` returns a Deferred that fires
+    once the item's batch has been resolved, so the reactor keeps downloading
+    and parsing while lookups are in flight.
+
+    A batch is flushed when it is full, or ``flush_interval`` seconds after
+    its first item arrived (otherwise the last, partial batch would keep the
+    scraper busy forever and the spider would never go idle).
+
+    When ``cache`` is given, papers already in the local MetadataCache are
+    filled in immediately and never reach arXiv. The cache is only consulted
+    for the exact version the listing announced (see ``_listing_version``);
+    papers whose version is unknown, such as cross-lists that may have been
+    revised, are always looked up so a replacement never gets stale metadata.
+    """
+
+    def __init__(self, page_size: int = 100, flush_interval: float = 2.0,
+                 cache: Optional[MetadataCache] = None, stats=None):
+        self.page_size = page_size
+        self.flush_interval = flush_interval
         self.client = arxiv.Client(self.page_size)
+        self.cache = cache
+        self.stats = stats
+
+        self._pending = []  # [(item, Deferred)]
+        self._flush_call = None
+        # arxiv.Client keeps its own rate-limit state, so batches go one at a time
+        self._lookup_lock = defer.DeferredLock()
+
+        # Statistics
+        self._batch_latencies = []
+        self._looked_up = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        cache = None
+        if settings.getbool("ARXIV_CACHE_ENABLED", True):
+            cache = MetadataCache(
+                settings.get("ARXIV_CACHE_PATH", ".cache/arxiv_metadata.sqlite"),
+                ttl=settings.getfloat("ARXIV_CACHE_TTL_DAYS", 30) * 86400,
+                max_entries=settings.getint("ARXIV_CACHE_MAX_ENTRIES", 200000),
+            )
+        return cls(
+            page_size=settings.getint("ARXIV_PAGE_SIZE", 100),
+            flush_interval=settings.getfloat("ARXIV_BATCH_FLUSH_SECS", 2.0),
+            cache=cache,
+            stats=crawler.stats,
+        )
 
     def process_item(self, item: dict, spider):
         item["pdf"] = f"https://arxiv.org/pdf/{item['id']}"
         item["abs"] = f"https://arxiv.org/abs/{item['id']}"
-        search = arxiv.Search(
-            id_list=[item["id"]],
+
+        version = self._listing_version(item, spider)
+        if self.cache is not None and version is None:
+            self._inc_stat("arxiv_cache/bypass")
+        elif self.cache is not None:
+            cached = self.cache.get(strip_version(item["id"]), version)
+            self._inc_stat("arxiv_cache/hit" if cached is not None else "arxiv_cache/miss")
+            if cached is not None:
+                item.update(cached)
+                return item
+
+        d = defer.Deferred()
+        self._pending.append((item, d))
+        if len(self._pending) >= self.page_size:
+            self._flush(spider)
+        elif self._flush_call is None:
+            from twisted.internet import reactor
+
+            self._flush_call = reactor.callLater(self.flush_interval, self._flush, spider)
+        return d
+
+    @staticmethod
+    def _listing_version(item: dict, spider) -> Optional[int]:
+        """
+        Version announced for ``item``: an explicit vN suffix on the ID, else
+        the version the spider recorded from the listing (1 for new
+        submissions), else None when it is unknown.
+        """
+        if re.search(r"v\d+$", item["id"]):
+            return parse_version(item["id"])
+        return getattr(spider, "listing_versions", {}).get(item["id"])
+
+    def close_spider(self, spider):
+        if self._flush_call is not None and self._flush_call.active():
+            self._flush_call.cancel()
+        self._flush_call = None
+
+        if self.cache is not None:
+            spider.logger.info(
+                f"arXiv metadata cache: {self.cache.hits} hits, {self.cache.misses} misses "
+                f"(hit rate {self.cache.hit_rate:.1%})"
+            )
+            self.cache.close()
+
+        if not self._batch_latencies:
+            return
+
+        total_time = sum(self._batch_latencies)
+        rate = self._looked_up / total_time if total_time > 0 else 0.0
+        spider.logger.info(
+            f"arXiv metadata lookup: {self._looked_up} items in {len(self._batch_latencies)} batches, "
+            f"batch latency avg={total_time / len(self._batch_latencies):.2f}s "
+            f"max={max(self._batch_latencies):.2f}s, {rate:.1f} items/sec"
+        )
+
+    def _flush(self, spider):
+        """Send the buffered items to arXiv as one batch."""
+        if self._flush_call is not None and self._flush_call.active():
+            self._flush_call.cancel()
+        self._flush_call = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        ids = [item["id"] for item, _ in batch]
+        d = self._lookup_lock.run(threads.deferToThread, self._lookup, ids)
+        d.addCallbacks(
+            self._resolve_batch,
+            self._fail_batch,
+            callbackArgs=(batch, spider),
+            errbackArgs=(batch, spider),
         )
-        paper = next(self.client.results(search))
-        item["authors"] = [a.name for a in paper.authors]
-        item["title"] = paper.title
-        item["categories"] = paper.categories
-        item["comment"] = paper.comment
-        item["summary"] = paper.summary
-        return item
\ No newline at end of file
+
+    def _lookup(self, ids: list) -> tuple:
+        """Runs in a worker thread: fetch metadata for ``ids`` in one query."""
+        start = time.perf_counter()
+        search = arxiv.Search(id_list=ids, max_results=len(ids))
+        papers = {}
+        for paper in self.client.results(search):
+            short_id = paper.get_short_id()
+            papers[strip_version(short_id)] = (parse_version(short_id), {
+                "authors": [a.name for a in paper.authors],
+                "title": paper.title,
+                "categories": paper.categories,
+                "comment": paper.comment,
+                "summary": paper.summary,
+            })
+        return papers, time.perf_counter() - start
+
+    def _resolve_batch(self, result, batch, spider):
+        papers, latency = result
+        self._batch_latencies.append(latency)
+        self._looked_up += len(batch)
+        spider.logger.debug(f"Resolved batch of {len(batch)} ids in {latency:.2f}s")
+
+        if self.cache is not None:
+            self.cache.put_many(
+                (arxiv_id, version, metadata) for arxiv_id, (version, metadata) in papers.items()
+            )
+
+        for item, d in batch:
+            found = papers.get(item["id"])
+            if found is None:
+                d.errback(DropItem(f"arXiv returned no metadata for {item['id']}"))
+                continue
+            item.update(found[1])
+            d.callback(item)
+
+    def _fail_batch(self, failure, batch, spider):
+        spider.logger.error(f"arXiv metadata lookup failed for {len(batch)} items: {failure.value}")
+        for _, d in batch:
+            d.errback(failure)
+
+    def _inc_stat(self, key: str) -> None:
+        if self.stats is not None:
+            self.stats.inc_value(key)
+
+
+class ConferenceShardPipeline:
+    """
+    Write conference items to one JSONL shard per (year, track).
+
+    Only active when the spider has a ``shard_dir`` (``-a shard_dir=../data``);
+    otherwise items pass through to the normal feed exports. Shards are named
+    ``{conference}-{year}-{track}.jsonl`` from the item ID
+    (``neurips2024_oral_97958`` -> ``neurips-2024-oral.jsonl``). Resumed crawls
+    (a JOBDIR that already holds a saved ``spider.state``) append to existing
+    shards, since the spider skips papers scheduled by the earlier run; fresh
+    crawls overwrite them.
+
+    When the spider closes, the entries for every shard in
+    ``CONFERENCE_LIST_PATH`` are updated with the shard's line count (new
+    entries are added for shards not listed yet).
+    """
+
+    ID_PATTERN = re.compile(r"^([a-z]+)(\d{4})_([a-z]+)_")
+    DISPLAY_NAMES = {"neurips": "NeurIPS"}
+
+    def __init__(self, conference_list_path: Optional[str] = None, language: str = "Chinese",
+                 resume: bool = False):
+        self.conference_list_path = conference_list_path
+        self.language = language
+        self.shard_dir = None
+        self._files = {}  # (conference, year, track) -> file object
+        self._append = resume
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        # Pipelines are opened before spider_opened, so spider.state is not
+        # loaded yet; the SpiderState file left by an earlier run marks a resume.
+        jobdir = crawler.settings.get("JOBDIR")
+        return cls(
+            conference_list_path=crawler.settings.get("CONFERENCE_LIST_PATH"),
+            language=os.environ.get("LANGUAGE", "Chinese"),
+            resume=bool(jobdir) and os.path.exists(os.path.join(jobdir, "spider.state")),
+        )
+
+    def open_spider(self, spider):
+        self.shard_dir = getattr(spider, "shard_dir", None)
+        if self.shard_dir:
+            os.makedirs(self.shard_dir, exist_ok=True)
+
+    def process_item(self, item: dict, spider):
+        if not self.shard_dir:
+            return item
+
+        match = self.ID_PATTERN.match(item.get("id", ""))
+        if not match:
+            spider.logger.warning(f"Cannot derive shard for item id {item.get('id')!r}, not sharded")
+            return item
+
+        key = match.groups()
+        f = self._files.get(key)
+        if f is None:
+            f = open(self._shard_path(key), "a" if self._append else "w", encoding="utf-8")
+            self._files[key] = f
+        f.write(json.dumps(dict(item), ensure_ascii=False) + "\n")
+        return item
+
+    def close_spider(self, spider):
+        for f in self._files.values():
+            f.close()
+        if not self._files:
+            return
+
+        counts = {}
+        for key in self._files:
+            with open(self._shard_path(key), "r", encoding="utf-8") as f:
+                counts[key] = sum(1 for line in f if line.strip())
+        for (conference, year, track), count in sorted(counts.items()):
+            spider.logger.info(f"Shard {conference}-{year}-{track}.jsonl: {count} papers")
+
+        if self.conference_list_path:
+            self._update_conference_list(counts, spider)
+
+    def _shard_path(self, key) -> str:
+        conference, year, track = key
+        return os.path.join(self.shard_dir, f"{conference}-{year}-{track}.jsonl")
+
+    def _update_conference_list(self, counts: dict, spider) -> None:
+        """Set accurate paper counts in assets/conference-list.json."""
+        path = self.conference_list_path
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        else:
+            data = {"conferences": []}
+        entries = {entry.get("id"): entry for entry in data.setdefault("conferences", [])}
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        for (conference, year, track), count in counts.items():
+            conf_id = f"{conference}{year}_{track}"
+            entry = entries.get(conf_id)
+            if entry is None:
+                name = f"{self.DISPLAY_NAMES.get(conference, conference.upper())} {year} {track.capitalize()}"
+                entry = {
+                    "id": conf_id,
+                    "name": name,
+                    "year": int(year),
+                    "category": track,
+                    "file": f"{conference}-{year}-{track}_AI_enhanced_{self.language}.jsonl",
+                    "count": count,
+                    "date": today,
+                    "description": f"{name} presentations",
+                }
+                data["conferences"].append(entry)
+                entries[conf_id] = entry
+            else:
+                entry["count"] = count
+
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(path + ".tmp", path)
+        spider.logger.info(f"Updated {len(counts)} entries in {path}")
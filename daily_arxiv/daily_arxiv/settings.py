@@ -50,9 +50,23 @@ ROBOTSTXT_OBEY = True
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-# DOWNLOADER_MIDDLEWARES = {
-#    "daily_arxiv.middlewares.DailyArxivDownloaderMiddleware": 543,
-# }
+DOWNLOADER_MIDDLEWARES = {
+    # 替换内置 HTTP 缓存中间件（增加离线回放）/ Replace built-in HTTP cache (adds offline replay)
+    "scrapy.downloadermiddlewares.httpcache.HttpCacheMiddleware": None,
+    "daily_arxiv.middlewares.DailyArxivHttpCacheMiddleware": 900,
+    # 自适应并发（默认关闭）/ Adaptive per-domain concurrency (off unless enabled below)
+    "daily_arxiv.middlewares.AdaptiveConcurrencyMiddleware": 590,
+}
+
+# 自适应并发：健康时逐步提高并发、遇到 429/5xx 减半 / Ramp up while healthy, halve on 429/5xx
+# 通过 -s ADAPTIVE_CONCURRENCY_ENABLED=1 开启 / Enable with -s ADAPTIVE_CONCURRENCY_ENABLED=1
+ADAPTIVE_CONCURRENCY_ENABLED = False
+ADAPTIVE_CONCURRENCY_START = 1
+ADAPTIVE_CONCURRENCY_MAX = 8
+ADAPTIVE_CONCURRENCY_TARGET_LATENCY = 2.0
+ADAPTIVE_CONCURRENCY_MIN_DELAY = 0.0
+ADAPTIVE_CONCURRENCY_MAX_DELAY = 60.0
+ADAPTIVE_CONCURRENCY_BACKOFF_CODES = [429, 500, 502, 503, 504]
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
@@ -69,6 +83,29 @@ ITEM_PIPELINES = {
     "daily_arxiv.pipelines.DailyArxivPipeline": 300,
 }
 
+# arXiv 元数据批量查询 / Batched arXiv metadata lookup
+# 每批最多查询的论文数（即 arxiv.Client 的 page_size）/ Max IDs per id_list query
+ARXIV_PAGE_SIZE = 100
+# 未满的批次最多等待多少秒后发出 / Seconds a partial batch waits before it is sent
+ARXIV_BATCH_FLUSH_SECS = 2.0
+
+# arXiv 元数据本地缓存 / Local arXiv metadata cache (SQLite)
+# 已缓存的论文不再请求 arXiv / Cached papers are filled in without a network call
+ARXIV_CACHE_ENABLED = True
+ARXIV_CACHE_PATH = ".cache/arxiv_metadata.sqlite"
+# 超过该天数的条目视为过期并被清除（0 表示永不过期）/ Entries older than this are evicted (0 = never)
+ARXIV_CACHE_TTL_DAYS = 30
+# 超过该条数时淘汰最旧的条目 / Oldest rows are dropped beyond this size
+ARXIV_CACHE_MAX_ENTRIES = 200000
+
+# NeurIPS 论文 ID -> OpenReview 链接索引 / neurips.cc paper ID -> OpenReview link index
+# 已解析的论文不再请求详情页 / Resolved papers skip the detail-page request
+NEURIPS_INDEX_ENABLED = True
+NEURIPS_INDEX_PATH = ".cache/neurips_openreview.sqlite"
+
+# 会议分片输出完成后更新的会议列表（相对 daily_arxiv 目录）/ Conference list updated after sharded crawls
+CONFERENCE_LIST_PATH = "../assets/conference-list.json"
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 # AUTOTHROTTLE_ENABLED = True
@@ -84,11 +121,20 @@ ITEM_PIPELINES = {
 
 # Enable and configure HTTP caching (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-# HTTPCACHE_ENABLED = True
-# HTTPCACHE_EXPIRATION_SECS = 0
-# HTTPCACHE_DIR = "httpcache"
-# HTTPCACHE_IGNORE_HTTP_CODES = []
-# HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+# 本地调试时通过 -s HTTPCACHE_ENABLED=1 开启（run.sh 中设置 HTTPCACHE=1）/ Enable with -s HTTPCACHE_ENABLED=1 (HTTPCACHE=1 ./run.sh)
+HTTPCACHE_ENABLED = False
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+HTTPCACHE_POLICY = "daily_arxiv.middlewares.DailyArxivCachePolicy"
+# 忽略服务端的 no-cache，由下面的 TTL 规则决定新鲜度 / Freshness is decided by the TTL rules below
+HTTPCACHE_ALWAYS_STORE = True
+# URL 正则 -> 缓存秒数（0 表示永久）；爬虫可在 custom_settings 中覆盖
+# URL regex -> TTL in seconds (0 = never expires); spiders override in custom_settings
+HTTPCACHE_TTL_RULES = {
+    r"^https?://arxiv\.org/list/[^/]+/new": 3600,
+}
+# 离线回放：只使用缓存，未命中的请求直接丢弃 / Offline replay: serve from cache only, drop misses
+HTTPCACHE_OFFLINE = False
 
 # Set settings whose default value is deprecated to a future-proof value
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
@@ -1,6 +1,7 @@
 import scrapy
 import os
-import re
+
+from daily_arxiv.listing import parse_listing
 
 
 class ArxivSpider(scrapy.Spider):
@@ -13,65 +14,82 @@ class ArxivSpider(scrapy.Spider):
         self.start_urls = [
             f"https://arxiv.org/list/{cat}/new" for cat in self.target_categories
         ]  # 起始URL（计算机科学领域的最新论文）
+        # 已产出的论文（arXiv ID -> item），用于合并跨分类重复的论文
+        # Papers already yielded (arXiv ID -> item), used to merge cross-listed duplicates
+        self.seen_items = {}
+        # 列表页能确定的版本号（新提交一定是 v1），pipeline 只按这个版本读取元数据缓存
+        # Versions known from the listing (new submissions are always v1); the pipeline
+        # only reads the metadata cache for these
+        self.listing_versions = {}
 
     name = "arxiv"  # 爬虫名称
     allowed_domains = ["arxiv.org"]  # 允许爬取的域名
 
     def parse(self, response):
-        # 提取每篇论文的信息
-        anchors = []
-        for li in response.css("div[id=dlpage] ul li"):
-            href = li.css("a::attr(href)").get()
-            if href and "item" in href:
-                anchors.append(int(href.split("item")[-1]))
+        # 单次遍历解析列表页（dt/dd 成对提取）/ Single pass over the listing's dt/dd pairs
+        listing = parse_listing(response.body, response.encoding)
+        anchors = listing.anchors
+        # 第二个分区（交叉列表或替换）开始的位置 / Start of the second section (cross-lists or replacements)
+        new_section_end = anchors[1] if len(anchors) > 1 else None
 
         # 遍历每篇论文的详细信息
-        for paper in response.css("dl dt"):
-            paper_anchor = paper.css("a[name^='item']::attr(name)").get()
-            if not paper_anchor:
-                continue
-                
-            paper_id = int(paper_anchor.split("item")[-1])
-            if anchors and paper_id >= anchors[-1]:
+        for entry in listing.entries:
+            # 跳过最后一个分区（Replacements）/ Skip the last section (replacements)
+            if anchors and entry.anchor >= anchors[-1]:
                 continue
 
-            # 获取论文ID
-            abstract_link = paper.css("a[title='Abstract']::attr(href)").get()
-            if not abstract_link:
-                continue
-                
-            arxiv_id = abstract_link.split("/")[-1]
-            
-            # 获取对应的论文描述部分 (dd元素)
-            paper_dd = paper.xpath("following-sibling::dd[1]")
-            if not paper_dd:
-                continue
-            
-            # 提取论文分类信息 - 在subjects部分
-            subjects_text = paper_dd.css(".list-subjects .primary-subject::text").get()
-            if not subjects_text:
-                # 如果找不到主分类，尝试其他方式获取分类
-                subjects_text = paper_dd.css(".list-subjects::text").get()
-            
+            arxiv_id = entry.arxiv_id
+            subjects_text = entry.subjects_text
+            if new_section_end is not None and entry.anchor < new_section_end:
+                self.listing_versions[arxiv_id] = 1
+
             if subjects_text:
-                # 解析分类信息，通常格式如 "Computer Vision and Pattern Recognition (cs.CV)"
-                # 提取括号中的分类代码
-                categories_in_paper = re.findall(r'\(([^)]+)\)', subjects_text)
-                
+                # 分类信息通常格式如 "Computer Vision and Pattern Recognition (cs.CV)"
+                # 括号中的分类代码已由 parse_listing 提取
                 # 检查论文分类是否与目标分类有交集
-                paper_categories = set(categories_in_paper)
+                paper_categories = set(entry.categories)
                 if paper_categories.intersection(self.target_categories):
-                    yield {
-                        "id": arxiv_id,
-                        "categories": list(paper_categories),  # 添加分类信息用于调试
-                    }
-                    self.logger.info(f"Found paper {arxiv_id} with categories {paper_categories}")
+                    item = self._dedup(arxiv_id, paper_categories)
+                    if item is not None:
+                        yield item
+                        self.logger.info(f"Found paper {arxiv_id} with categories {paper_categories}")
                 else:
                     self.logger.debug(f"Skipped paper {arxiv_id} with categories {paper_categories} (not in target {self.target_categories})")
             else:
                 # 如果无法获取分类信息，记录警告但仍然返回论文（保持向后兼容）
                 self.logger.warning(f"Could not extract categories for paper {arxiv_id}, including anyway")
-                yield {
-                    "id": arxiv_id,
-                    "categories": [],
-                }
+                item = self._dedup(arxiv_id, set())
+                if item is not None:
+                    yield item
+
+    def _dedup(self, arxiv_id, paper_categories):
+        """
+        跨分类去重：同一篇论文出现在多个 /new 页面时只产出一次
+        Cross-listing dedup: a paper listed on several /new pages is yielded once
+
+        重复出现时把分类合并到已产出的 item 中（pipeline 仍在批量等待时会看到合并结果），
+        并返回 None；否则返回新 item。
+        On a repeat the categories are merged into the item already yielded (seen by the
+        pipeline while it is still waiting in a batch) and None is returned.
+        """
+        item = self.seen_items.get(arxiv_id)
+        if item is not None:
+            merged = set(item["categories"]) | paper_categories
+            item["categories"] = sorted(merged)
+            self.crawler.stats.inc_value("arxiv/dedup/lookups_saved")
+            self.logger.debug(f"Merged duplicate paper {arxiv_id}, categories now {merged}")
+            return None
+
+        item = {
+            "id": arxiv_id,
+            "categories": list(paper_categories),  # 添加分类信息用于调试
+        }
+        self.seen_items[arxiv_id] = item
+        return item
+
+    def closed(self, reason):
+        saved = self.crawler.stats.get_value("arxiv/dedup/lookups_saved", 0)
+        self.logger.info(
+            f"Yielded {len(self.seen_items)} unique papers, merged {saved} cross-listed duplicates "
+            f"(metadata lookups saved: {saved})"
+        )
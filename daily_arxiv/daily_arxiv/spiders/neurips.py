@@ -9,6 +9,8 @@ import scrapy
 from typing import Iterator, Dict, Optional
 import re
 
+from daily_arxiv.cache import OpenReviewIndex
+
 
 class NeuripsSpider(scrapy.Spider):
     """
@@ -17,55 +19,116 @@ class NeuripsSpider(scrapy.Spider):
     Supports:
     - Oral papers (default)
     - Spotlight papers (future)
-    - Multiple years
+    - Multiple years and tracks in one crawl, sharing the same throttling
 
     Usage:
         scrapy crawl neurips -o neurips-2024-oral.jsonl
         scrapy crawl neurips -a year=2024 -a category=oral
+
+    Multi-year / multi-track backfill, one JSONL per (year, track) in shard_dir
+    (also updates the counts in assets/conference-list.json):
+        scrapy crawl neurips -a year=2019,2020,2021,2022,2023,2024 \
+            -a category=oral,spotlight -a shard_dir=../data
+
+    Adaptive, resumable crawl (re-run the same command to continue after an
+    interruption; -o appends to the existing JSONL):
+        scrapy crawl neurips -a year=2024 -o neurips-2024-oral.jsonl \
+            -s ADAPTIVE_CONCURRENCY_ENABLED=1 -s JOBDIR=crawls/neurips-2024-oral
     """
 
     name = "neurips"
     allowed_domains = ["neurips.cc", "openreview.net"]
 
-    def __init__(self, year: str = "2024", category: str = "oral", *args, **kwargs):
+    def __init__(self, year: str = "2024", category: str = "oral",
+                 shard_dir: Optional[str] = None, *args, **kwargs):
         """
         Initialize NeurIPS spider.
 
         Args:
-            year: Conference year (default: "2024")
-            category: Paper category - "oral" or "spotlight" (default: "oral")
+            year: Conference year, or comma-separated years (default: "2024")
+            category: Paper category - "oral" or "spotlight", or comma-separated
+                (default: "oral")
+            shard_dir: Directory for per-(year, category) JSONL shards written by
+                ConferenceShardPipeline (default: no shards)
         """
         super().__init__(*args, **kwargs)
-        self.year = year
-        self.category = category.lower()
-        self.start_urls = [
-            f"https://neurips.cc/virtual/{year}/events/{self.category}"
-        ]
+        self.years = [y.strip() for y in str(year).split(',') if y.strip()]
+        self.tracks = [c.strip().lower() for c in category.split(',') if c.strip()]
+        self.shard_dir = shard_dir
 
         # Statistics counters
         self.failed_count = 0
         self.no_pdf_count = 0
+        self.detail_requests_avoided = 0
 
-        self.logger.info(f"NeurIPS Spider initialized: year={year}, category={category}")
+        # Persistent neurips.cc ID -> OpenReview index (opened in from_crawler)
+        self.openreview_index = None
 
-    # Custom settings: disable Pipeline + polite crawling
+        self.logger.info(f"NeurIPS Spider initialized: years={self.years}, categories={self.tracks}")
+
+    # Custom settings: no enrichment Pipeline + polite crawling
     custom_settings = {
-        'ITEM_PIPELINES': {},  # Disable Pipeline (spider outputs complete data)
+        # Spider outputs complete data; the only pipeline writes shards when shard_dir is set
+        'ITEM_PIPELINES': {'daily_arxiv.pipelines.ConferenceShardPipeline': 300},
         'DOWNLOAD_DELAY': 1,   # 1 second between requests
         'CONCURRENT_REQUESTS': 1,  # Single-threaded crawling
         'ROBOTSTXT_OBEY': True,
         'RETRY_TIMES': 3,
         'RETRY_HTTP_CODES': [500, 502, 503, 504, 408, 429],
         'DOWNLOAD_TIMEOUT': 30,
+        # HTTP cache policy (only used with -s HTTPCACHE_ENABLED=1):
+        # detail pages never change, list pages are refreshed daily
+        'HTTPCACHE_TTL_RULES': {
+            r'neurips\.cc/virtual/\d+/(?:oral|spotlight)/\d+': 0,
+            r'neurips\.cc/virtual/\d+/events/': 86400,
+        },
     }
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        if crawler.settings.getbool('NEURIPS_INDEX_ENABLED', True):
+            spider.openreview_index = OpenReviewIndex(
+                crawler.settings.get('NEURIPS_INDEX_PATH', '.cache/neurips_openreview.sqlite')
+            )
+        return spider
+
+    @classmethod
+    def update_settings(cls, settings):
+        """
+        Apply custom_settings, then lift the single-request limit in adaptive mode.
+
+        With ADAPTIVE_CONCURRENCY_ENABLED the crawl starts at the polite
+        1 request / 1 s pace and AdaptiveConcurrencyMiddleware raises or lowers
+        per-domain concurrency from there.
+        """
+        super().update_settings(settings)
+        if settings.getbool('ADAPTIVE_CONCURRENCY_ENABLED'):
+            settings.setdict({
+                'CONCURRENT_REQUESTS': settings.getint('ADAPTIVE_CONCURRENCY_MAX', 8) * 2,
+                'CONCURRENT_REQUESTS_PER_DOMAIN': settings.getint('ADAPTIVE_CONCURRENCY_START', 1),
+            }, priority='spider')
+
+    def start_requests(self):
+        """One list page per (year, category); all share the same download slot."""
+        for year in self.years:
+            for category in self.tracks:
+                yield scrapy.Request(
+                    f"https://neurips.cc/virtual/{year}/events/{category}",
+                    callback=self.parse,
+                    meta={'year': year, 'category': category},
+                    dont_filter=True,
+                )
+
     def parse(self, response):
         """
         Parse the NeurIPS papers list page.
 
         Extracts basic paper information and generates requests for detail pages.
         """
-        self.logger.info("Parsing NeurIPS list page...")
+        year = response.meta['year']
+        category = response.meta['category']
+        self.logger.info(f"Parsing NeurIPS {year} {category} list page...")
 
         papers_found = 0
 
@@ -114,21 +177,75 @@ class NeuripsSpider(scrapy.Spider):
                 'authors': authors if authors else [],
                 'summary': abstract_text.strip() if isinstance(abstract_text, str) else abstract_text,
                 'abs': detail_url,
-                'categories': [f"NeurIPS {self.year} {self.category.capitalize()}"],
+                'categories': [f"NeurIPS {year} {category.capitalize()}"],
                 'comment': None,
                 'source': 'neurips',
             }
 
+            # On resume (JOBDIR), skip papers already scheduled in a previous run:
+            # they were either written out already or are restored from the
+            # persisted request queue
+            if self._already_scheduled(detail_url):
+                continue
+
+            # Papers resolved by an earlier crawl skip the detail request entirely
+            indexed = self._from_index(item, detail_url, year, category)
+            if indexed is not None:
+                yield indexed
+                continue
+
             # Request detail page to get OpenReview link
             yield scrapy.Request(
                 detail_url,
                 callback=self.parse_detail,
-                meta={'item': item},
+                meta={'item': item, 'year': year, 'category': category},
                 errback=self.errback_detail,
                 dont_filter=True,
             )
 
-        self.logger.info(f"Found {papers_found} papers on list page")
+        self.logger.info(f"Found {papers_found} papers on {year} {category} list page")
+
+    def _from_index(self, item: Dict, detail_url: str, year: str, category: str) -> Optional[Dict]:
+        """
+        Complete an item from the OpenReview index without fetching its detail page.
+
+        Returns:
+            The completed item, or None if the paper has not been resolved before
+        """
+        if self.openreview_index is None:
+            return None
+        paper_id = self._extract_paper_id(detail_url)
+        if not paper_id:
+            return None
+        entry = self.openreview_index.get(year, paper_id)
+        if entry is None:
+            return None
+
+        item['id'] = f"neurips{year}_{category}_{paper_id}"
+        item['pdf'] = entry['pdf']
+        self.detail_requests_avoided += 1
+        self.crawler.stats.inc_value('neurips/detail_requests_avoided')
+        return item
+
+    def _already_scheduled(self, detail_url: str) -> bool:
+        """
+        Record a detail URL in the persisted spider state.
+
+        ``self.state`` only exists when JOBDIR is set; it is pickled on close
+        and restored on the next run together with the request queue.
+
+        Returns:
+            True if the URL was scheduled by an earlier run
+        """
+        state = getattr(self, 'state', None)
+        if state is None:
+            return False
+        scheduled = state.setdefault('scheduled_details', set())
+        if detail_url in scheduled:
+            self.crawler.stats.inc_value('neurips/resume/skipped')
+            return True
+        scheduled.add(detail_url)
+        return False
 
     def parse_detail(self, response):
         """
@@ -137,16 +254,18 @@ class NeuripsSpider(scrapy.Spider):
         Extracts OpenReview forum link and generates PDF URL.
         """
         item = response.meta['item']
+        year = response.meta['year']
+        category = response.meta['category']
 
         # Extract paper ID from URL (e.g., /virtual/2024/oral/97958 -> 97958)
         paper_id = self._extract_paper_id(response.url)
         if paper_id:
-            item['id'] = f"neurips{self.year}_{self.category}_{paper_id}"
+            item['id'] = f"neurips{year}_{category}_{paper_id}"
         else:
             # Fallback: use URL hash
             import hashlib
             url_hash = hashlib.md5(response.url.encode()).hexdigest()[:8]
-            item['id'] = f"neurips{self.year}_{self.category}_{url_hash}"
+            item['id'] = f"neurips{year}_{category}_{url_hash}"
             self.logger.warning(f"Could not extract paper ID from {response.url}, using hash: {item['id']}")
 
         # Extract OpenReview link
@@ -156,6 +275,8 @@ class NeuripsSpider(scrapy.Spider):
             item['pdf'] = self._generate_pdf_url(openreview_link)
             if item['pdf']:
                 self.logger.debug(f"OpenReview link found: {openreview_link}")
+                if paper_id and self.openreview_index is not None:
+                    self.openreview_index.put(year, paper_id, openreview_link, item['pdf'])
             else:
                 self.no_pdf_count += 1
                 self.logger.info(f"No OpenReview link found for {item['id']}, PDF field left empty")
@@ -173,9 +294,10 @@ class NeuripsSpider(scrapy.Spider):
         Outputs item with basic info but empty PDF field.
         """
         self.failed_count += 1
-        item = failure.request.meta['item']
+        meta = failure.request.meta
+        item = meta['item']
         item['pdf'] = ""
-        item['id'] = f"neurips{self.year}_{self.category}_unknown_{self.failed_count}"
+        item['id'] = f"neurips{meta['year']}_{meta['category']}_unknown_{self.failed_count}"
 
         self.logger.error(f"Failed to fetch detail page for '{item['title'][:50]}...': {failure.value}")
         self.logger.info(f"Outputting basic info without PDF for {item['id']}")
@@ -267,9 +389,14 @@ class NeuripsSpider(scrapy.Spider):
         Successful items: {total}
         Failed detail pages: {self.failed_count}
         Papers without PDF: {self.no_pdf_count}
+        Skipped (scheduled by an earlier run): {self.crawler.stats.get_value('neurips/resume/skipped', 0)}
+        Detail requests avoided (OpenReview index): {self.detail_requests_avoided}
         ======================================
         """)
 
+        if self.openreview_index is not None:
+            self.openreview_index.close()
+
         # Alert if failure rate is too high
         if failed_rate > 0.5:
             self.logger.error(
@@ -0,0 +1,86 @@
+"""
+ConferenceShardPipeline: resumed JOBDIR crawls keep the shards of earlier runs.
+
+Each pass is a real crawl in a subprocess (the Twisted reactor cannot be
+restarted), so the pipeline is opened in the same order as in production:
+before SpiderState loads ``spider.state``.
+
+Usage:
+    python -m pytest daily_arxiv/tests
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import scrapy  # noqa: E402
+
+
+class ResumableSpider(scrapy.Spider):
+    """Yields one item per paper ID, skipping IDs recorded in the persisted state (like NeurIPSSpider)."""
+
+    name = "shard_test"
+    start_urls = ["data:,"]
+    custom_settings = {
+        "ITEM_PIPELINES": {"daily_arxiv.pipelines.ConferenceShardPipeline": 300},
+    }
+
+    def __init__(self, ids: str = "", shard_dir: str = None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ids = ids.split(",")
+        self.shard_dir = shard_dir
+
+    def parse(self, response):
+        state = getattr(self, "state", {})
+        seen = state.setdefault("scheduled", set())
+        for paper_id in self.ids:
+            if paper_id in seen:
+                continue
+            seen.add(paper_id)
+            yield {"id": f"neurips2024_oral_{paper_id}"}
+
+
+def _crawl(ids: str, shard_dir: str, jobdir: str = None) -> None:
+    args = [sys.executable, __file__, ids, shard_dir] + ([jobdir] if jobdir else [])
+    subprocess.run(args, check=True, cwd=PROJECT_DIR)
+
+
+def _shard_ids(shard_dir: str) -> list:
+    with open(os.path.join(shard_dir, "neurips-2024-oral.jsonl"), encoding="utf-8") as f:
+        return [json.loads(line)["id"] for line in f if line.strip()]
+
+
+def test_resumed_crawl_appends_to_shards(tmp_path):
+    shard_dir, jobdir = str(tmp_path / "data"), str(tmp_path / "job")
+
+    _crawl("1,2", shard_dir, jobdir)
+    _crawl("1,2,3", shard_dir, jobdir)
+
+    assert _shard_ids(shard_dir) == ["neurips2024_oral_1", "neurips2024_oral_2", "neurips2024_oral_3"]
+
+
+def test_fresh_crawl_overwrites_shards(tmp_path):
+    shard_dir = str(tmp_path / "data")
+
+    _crawl("1,2", shard_dir, str(tmp_path / "job-a"))
+    _crawl("3", shard_dir, str(tmp_path / "job-b"))
+    assert _shard_ids(shard_dir) == ["neurips2024_oral_3"]
+
+    _crawl("4", shard_dir)
+    assert _shard_ids(shard_dir) == ["neurips2024_oral_4"]
+
+
+if __name__ == "__main__":
+    from scrapy.crawler import CrawlerProcess
+
+    ids, shard_dir, *rest = sys.argv[1:]
+    settings = {"LOG_LEVEL": "ERROR", "TELNETCONSOLE_ENABLED": False}
+    if rest:
+        settings["JOBDIR"] = rest[0]
+    process = CrawlerProcess(settings)
+    process.crawl(ResumableSpider, ids=ids, shard_dir=shard_dir)
+    process.start()
@@ -12,7 +12,9 @@ from pathlib import Path
 # from openai import OpenAI
 # from src.config import Config
 # from src.fetcher import fetch_arxiv_papers
-# from src.filter import filter_papers_by_topics
+# from src.embedding import EmbeddingCache, HashingEmbedder, OpenAIEmbedder, TopicMatcher
+# from src.filter import filter_papers_by_embedding, filter_papers_by_topics
+# from src.prefilter import PrefilterOptions
 # from src.summarizer import generate_summaries
 # from src.formatter import format_as_markdown, save_to_file
 
@@ -47,11 +49,36 @@ def main():
         print("🔍 正在进行母题筛选...")
         # TODO: 实现母题筛选
         # llm_client = OpenAI(api_key=config.api_key, base_url=config.base_url)
-        # filtered_papers = filter_papers_by_topics(
-        #     papers,
-        #     config.research_topics,
-        #     llm_client
-        # )
+        # if config.filter_mode == "embedding":
+        #     embedder = (
+        #         HashingEmbedder() if config.embedding_model == "hashing"
+        #         else OpenAIEmbedder(llm_client, config.embedding_model)
+        #     )
+        #     matcher = TopicMatcher(embedder, EmbeddingCache(config.embedding_cache_path))
+        #     filtered_papers = filter_papers_by_embedding(
+        #         papers,
+        #         config.research_topics,
+        #         matcher,
+        #         threshold=config.embedding_threshold,
+        #         topic_keywords=config.topic_keywords,
+        #     )
+        # else:
+        #     prefilter = PrefilterOptions(
+        #         max_ratio=config.prefilter_max_ratio,
+        #         min_keep=config.prefilter_min_keep,
+        #         min_score=config.prefilter_min_score,
+        #         audit_rate=config.prefilter_audit_rate,
+        #     ) if config.prefilter_enabled else None
+        #     filtered_papers = filter_papers_by_topics(
+        #         papers,
+        #         config.research_topics,
+        #         llm_client,
+        #         model=config.model_name,
+        #         prefilter=prefilter,
+        #         topic_keywords=config.topic_keywords,
+        #         batch_token_budget=config.filter_batch_tokens or None,
+        #         max_batch_size=config.filter_batch_size,
+        #     )
         print(f"  ✅ 筛选完成，保留 TODO 篇论文\n")
 
         # 4. 生成摘要
@@ -68,7 +68,12 @@ else
 fi
 
 cd daily_arxiv
-scrapy crawl arxiv -o ../data/${today}.jsonl
+# 设置 HTTPCACHE=1 时开启 HTTP 缓存（/new 页面缓存 1 小时）/ HTTPCACHE=1 enables the HTTP cache (/new pages cached for 1 hour)
+cache_args=""
+if [ "${HTTPCACHE:-0}" = "1" ]; then
+    cache_args="-s HTTPCACHE_ENABLED=True"
+fi
+scrapy crawl arxiv ${cache_args} -o ../data/${today}.jsonl
 
 if [ ! -f "../data/${today}.jsonl" ]; then
     echo "爬取失败，未生成数据文件 / Crawling failed, no data file generated"
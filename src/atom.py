@@ -0,0 +1,125 @@
+"""arXiv Atom feed 解析（流式，直接产出 Paper）"""
+
+import io
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import BinaryIO, Iterator
+
+from lxml import etree
+
+from .models import Paper
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+_ENTRY = f"{ATOM}entry"
+_ID = f"{ATOM}id"
+_TITLE = f"{ATOM}title"
+_SUMMARY = f"{ATOM}summary"
+_PUBLISHED = f"{ATOM}published"
+_AUTHOR = f"{ATOM}author"
+_NAME = f"{ATOM}name"
+_CATEGORY = f"{ATOM}category"
+
+_VERSION_RE = re.compile(r"v\d+$")
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: str) -> datetime:
+    """
+    解析 arXiv 日期（如 2024-01-15T18:59:59Z），结果缓存
+
+    同一批论文的发布时间大量重复，缓存后多数条目无需重复解析。
+    返回不带时区的 datetime（与原 strptime 行为一致）。
+    """
+    return datetime.fromisoformat(value.rstrip("Z"))
+
+
+def iter_atom_entries(source: bytes | BinaryIO) -> Iterator[Paper | None]:
+    """
+    流式解析 arXiv API 返回的 Atom feed，每个 <entry> 产出一项
+
+    使用 lxml iterparse 逐个处理 <entry>，处理完立即释放已解析的元素，
+    内存占用与 feed 大小无关。缺少必需字段的条目产出 None，
+    调用方可以据此统计原始条目数（例如判断分页是否到了最后一页）。
+
+    Args:
+        source: feed 原始字节或二进制文件对象
+
+    Yields:
+        Paper 对象，无法解析的条目为 None
+
+    Raises:
+        lxml.etree.XMLSyntaxError: feed 不是合法的 XML
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    for _, entry in etree.iterparse(source, events=("end",), tag=_ENTRY):
+        yield _entry_to_paper(entry)
+
+        # 释放已处理的条目及其之前的兄弟节点
+        entry.clear()
+        parent = entry.getparent()
+        while entry.getprevious() is not None:
+            del parent[0]
+
+
+def iter_atom_papers(source: bytes | BinaryIO) -> Iterator[Paper]:
+    """流式解析 Atom feed，跳过缺少必需字段的条目"""
+    for paper in iter_atom_entries(source):
+        if paper is not None:
+            yield paper
+
+
+def parse_atom(source: bytes | BinaryIO) -> list[Paper]:
+    """解析整个 Atom feed，返回论文列表"""
+    return list(iter_atom_papers(source))
+
+
+def _entry_to_paper(entry) -> Paper | None:
+    """把单个 <entry> 元素转换为 Paper，缺少必需字段时返回 None"""
+    entry_id = title = summary = published = None
+    authors = []
+    categories = []
+
+    for child in entry:
+        tag = child.tag
+        if tag == _ID:
+            entry_id = child.text
+        elif tag == _TITLE:
+            title = child.text
+        elif tag == _SUMMARY:
+            summary = child.text
+        elif tag == _PUBLISHED:
+            published = child.text
+        elif tag == _AUTHOR:
+            name = child.find(_NAME)
+            if name is not None and name.text:
+                authors.append(name.text.strip())
+        elif tag == _CATEGORY:
+            term = child.get("term")
+            if term:
+                categories.append(term)
+
+    if not entry_id or title is None or summary is None or not published:
+        print(f"  ⚠️  警告：条目缺少必需字段，跳过：{entry_id}")
+        return None
+
+    # entry.id 格式：http://arxiv.org/abs/2401.12345v1
+    arxiv_id = _VERSION_RE.sub("", entry_id.split("/abs/")[-1])
+
+    try:
+        published_date = _parse_date(published.strip())
+    except ValueError:
+        print(f"  ⚠️  警告：无法解析发布日期 {published!r}，跳过：{arxiv_id}")
+        return None
+
+    return Paper(
+        title=title.replace("\n", " ").strip(),
+        abstract=summary.replace("\n", " ").strip(),
+        authors=authors,
+        arxiv_id=arxiv_id,
+        arxiv_url=f"https://arxiv.org/abs/{arxiv_id}",
+        published_date=published_date,
+        categories=categories,
+    )
@@ -0,0 +1,246 @@
+"""列式论文容器：大批量论文的紧凑存储与向量化筛选"""
+
+from dataclasses import fields
+from datetime import datetime
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .models import Paper
+
+_TEXT_FIELDS = ("title", "abstract", "arxiv_id", "arxiv_url")
+_BASE_FIELDS = {f.name for f in fields(Paper)}
+
+
+class _StringColumn:
+    """偏移编码的字符串列：所有字符串拼成一个 str，第 i 个为 data[offsets[i]:offsets[i+1]]"""
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self, data: str, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, values: Iterable[str]) -> "_StringColumn":
+        values = list(values)
+        lengths = np.fromiter((len(v) for v in values), dtype=np.int64, count=len(values))
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls("".join(values), offsets)
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[self.offsets[i]:self.offsets[i + 1]]
+
+    def take(self, idx: np.ndarray) -> "_StringColumn":
+        starts = self.offsets[idx].tolist()
+        ends = self.offsets[idx + 1].tolist()
+        return _StringColumn.build(self.data[s:e] for s, e in zip(starts, ends))
+
+    def nbytes(self) -> int:
+        return len(self.data.encode("utf-8")) + self.offsets.nbytes
+
+
+class _CodedListColumn:
+    """变长字符串列表列（作者、类别）：词表 + 扁平编码数组 + 偏移"""
+
+    __slots__ = ("vocab", "codes", "offsets")
+
+    def __init__(self, vocab: list[str], codes: np.ndarray, offsets: np.ndarray):
+        self.vocab = vocab
+        self.codes = codes
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, lists: Iterable[Sequence[str]]) -> "_CodedListColumn":
+        index: dict[str, int] = {}
+        codes = []
+        offsets = [0]
+        for values in lists:
+            for v in values:
+                code = index.get(v)
+                if code is None:
+                    code = index[v] = len(index)
+                codes.append(code)
+            offsets.append(len(codes))
+        return cls(
+            list(index),
+            np.asarray(codes, dtype=np.int32),
+            np.asarray(offsets, dtype=np.int64),
+        )
+
+    def __getitem__(self, i: int) -> list[str]:
+        vocab = self.vocab
+        return [vocab[c] for c in self.codes[self.offsets[i]:self.offsets[i + 1]].tolist()]
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def _codes_of(self, values: Iterable[str]) -> list[int]:
+        wanted = set(values)
+        return [code for code, v in enumerate(self.vocab) if v in wanted]
+
+    def contains_any(self, values: Iterable[str]) -> np.ndarray:
+        """每行是否包含 values 中的任一字符串（布尔数组）"""
+        wanted = self._codes_of(values)
+        if not wanted:
+            return np.zeros(len(self.offsets) - 1, dtype=bool)
+        hit = np.isin(self.codes, wanted)
+        cum = np.zeros(len(hit) + 1, dtype=np.int64)
+        np.cumsum(hit, out=cum[1:])
+        return (cum[self.offsets[1:]] - cum[self.offsets[:-1]]) > 0
+
+    def first_in(self, values: Iterable[str]) -> np.ndarray:
+        """每行第一个值（主类别）是否在 values 中"""
+        wanted = self._codes_of(values)
+        lengths = self.lengths()
+        mask = np.zeros(len(lengths), dtype=bool)
+        nonempty = lengths > 0
+        mask[nonempty] = np.isin(self.codes[self.offsets[:-1][nonempty]], wanted)
+        return mask
+
+    def take(self, idx: np.ndarray) -> "_CodedListColumn":
+        lengths = self.lengths()[idx]
+        offsets = np.zeros(len(idx) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # 被选中行在原扁平数组中的位置：各行起点 + 行内序号
+        starts = np.repeat(self.offsets[idx] - offsets[:-1], lengths)
+        positions = starts + np.arange(offsets[-1], dtype=np.int64)
+        return _CodedListColumn(self.vocab, self.codes[positions], offsets)
+
+    def nbytes(self) -> int:
+        return sum(len(v.encode("utf-8")) for v in self.vocab) + self.codes.nbytes + self.offsets.nbytes
+
+
+class PaperBatch:
+    """
+    列式存储的一批论文
+
+    文本字段用偏移编码的单个字符串存储，作者/类别用词表编码，发布日期为
+    datetime64 数组。相比每篇论文一个对象，内存更省，并支持按类别、日期的向量化筛选。
+    与 Paper / FilteredPaper / SummarizedPaper 之间可无损互转（同一批内类型需一致；
+    子类的额外字段按列保存为 Python 列表）。
+    """
+
+    __slots__ = ("paper_type", "_text", "authors", "categories", "published", "extras")
+
+    def __init__(self, paper_type: type, text: dict, authors: _CodedListColumn,
+                 categories: _CodedListColumn, published: np.ndarray, extras: dict):
+        self.paper_type = paper_type
+        self._text = text
+        self.authors = authors
+        self.categories = categories
+        self.published = published
+        self.extras = extras
+
+    @classmethod
+    def from_papers(cls, papers: Sequence[Paper]) -> "PaperBatch":
+        """
+        从论文对象构建
+
+        Args:
+            papers: 同一类型的论文列表（Paper / FilteredPaper / SummarizedPaper）
+
+        Raises:
+            TypeError: 列表中混有不同类型
+        """
+        papers = list(papers)
+        paper_type = type(papers[0]) if papers else Paper
+        if any(type(p) is not paper_type for p in papers):
+            raise TypeError("PaperBatch 只能存放同一类型的论文")
+
+        text = {name: _StringColumn.build(getattr(p, name) for p in papers) for name in _TEXT_FIELDS}
+        extras = {
+            f.name: [getattr(p, f.name) for p in papers]
+            for f in fields(paper_type)
+            if f.name not in _BASE_FIELDS
+        }
+        return cls(
+            paper_type=paper_type,
+            text=text,
+            authors=_CodedListColumn.build(p.authors for p in papers),
+            categories=_CodedListColumn.build(p.categories for p in papers),
+            published=np.array([p.published_date for p in papers], dtype="datetime64[us]"),
+            extras=extras,
+        )
+
+    def __len__(self) -> int:
+        return len(self.published)
+
+    def __getitem__(self, i: int) -> Paper:
+        if i < 0:
+            i += len(self)
+        kwargs = {name: col[i] for name, col in self._text.items()}
+        kwargs.update({name: values[i] for name, values in self.extras.items()})
+        return self.paper_type(
+            authors=self.authors[i],
+            categories=self.categories[i],
+            published_date=self.published[i].astype(datetime),
+            **kwargs,
+        )
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def to_papers(self) -> list[Paper]:
+        """转换回论文对象列表"""
+        return list(self)
+
+    def column(self, name: str) -> list:
+        """取出某一列（文本、作者、类别或子类额外字段）"""
+        if name in self._text:
+            col = self._text[name]
+            return [col[i] for i in range(len(self))]
+        if name in ("authors", "categories"):
+            col = getattr(self, name)
+            return [col[i] for i in range(len(self))]
+        if name == "published_date":
+            return self.published.astype(datetime).tolist()
+        return list(self.extras[name])
+
+    def category_mask(self, categories: Iterable[str], primary_only: bool = False) -> np.ndarray:
+        """
+        按类别筛选的布尔掩码
+
+        Args:
+            categories: 目标类别（如 ["cs.CV", "cs.CL"]）
+            primary_only: 只看第一个（主）类别
+        """
+        if primary_only:
+            return self.categories.first_in(categories)
+        return self.categories.contains_any(categories)
+
+    def date_mask(self, start: datetime | None = None, end: datetime | None = None) -> np.ndarray:
+        """发布日期在 [start, end) 内的布尔掩码"""
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.published >= np.datetime64(start, "us")
+        if end is not None:
+            mask &= self.published < np.datetime64(end, "us")
+        return mask
+
+    def select(self, mask_or_index: np.ndarray) -> "PaperBatch":
+        """按布尔掩码或下标数组取子集，返回新的 PaperBatch"""
+        idx = np.asarray(mask_or_index)
+        if idx.dtype == bool:
+            idx = np.flatnonzero(idx)
+        idx = idx.astype(np.int64)
+        index_list = idx.tolist()
+        return PaperBatch(
+            paper_type=self.paper_type,
+            text={name: col.take(idx) for name, col in self._text.items()},
+            authors=self.authors.take(idx),
+            categories=self.categories.take(idx),
+            published=self.published[idx],
+            extras={name: [values[i] for i in index_list] for name, values in self.extras.items()},
+        )
+
+    def nbytes(self) -> int:
+        """列数据的近似字节数（不含 extras）"""
+        return (
+            sum(col.nbytes() for col in self._text.values())
+            + self.authors.nbytes()
+            + self.categories.nbytes()
+            + self.published.nbytes
+        )
+
@@ -1,9 +1,12 @@
 """配置管理"""
 
 import os
+import re
 from pathlib import Path
 from dotenv import load_dotenv
 
+_TOPIC_SEPARATOR_RE = re.compile(r"[:：]")
+
 
 class Config:
     """全局配置管理"""
@@ -27,6 +30,25 @@ class Config:
 
         # 研究母题
         self.research_topics = self._load_research_topics()
+        self.topic_keywords = self._load_topic_keywords()
+
+        # 本地预筛选（BM25），只把得分靠前的论文交给 LLM
+        self.prefilter_enabled = os.getenv("PREFILTER_ENABLED", "true").lower() == "true"
+        self.prefilter_max_ratio = float(os.getenv("PREFILTER_MAX_RATIO", "0.1"))
+        self.prefilter_min_keep = int(os.getenv("PREFILTER_MIN_KEEP", "10"))
+        min_score = os.getenv("PREFILTER_MIN_SCORE")
+        self.prefilter_min_score = float(min_score) if min_score else None
+        self.prefilter_audit_rate = float(os.getenv("PREFILTER_AUDIT_RATE", "0.02"))
+
+        # 批量筛选：单次请求的 token 预算（0 表示逐篇调用）
+        self.filter_batch_tokens = int(os.getenv("FILTER_BATCH_TOKENS", "0"))
+        self.filter_batch_size = int(os.getenv("FILTER_BATCH_SIZE", "20"))
+
+        # 筛选方式：llm（对话模型逐篇判断）或 embedding（向量相似度）
+        self.filter_mode = os.getenv("FILTER_MODE", "llm")
+        self.embedding_model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+        self.embedding_threshold = float(os.getenv("EMBEDDING_THRESHOLD", "0.35"))
+        self.embedding_cache_path = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite")
 
     def _load_research_topics(self) -> list[str]:
         """从 config/research_topics.txt 加载研究母题"""
@@ -51,8 +73,37 @@ class Config:
 
         return topics
 
+    def _load_topic_keywords(self) -> dict[str, list[str]]:
+        """
+        从 config/topic_keywords.txt 加载母题的扩展关键词（可选）
+
+        每行格式：``母题：关键词1, 关键词2``。中文母题配上英文关键词后，
+        预筛选才能与英文摘要匹配。
+        """
+        keywords_file = Path("config/topic_keywords.txt")
+        if not keywords_file.exists():
+            return {}
+
+        keywords = {}
+        with open(keywords_file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                # 只按第一个冒号（全角或半角）切分，关键词中的冒号保持原样
+                parts = _TOPIC_SEPARATOR_RE.split(line, maxsplit=1)
+                if len(parts) < 2:
+                    continue
+                topic, words = parts
+                keywords[topic.strip()] = [w.strip() for w in words.split(",") if w.strip()]
+
+        return keywords
+
     def validate(self):
         """验证配置完整性"""
+        if self.filter_mode not in ("llm", "embedding"):
+            raise ValueError(f"FILTER_MODE 只能是 llm 或 embedding，当前为：{self.filter_mode}")
+
         if not self.api_key:
             raise ValueError("未找到 API 密钥，请在 .env 文件中设置 OPENAI_API_KEY")
 
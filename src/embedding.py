@@ -0,0 +1,248 @@
+"""
+基于向量的母题匹配
+
+把论文（标题 + 摘要）和每个研究母题编码为单位向量，用矩阵乘法一次算出
+全部余弦相似度。论文向量按 (arXiv ID + 文本哈希, 模型名) 缓存在本地 SQLite 中，
+同一篇论文跨天只编码一次，摘要修订后会重新编码；换一批母题重新筛选只需一次矩阵乘法。
+
+编码器：
+- OpenAIEmbedder：调用 OpenAI 兼容的 embeddings 接口
+- HashingEmbedder：本地、确定性的哈希编码器，用于离线测试
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import time
+from collections import Counter
+from typing import Iterable, List, Protocol
+
+import numpy as np
+
+from .models import Paper
+from .prefilter import tokenize
+
+
+class Embedder(Protocol):
+    """编码器接口：name 用作缓存键的一部分，embed 返回 L2 归一化的 float32 矩阵"""
+
+    name: str
+
+    def embed(self, texts: List[str]) -> np.ndarray: ...
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+class HashingEmbedder:
+    """
+    确定性的哈希编码器（不依赖网络和模型）
+
+    每个词经 blake2b 哈希映射到一个维度和正负号，词频取平方根后累加，再做 L2 归一化。
+    只反映词面重合，用于离线测试与流程验证，不能替代语义向量。
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _slot(self, token: str) -> tuple[int, float]:
+        h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+        return h % self.dim, 1.0 if h >> 63 else -1.0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token, tf in Counter(tokenize(text)).items():
+                col, sign = self._slot(token)
+                vectors[row, col] += sign * math.sqrt(tf)
+        return _normalize(vectors)
+
+
+class OpenAIEmbedder:
+    """
+    OpenAI 兼容 embeddings 接口的编码器
+
+    Args:
+        client: openai.OpenAI 客户端
+        model: 向量模型名称
+        batch_size: 每次请求的文本数
+    """
+
+    def __init__(self, client, model: str = "text-embedding-3-small", batch_size: int = 256):
+        self.client = client
+        self.model = model
+        self.name = model
+        self.batch_size = batch_size
+        self.tokens_used = 0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            response = self.client.embeddings.create(model=self.model, input=batch)
+            data = sorted(response.data, key=lambda d: d.index)
+            rows.extend(d.embedding for d in data)
+            if getattr(response, "usage", None) is not None:
+                self.tokens_used += response.usage.total_tokens
+        if not rows:
+            return np.zeros((0, 0), dtype=np.float32)
+        return _normalize(np.asarray(rows, dtype=np.float32))
+
+
+class EmbeddingCache:
+    """
+    向量的 SQLite 缓存，键为 (key, model)
+
+    论文的 key 为 arXiv ID 加文本哈希；母题的 key 为 ``topic:`` 加文本哈希。向量以 float32 字节存储。
+    """
+
+    def __init__(self, path: str = ".cache/embeddings.sqlite"):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key        TEXT NOT NULL,
+                model      TEXT NOT NULL,
+                dim        INTEGER NOT NULL,
+                vector     BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (key, model)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def get_many(self, keys: List[str], model: str) -> dict[str, np.ndarray]:
+        """批量查询，返回命中的 key -> 向量"""
+        found = {}
+        # SQLite 单条语句的参数个数有上限，分批查询
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                [model, *chunk],
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, model: str, items: Iterable[tuple[str, np.ndarray]]) -> None:
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, model, dim, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                (key, model, len(vector), np.asarray(vector, dtype=np.float32).tobytes(), now)
+                for key, vector in items
+            ],
+        )
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def paper_text(paper: Paper) -> str:
+    """用于编码的论文文本"""
+    return f"{paper.title}\n{paper.abstract}"
+
+
+def paper_key(paper: Paper, text: str | None = None) -> str:
+    """论文的缓存键：arXiv ID 加编码文本的哈希，标题或摘要修订后不会读到旧向量"""
+    text = paper_text(paper) if text is None else text
+    return f"{paper.arxiv_id}:{hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]}"
+
+
+def topic_key(text: str) -> str:
+    return "topic:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class TopicMatcher:
+    """
+    向量母题匹配器
+
+    Args:
+        embedder: 编码器
+        cache: 向量缓存；为 None 时不缓存
+    """
+
+    def __init__(self, embedder: Embedder, cache: EmbeddingCache | None = None):
+        self.embedder = embedder
+        self.cache = cache
+
+    def _embed_keyed(self, keys: List[str], texts: List[str]) -> np.ndarray:
+        """按 key 取向量：命中缓存的直接读取，其余批量编码后写入缓存"""
+        model = self.embedder.name
+        cached = self.cache.get_many(keys, model) if self.cache is not None else {}
+
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            vectors = self.embedder.embed([texts[i] for i in missing])
+            fresh = {keys[i]: vectors[row] for row, i in enumerate(missing)}
+            if self.cache is not None:
+                self.cache.put_many(model, fresh.items())
+            cached.update(fresh)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([cached[key] for key in keys])
+
+    def embed_papers(self, papers: List[Paper]) -> np.ndarray:
+        """论文向量矩阵（行与 papers 对应）"""
+        texts = [paper_text(p) for p in papers]
+        return self._embed_keyed([paper_key(p, text) for p, text in zip(papers, texts)], texts)
+
+    def embed_topics(self, topics: List[str], topic_keywords: dict[str, list[str]] | None = None) -> np.ndarray:
+        """母题向量矩阵；有扩展关键词时拼接到母题文本后再编码"""
+        topic_keywords = topic_keywords or {}
+        texts = [" ".join([t, *topic_keywords.get(t, [])]) for t in topics]
+        return self._embed_keyed([topic_key(text) for text in texts], texts)
+
+    def similarity(
+        self,
+        papers: List[Paper],
+        topics: List[str],
+        topic_keywords: dict[str, list[str]] | None = None,
+    ) -> np.ndarray:
+        """余弦相似度矩阵，形状为 (论文数, 母题数)"""
+        if not papers or not topics:
+            return np.zeros((len(papers), len(topics)), dtype=np.float32)
+        return self.embed_papers(papers) @ self.embed_topics(topics, topic_keywords).T
+
+    def match(
+        self,
+        papers: List[Paper],
+        topics: List[str],
+        threshold: float = 0.35,
+        topic_keywords: dict[str, list[str]] | None = None,
+    ) -> list[tuple[Paper, list[str], list[float]]]:
+        """
+        找出与任一母题相似度 ≥ threshold 的论文
+
+        Returns:
+            [(论文, 匹配的母题（按相似度降序）, 对应相似度)]
+        """
+        sims = self.similarity(papers, topics, topic_keywords)
+        matches = []
+        for i in np.flatnonzero((sims >= threshold).any(axis=1)):
+            row = sims[i]
+            order = [j for j in np.argsort(-row) if row[j] >= threshold]
+            matches.append((papers[i], [topics[j] for j in order], [float(row[j]) for j in order]))
+        return matches
@@ -1,11 +1,45 @@
 """arXiv 论文爬取"""
 
-import feedparser
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+
 import requests
-from datetime import datetime
-from typing import List
+from lxml import etree
+from requests.adapters import HTTPAdapter
+
+from .atom import iter_atom_entries
 from .models import Paper
 
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+
+# arXiv API 使用规范：所有请求之间至少间隔 3 秒
+REQUEST_INTERVAL = 3.0
+
+# 单次请求最多返回的论文数（分页大小）
+PAGE_SIZE = 100
+
+_DONE = object()  # 某个类别爬取结束的标记
+
+
+class _RateLimiter:
+    """跨线程共享的最小请求间隔"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
 
 def fetch_arxiv_papers(categories: list[str], max_results: int = 50) -> List[Paper]:
     """
@@ -21,80 +55,128 @@ def fetch_arxiv_papers(categories: list[str], max_results: int = 50) -> List[Pap
     Raises:
         ConnectionError: 网络连接失败
     """
-    papers = []
+    return list(iter_arxiv_papers(categories, max_results))
 
-    for category in categories:
-        print(f"📥 正在爬取类别：{category.strip()}")
-
-        # 构建 arXiv API URL
-        url = (
-            f"http://export.arxiv.org/api/query?"
-            f"search_query=cat:{category.strip()}&"
-            f"max_results={max_results}&"
-            f"sortBy=submittedDate&"
-            f"sortOrder=descending"
-        )
-
-        try:
-            # 获取并解析 RSS feed
-            feed = feedparser.parse(url)
 
-            # 检查是否成功
-            if feed.bozo:
-                print(f"  ⚠️  警告：解析类别 {category} 时出错，跳过")
-                continue
+def iter_arxiv_papers(
+    categories: list[str],
+    max_results: int = 50,
+    page_size: int = PAGE_SIZE,
+    max_workers: int = 4,
+    session: requests.Session | None = None,
+) -> Iterator[Paper]:
+    """
+    并发爬取多个类别，逐篇产出论文
 
-            # 提取论文信息
-            for entry in feed.entries:
-                paper = _parse_entry(entry, category)
-                if paper:
-                    papers.append(paper)
+    每个类别在独立线程中用 ``start=`` 分页请求，共用一个连接池和一个全局限速器
+    （arXiv 要求请求间隔 ≥ 3 秒）。解析出的论文立即产出，下游无需等待最后一个类别完成。
+    产出顺序：同一类别内保持 API 返回顺序，不同类别之间交错。
 
-            print(f"  ✅ 成功爬取 {len(feed.entries)} 篇论文")
+    Args:
+        categories: arXiv 类别列表（如 ["cs.CV", "cs.AI"]）
+        max_results: 每个类别最多爬取的论文数
+        page_size: 每次请求的论文数
+        max_workers: 并发爬取的类别数
+        session: 可选的 requests.Session（默认新建带连接池的会话）
 
-        except requests.RequestException as e:
-            raise ConnectionError(
-                f"无法连接到 arXiv，请检查网络连接。详细错误：{e}"
-            )
+    Yields:
+        Paper 对象
 
-    return papers
+    Raises:
+        ConnectionError: 网络连接失败
+    """
+    categories = [c.strip() for c in categories if c.strip()]
+    if not categories:
+        return
+
+    own_session = session is None
+    if own_session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    limiter = _RateLimiter(REQUEST_INTERVAL)
+    results: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(categories)))
 
+    for category in categories:
+        executor.submit(
+            _fetch_category, session, limiter, category, max_results, page_size, results, stop
+        )
 
-def _parse_entry(entry, category: str) -> Paper | None:
+    try:
+        remaining = len(categories)
+        while remaining:
+            obj = results.get()
+            if obj is _DONE:
+                remaining -= 1
+            elif isinstance(obj, Exception):
+                raise obj
+            else:
+                yield obj
+    finally:
+        # 消费方提前结束或出错时，通知其余线程停止
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        if own_session:
+            session.close()
+
+
+def _fetch_category(
+    session: requests.Session,
+    limiter: _RateLimiter,
+    category: str,
+    max_results: int,
+    page_size: int,
+    results: queue.Queue,
+    stop: threading.Event,
+) -> None:
     """
-    解析单个 RSS entry
-
-    Args:
-        entry: feedparser.FeedParserDict
-        category: arXiv 类别
+    分页爬取单个类别，把论文放入结果队列（在工作线程中运行）
 
-    Returns:
-        Paper 对象或 None（解析失败时）
+    结束时总会放入 ``_DONE``；网络错误以 ConnectionError 形式放入队列，由消费方抛出。
     """
+    print(f"📥 正在爬取类别：{category}")
+    count = 0
     try:
-        # 提取 arXiv ID（从 entry.id 中解析）
-        # entry.id 格式：http://arxiv.org/abs/2401.12345v1
-        arxiv_id = entry.id.split("/abs/")[-1].split("v")[0]
-
-        # 提取作者列表
-        authors = [author.name for author in entry.authors]
-
-        # 提取发布日期
-        published_date = datetime.strptime(entry.published, "%Y-%m-%dT%H:%M:%SZ")
-
-        # 提取类别标签
-        categories = [tag.term for tag in entry.tags]
-
-        return Paper(
-            title=entry.title.replace("\n", " ").strip(),
-            abstract=entry.summary.replace("\n", " ").strip(),
-            authors=authors,
-            arxiv_id=arxiv_id,
-            arxiv_url=f"https://arxiv.org/abs/{arxiv_id}",
-            published_date=published_date,
-            categories=categories,
-        )
-
-    except Exception as e:
-        print(f"  ⚠️  警告：解析论文时出错，跳过。详细错误：{e}")
-        return None
+        for start in range(0, max_results, page_size):
+            if stop.is_set():
+                return
+
+            params = {
+                "search_query": f"cat:{category}",
+                "start": start,
+                "max_results": min(page_size, max_results - start),
+                "sortBy": "submittedDate",
+                "sortOrder": "descending",
+            }
+            limiter.wait()
+            response = session.get(ARXIV_API_URL, params=params, timeout=30)
+            response.raise_for_status()
+
+            # 流式解析 Atom feed，逐篇放入结果队列
+            entry_count = 0
+            try:
+                for paper in iter_atom_entries(response.content):
+                    entry_count += 1
+                    if paper is not None:
+                        results.put(paper)
+                        count += 1
+            except etree.XMLSyntaxError as e:
+                print(f"  ⚠️  警告：解析类别 {category} 时出错，跳过。详细错误：{e}")
+                return
+
+            # 最后一页：按原始 <entry> 数判断，被跳过的畸形条目不会提前结束分页
+            if entry_count < params["max_results"]:
+                break
+
+        print(f"  ✅ {category}：成功爬取 {count} 篇论文")
+
+    except requests.RequestException as e:
+        results.put(ConnectionError(
+            f"无法连接到 arXiv，请检查网络连接。详细错误：{e}"
+        ))
+    finally:
+        results.put(_DONE)
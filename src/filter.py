@@ -0,0 +1,456 @@
+"""母题筛选"""
+
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List
+
+from openai import OpenAI
+
+from .models import FilteredPaper, Paper
+from .prefilter import PrefilterOptions, prefilter_papers
+from .tokens import estimate_tokens
+
+if TYPE_CHECKING:
+    from .embedding import TopicMatcher
+
+# 批量筛选时为每篇论文预留的输出 token 数（一条 JSON 判定）
+_VERDICT_TOKENS = 40
+
+# 逐篇调用时模型回复的大致 token 数（用于估算批量节省的 token）
+_SINGLE_REPLY_TOKENS = 30
+
+def filter_papers_by_topics(
+    papers: List[Paper],
+    topics: List[str],
+    llm_client: OpenAI,
+    model: str = "deepseek-chat",
+    prefilter: PrefilterOptions | None = None,
+    topic_keywords: dict[str, list[str]] | None = None,
+    batch_token_budget: int | None = None,
+    max_batch_size: int = 20,
+) -> List[FilteredPaper]:
+    """
+    使用 LLM 根据研究母题筛选论文
+
+    开启预筛选时，先用 BM25 在本地排序，只把得分靠前的论文交给 LLM；
+    另从被淘汰的论文中按 audit_rate 抽样交给 LLM，用于估计召回率。
+    设置 batch_token_budget 时，把多篇论文打包进一次请求（见 _filter_batched），
+    母题列表和说明只发送一次。运行结束后打印成本与召回率报告。
+
+    Args:
+        papers: 原始论文列表
+        topics: 研究母题列表
+        llm_client: LLM API 客户端
+        model: 模型名称
+        prefilter: 预筛选参数；为 None 时每篇论文都交给 LLM
+        topic_keywords: 母题扩展关键词（见 Config.topic_keywords）
+        batch_token_budget: 单次批量请求的 token 预算（输入 + 预计输出）；为 None 时逐篇调用
+        max_batch_size: 单次批量请求最多包含的论文数
+
+    Returns:
+        通过筛选的论文列表
+    """
+    if prefilter is None:
+        candidates, audit = papers, []
+        report = None
+    else:
+        result = prefilter_papers(papers, topics, topic_keywords, prefilter)
+        candidates = result.passed
+        audit = result.audit_sample(prefilter.audit_rate, prefilter.seed)
+        report = result.report
+        report.audited = len(audit)
+        print(f"  🔎 预筛选：{len(papers)} 篇中 {len(candidates)} 篇送入 LLM（另审计 {len(audit)} 篇）")
+
+    to_judge = candidates + audit
+    if batch_token_budget:
+        judged = _filter_batched(to_judge, topics, llm_client, model, batch_token_budget, max_batch_size)
+    else:
+        judged = _filter_one_by_one(to_judge, topics, llm_client, model)
+
+    audit_ids = {p.arxiv_id for p in audit}
+    filtered_papers = []
+    for paper, filtered, tokens in judged:
+        if report is not None:
+            report.llm_tokens += tokens
+        if filtered is None:
+            continue
+
+        filtered_papers.append(filtered)
+        print(f"  ✅ 匹配母题：{', '.join(filtered.matched_topics)} - {paper.title[:50]}")
+        if report is not None:
+            if paper.arxiv_id in audit_ids:
+                report.audit_matches += 1
+            else:
+                report.passed_matches += 1
+
+    if report is not None:
+        print(report.format())
+
+    return filtered_papers
+
+
+def _filter_one_by_one(
+    papers: List[Paper],
+    topics: List[str],
+    llm_client: OpenAI,
+    model: str,
+) -> list[tuple[Paper, FilteredPaper | None, int]]:
+    """逐篇调用 LLM，返回 [(论文, 匹配结果, token 数)]"""
+    judged = []
+    for i, paper in enumerate(papers, 1):
+        print(f"🔍 筛选进度：{i}/{len(papers)} - {paper.title[:50]}...")
+        filtered, tokens = _filter_single_paper(paper, topics, llm_client, model)
+        judged.append((paper, filtered, tokens))
+    return judged
+
+
+def filter_papers_by_embedding(
+    papers: List[Paper],
+    topics: List[str],
+    matcher: "TopicMatcher",
+    threshold: float = 0.35,
+    topic_keywords: dict[str, list[str]] | None = None,
+) -> List[FilteredPaper]:
+    """
+    用向量相似度根据研究母题筛选论文（不调用对话模型）
+
+    论文向量有缓存时，换一批母题重新筛选只需一次矩阵乘法。
+
+    Args:
+        papers: 原始论文列表
+        topics: 研究母题列表
+        matcher: 向量母题匹配器（见 src/embedding.py）
+        threshold: 余弦相似度阈值
+        topic_keywords: 母题扩展关键词
+
+    Returns:
+        通过筛选的论文列表（filter_tokens 为 0，向量接口的 token 消耗见 embedder.tokens_used）
+    """
+    filtered_papers = []
+    for paper, matched_topics, scores in matcher.match(papers, topics, threshold, topic_keywords):
+        filtered_papers.append(
+            FilteredPaper(
+                **paper.as_dict(),
+                matched_topics=matched_topics,
+                match_reason=f"向量相似度 {scores[0]:.2f}",
+                filter_tokens=0,
+            )
+        )
+
+    cache = matcher.cache
+    if cache is not None:
+        print(f"  🧮 向量缓存：命中 {cache.hits}，新编码 {cache.misses}")
+    print(f"  ✅ 向量筛选：{len(papers)} 篇中 {len(filtered_papers)} 篇匹配（阈值 {threshold}）")
+    return filtered_papers
+
+
+def _filter_single_paper(
+    paper: Paper,
+    topics: List[str],
+    llm_client: OpenAI,
+    model: str,
+) -> tuple[FilteredPaper | None, int]:
+    """
+    用 LLM 判断单篇论文是否匹配母题
+
+    Returns:
+        (匹配时为 FilteredPaper，否则为 None, 消耗的 token 数)
+    """
+    prompt = _build_filter_prompt(paper, topics)
+
+    try:
+        response = llm_client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,  # 降低随机性，保证一致性
+        )
+    except Exception as e:
+        print(f"  ⚠️  LLM 调用失败，跳过。错误：{e}")
+        return None, 0
+
+    result = response.choices[0].message.content.strip()
+    tokens = response.usage.total_tokens
+
+    if not result.startswith("是"):
+        return None, tokens
+
+    matched_topics, reason = _parse_filter_result(result, topics)
+    return FilteredPaper(
+        **paper.as_dict(),
+        matched_topics=matched_topics,
+        match_reason=reason,
+        filter_tokens=tokens,
+    ), tokens
+
+
+@dataclass
+class BatchFilterStats:
+    """批量筛选的成本统计"""
+
+    papers: int = 0
+    requests: int = 0
+    tokens: int = 0
+    single_tokens_estimate: int = 0   # 同样的论文逐篇调用的估计 token 数
+    retried: int = 0                  # 因解析失败而重试的论文数（可能重复计数）
+    single_fallbacks: int = 0         # 最终退回逐篇调用的论文数
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.single_tokens_estimate - self.tokens
+
+    def format(self) -> str:
+        ratio = self.tokens_saved / self.single_tokens_estimate if self.single_tokens_estimate else 0.0
+        return (
+            f"批量筛选：{self.papers} 篇，{self.requests} 次请求，消耗 {self.tokens} token\n"
+            f"  逐篇调用估计 {self.single_tokens_estimate} token，节省 {self.tokens_saved}（{ratio:.0%}）\n"
+            f"  解析失败重试 {self.retried} 篇，退回逐篇调用 {self.single_fallbacks} 篇"
+        )
+
+
+def _filter_batched(
+    papers: List[Paper],
+    topics: List[str],
+    llm_client: OpenAI,
+    model: str,
+    token_budget: int,
+    max_batch_size: int,
+) -> list[tuple[Paper, FilteredPaper | None, int]]:
+    """
+    批量调用 LLM：按 token 预算把论文打包进一次 JSON 输出请求
+
+    返回结果中缺失或格式不对的论文会被拆分重试：整批失败时对半拆分，
+    部分失败时只重试受影响的论文；拆到单篇仍失败则退回逐篇调用的 Prompt。
+
+    Returns:
+        [(论文, 匹配结果, 分摊的 token 数)]，顺序与 papers 一致
+    """
+    stats = BatchFilterStats(papers=len(papers))
+    stats.single_tokens_estimate = sum(
+        estimate_tokens(_build_filter_prompt(p, topics)) + _SINGLE_REPLY_TOKENS for p in papers
+    )
+
+    results: dict[str, tuple[FilteredPaper | None, int]] = {}
+    batches = _pack_batches(papers, topics, token_budget, max_batch_size)
+    for i, batch in enumerate(batches, 1):
+        print(f"🔍 批量筛选进度：{i}/{len(batches)}（本批 {len(batch)} 篇）")
+        _judge_batch(batch, topics, llm_client, model, results, stats)
+
+    print(stats.format())
+    return [(p, *results.get(p.arxiv_id, (None, 0))) for p in papers]
+
+
+def _pack_batches(
+    papers: List[Paper],
+    topics: List[str],
+    token_budget: int,
+    max_batch_size: int,
+) -> list[list[Paper]]:
+    """按顺序贪心打包：每批的 Prompt 开销 + 论文 + 预计输出不超过预算（单篇超预算时独占一批）"""
+    overhead = estimate_tokens(_build_batch_prompt([], topics))
+    batches = []
+    batch: list[Paper] = []
+    used = overhead
+    for paper in papers:
+        cost = estimate_tokens(_format_batch_entry(paper)) + _VERDICT_TOKENS
+        if batch and (used + cost > token_budget or len(batch) >= max_batch_size):
+            batches.append(batch)
+            batch, used = [], overhead
+        batch.append(paper)
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _judge_batch(
+    batch: List[Paper],
+    topics: List[str],
+    llm_client: OpenAI,
+    model: str,
+    results: dict[str, tuple[FilteredPaper | None, int]],
+    stats: BatchFilterStats,
+) -> None:
+    """判断一批论文，结果写入 results；失败的论文拆分后递归重试"""
+    if len(batch) == 1:
+        paper = batch[0]
+        filtered, tokens = _filter_single_paper(paper, topics, llm_client, model)
+        stats.requests += 1
+        stats.tokens += tokens
+        stats.single_fallbacks += 1
+        results[paper.arxiv_id] = (filtered, tokens)
+        return
+
+    try:
+        response = llm_client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": _build_batch_prompt(batch, topics)}],
+            temperature=0,
+            response_format={"type": "json_object"},
+        )
+    except Exception as e:
+        print(f"  ⚠️  批量 LLM 调用失败，拆分重试。错误：{e}")
+        verdicts, tokens = {}, 0
+    else:
+        tokens = response.usage.total_tokens
+        verdicts = _parse_batch_result(response.choices[0].message.content, batch, topics)
+    stats.requests += 1
+    stats.tokens += tokens
+
+    # 按估计长度把本次请求的 token 分摊给得到判定的论文
+    resolved = [p for p in batch if p.arxiv_id in verdicts]
+    weights = {p.arxiv_id: estimate_tokens(_format_batch_entry(p)) for p in resolved}
+    total_weight = sum(weights.values()) or 1
+    for paper in resolved:
+        share = round(tokens * weights[paper.arxiv_id] / total_weight)
+        matched, matched_topics, reason = verdicts[paper.arxiv_id]
+        filtered = FilteredPaper(
+            **paper.as_dict(),
+            matched_topics=matched_topics,
+            match_reason=reason,
+            filter_tokens=share,
+        ) if matched else None
+        results[paper.arxiv_id] = (filtered, share)
+
+    failed = [p for p in batch if p.arxiv_id not in verdicts]
+    if not failed:
+        return
+    stats.retried += len(failed)
+    if len(failed) == len(batch):
+        half = len(batch) // 2
+        _judge_batch(batch[:half], topics, llm_client, model, results, stats)
+        _judge_batch(batch[half:], topics, llm_client, model, results, stats)
+    else:
+        _judge_batch(failed, topics, llm_client, model, results, stats)
+
+
+def _format_batch_entry(paper: Paper) -> str:
+    return f"[{paper.arxiv_id}]\n标题：{paper.title}\n摘要：{paper.abstract}\n"
+
+
+def _build_batch_prompt(papers: List[Paper], topics: List[str]) -> str:
+    """构建批量母题筛选的 Prompt（要求输出 JSON）"""
+    topics_str = "\n".join([f"{i+1}. {t}" for i, t in enumerate(topics)])
+    entries = "\n".join(_format_batch_entry(p) for p in papers)
+
+    return f"""用户研究母题：
+{topics_str}
+
+下面有 {len(papers)} 篇论文，方括号中是论文 ID。
+请逐篇判断：这篇论文是否直接解决上述任一母题?（只是略微相关的应判为否）
+
+{entries}
+输出一个 JSON 对象，格式：
+{{"results": [{{"id": "论文 ID", "match": true 或 false, "topics": [匹配的母题编号], "reason": "简短原因（20字内）"}}]}}
+要求：每篇论文都必须有一条结果，id 与方括号中的完全一致；match 为 false 时 topics 为空列表。
+"""
+
+
+def _parse_batch_result(
+    content: str,
+    batch: List[Paper],
+    topics: List[str],
+) -> dict[str, tuple[bool, List[str], str]]:
+    """
+    解析批量筛选的 JSON 输出
+
+    Returns:
+        论文 ID -> (是否匹配, 匹配的母题列表, 原因)；缺失或不合法的条目不出现在结果中
+    """
+    try:
+        data = json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        return {}
+
+    items = data.get("results") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return {}
+
+    wanted = {p.arxiv_id for p in batch}
+    verdicts = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        paper_id = str(item.get("id", "")).strip().strip("[]")
+        matched = item.get("match")
+        if paper_id not in wanted or not isinstance(matched, bool):
+            continue
+
+        indices = _parse_topic_indices(item.get("topics"))
+        if indices is None:
+            continue
+        matched_topics = [topics[i - 1] for i in indices if 0 < i <= len(topics)]
+        # 判为匹配却没有给出有效的母题编号，视为解析失败
+        if matched and not matched_topics:
+            continue
+        verdicts[paper_id] = (matched, matched_topics, str(item.get("reason", "")).strip())
+
+    return verdicts
+
+
+def _parse_topic_indices(value) -> List[int] | None:
+    """母题编号：接受整数、数字字符串或由它们组成的列表，其他形式返回 None（视为解析失败）"""
+    if value is None:
+        return []
+    values = value if isinstance(value, list) else [value]
+    indices = []
+    for n in values:
+        if isinstance(n, int) and not isinstance(n, bool):
+            indices.append(n)
+        elif isinstance(n, str) and n.strip().isdigit():
+            indices.append(int(n.strip()))
+        else:
+            return None
+    return indices
+
+
+def _build_filter_prompt(paper: Paper, topics: List[str]) -> str:
+    """构建母题筛选的 Prompt"""
+    topics_str = "\n".join([f"{i+1}. {t}" for i, t in enumerate(topics)])
+
+    return f"""论文标题：{paper.title}
+论文摘要：{paper.abstract}
+
+用户研究母题：
+{topics_str}
+
+判断：这篇论文是否直接解决上述任一母题?
+要求：
+- 只回答"是"或"否"
+- 如果是，说明匹配的母题编号和简短原因（20字内）
+- 如果论文只是略微相关，也应回答"否"
+
+输出格式：
+是/否
+匹配母题：[编号]
+原因：[简短说明]
+"""
+
+
+def _parse_filter_result(result: str, topics: List[str]) -> tuple[List[str], str]:
+    """
+    解析 LLM 筛选结果
+
+    Returns:
+        (匹配的母题列表, 匹配原因)
+    """
+    lines = result.split("\n")
+
+    # 提取匹配的母题编号
+    matched_indices = []
+    reason = ""
+
+    for line in lines:
+        if line.startswith("匹配母题"):
+            # 提取编号（如 "匹配母题：1, 3" → [1, 3]）
+            numbers_str = line.split("：")[-1].strip().strip("[]")
+            matched_indices = [
+                int(n.strip()) for n in numbers_str.replace("，", ",").split(",") if n.strip().isdigit()
+            ]
+
+        elif line.startswith("原因"):
+            reason = line.split("：")[-1].strip()
+
+    # 将编号转换为母题文本
+    matched_topics = [topics[i - 1] for i in matched_indices if 0 < i <= len(topics)]
+
+    return matched_topics, reason
@@ -1,10 +1,16 @@
 """数据结构定义"""
 
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, fields
 from datetime import datetime
 
 
-@dataclass
+def _intern_all(values) -> list[str]:
+    """驻留字符串：大量论文共享的类别、作者名只保留一份"""
+    return [sys.intern(v) for v in values]
+
+
+@dataclass(slots=True)
 class Paper:
     """arXiv 论文的原始数据"""
 
@@ -16,11 +22,31 @@ class Paper:
     published_date: datetime # 发布日期
     categories: list[str]   # 类别标签（如 ["cs.CV", "cs.AI"]）
 
+    def __post_init__(self):
+        self.authors = _intern_all(self.authors)
+        self.categories = _intern_all(self.categories)
+
     def __str__(self) -> str:
         return f"{self.title} ({self.arxiv_id})"
 
+    def as_dict(self) -> dict:
+        """浅拷贝为字段字典（slots 类没有 __dict__），用于构造子类：FilteredPaper(**paper.as_dict(), ...)"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def freeze(self) -> "FrozenPaper":
+        """转换为不可变、可哈希的 FrozenPaper"""
+        return FrozenPaper(
+            title=self.title,
+            abstract=self.abstract,
+            authors=tuple(self.authors),
+            arxiv_id=self.arxiv_id,
+            arxiv_url=self.arxiv_url,
+            published_date=self.published_date,
+            categories=tuple(self.categories),
+        )
 
-@dataclass
+
+@dataclass(slots=True)
 class FilteredPaper(Paper):
     """通过母题筛选的论文"""
 
@@ -28,12 +54,16 @@ class FilteredPaper(Paper):
     match_reason: str          # 匹配原因（LLM 生成）
     filter_tokens: int         # 筛选消耗的 token 数
 
+    def __post_init__(self):
+        Paper.__post_init__(self)
+        self.matched_topics = _intern_all(self.matched_topics)
+
     def __str__(self) -> str:
         topics = ", ".join(self.matched_topics)
         return f"{self.title} (匹配: {topics})"
 
 
-@dataclass
+@dataclass(slots=True)
 class SummarizedPaper(FilteredPaper):
     """包含 AI 生成摘要的论文"""
 
@@ -44,3 +74,35 @@ class SummarizedPaper(FilteredPaper):
     def total_tokens(self) -> int:
         """总 token 消耗（筛选 + 摘要）"""
         return self.filter_tokens + self.summary_tokens
+
+
+@dataclass(slots=True, frozen=True)
+class FrozenPaper:
+    """Paper 的不可变版本：列表字段改为元组，可哈希，可作为 dict 键或放入 set"""
+
+    title: str
+    abstract: str
+    authors: tuple[str, ...]
+    arxiv_id: str
+    arxiv_url: str
+    published_date: datetime
+    categories: tuple[str, ...]
+
+    def __post_init__(self):
+        object.__setattr__(self, "authors", tuple(sys.intern(a) for a in self.authors))
+        object.__setattr__(self, "categories", tuple(sys.intern(c) for c in self.categories))
+
+    def __str__(self) -> str:
+        return f"{self.title} ({self.arxiv_id})"
+
+    def thaw(self) -> Paper:
+        """转换回可变的 Paper"""
+        return Paper(
+            title=self.title,
+            abstract=self.abstract,
+            authors=list(self.authors),
+            arxiv_id=self.arxiv_id,
+            arxiv_url=self.arxiv_url,
+            published_date=self.published_date,
+            categories=list(self.categories),
+        )
@@ -0,0 +1,264 @@
+"""
+母题预筛选：调用 LLM 之前，先用 BM25 在本地对论文排序
+
+只有得分靠前（或超过阈值）的论文才会交给 LLM 判断，其余论文直接淘汰。
+为了掌握召回率损失，可以从被淘汰的论文中抽样一小部分也交给 LLM（审计），
+据此估算本次运行漏掉的匹配论文数量。
+"""
+
+import math
+import random
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from .models import Paper
+
+_ASCII_WORD_RE = re.compile(r"[a-z][a-z0-9]*|\d+")
+_CJK_RUN_RE = re.compile(r"[\u4e00-\u9fff]+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or our that the their "
+    "this to we with which via using use based new show propose proposed paper approach method "
+    "methods results model models".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    分词：英文按单词（小写、去停用词、去复数 s），中文按相邻两字切分（bigram）
+
+    中文母题没有分词器也能与中文关键词互相匹配；英文摘要与中文母题之间的匹配
+    依赖母题关键词扩展（见 Config.topic_keywords）。
+    """
+    text = text.lower()
+    tokens = []
+    for word in _ASCII_WORD_RE.findall(text):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    for run in _CJK_RUN_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class BM25Index:
+    """
+    BM25 倒排索引
+
+    Args:
+        documents: 已分词的文档列表
+        k1: 词频饱和参数
+        b: 文档长度归一化参数
+    """
+
+    def __init__(self, documents: list[list[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(documents)
+        self.doc_lengths = [len(doc) for doc in documents]
+        self.avg_length = sum(self.doc_lengths) / self.size if self.size else 0.0
+
+        # term -> [(文档下标, 词频)]
+        self.postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for i, doc in enumerate(documents):
+            for term, tf in Counter(doc).items():
+                self.postings[term].append((i, tf))
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+
+    def scores(self, query: list[str]) -> list[float]:
+        """查询对每个文档的 BM25 得分"""
+        scores = [0.0] * self.size
+        if not self.size:
+            return scores
+        k1, b, avg = self.k1, self.b, self.avg_length or 1.0
+        for term in set(query):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for i, tf in postings:
+                norm = k1 * (1 - b + b * self.doc_lengths[i] / avg)
+                scores[i] += idf * tf * (k1 + 1) / (tf + norm)
+        return scores
+
+
+@dataclass
+class PrefilterOptions:
+    """
+    预筛选参数
+
+    通过条件：得分排名在前 max(min_keep, ceil(max_ratio × 总数)) 之内，或得分 ≥ min_score。
+    """
+
+    max_ratio: float = 0.1          # 最多送入 LLM 的比例
+    min_keep: int = 10              # 至少送入 LLM 的篇数
+    min_score: float | None = None  # 超过该得分的论文无论排名都送入 LLM
+    audit_rate: float = 0.02        # 从被淘汰论文中抽样送入 LLM 的比例（用于估算召回率）
+    seed: int = 0                   # 审计抽样的随机种子
+
+
+@dataclass
+class PrefilterReport:
+    """一次运行的预筛选统计：成本（LLM 调用数）与召回率估计"""
+
+    total: int = 0
+    passed: int = 0
+    cutoff_score: float = 0.0
+    audited: int = 0                # 被审计的淘汰论文数
+    audit_matches: int = 0          # 审计中 LLM 判定匹配的篇数（即预筛选漏掉的）
+    passed_matches: int = 0         # 通过预筛选且 LLM 判定匹配的篇数
+    llm_tokens: int = 0             # 实际消耗的筛选 token 数
+
+    @property
+    def rejected(self) -> int:
+        return self.total - self.passed
+
+    @property
+    def llm_calls(self) -> int:
+        return self.passed + self.audited
+
+    @property
+    def llm_calls_saved(self) -> int:
+        return self.total - self.llm_calls
+
+    @property
+    def estimated_missed(self) -> float:
+        """按审计命中率外推的漏检篇数"""
+        if not self.audited:
+            return 0.0
+        return self.audit_matches / self.audited * self.rejected
+
+    @property
+    def recall_estimate(self) -> float | None:
+        """预筛选的估计召回率；未审计或没有任何匹配时为 None"""
+        if not self.audited:
+            return None
+        expected = self.passed_matches + self.estimated_missed
+        if expected <= 0:
+            return None
+        return self.passed_matches / expected
+
+    @property
+    def tokens_saved_estimate(self) -> int:
+        """按平均每次调用的 token 数估算节省的 token"""
+        if not self.llm_calls:
+            return 0
+        return round(self.llm_tokens / self.llm_calls * self.llm_calls_saved)
+
+    def format(self) -> str:
+        """多行文本，便于直接打印"""
+        lines = [
+            f"预筛选：{self.total} 篇 → {self.passed} 篇送入 LLM（截断得分 {self.cutoff_score:.2f}）",
+            f"  LLM 调用：{self.llm_calls} 次（含审计 {self.audited} 次），节省 {self.llm_calls_saved} 次",
+        ]
+        if self.llm_tokens:
+            lines.append(f"  Token：消耗 {self.llm_tokens}，估计节省 {self.tokens_saved_estimate}")
+        recall = self.recall_estimate
+        if recall is None:
+            lines.append("  召回率：无法估计（未审计或审计样本中无匹配）")
+        else:
+            lines.append(
+                f"  召回率估计：{recall:.1%}（审计命中 {self.audit_matches}/{self.audited}，"
+                f"估计漏检 {self.estimated_missed:.1f} 篇）"
+            )
+        return "\n".join(lines)
+
+
+@dataclass
+class PrefilterResult:
+    """预筛选结果"""
+
+    passed: list[Paper]
+    rejected: list[Paper]
+    scores: dict[str, float]                 # arxiv_id -> 最高得分
+    best_topics: dict[str, str]              # arxiv_id -> 得分最高的母题
+    report: PrefilterReport = field(default_factory=PrefilterReport)
+
+    def audit_sample(self, rate: float, seed: int = 0) -> list[Paper]:
+        """从被淘汰的论文中随机抽样（至少 1 篇，只要有淘汰论文且 rate > 0）"""
+        if rate <= 0 or not self.rejected:
+            return []
+        k = min(len(self.rejected), max(1, round(rate * len(self.rejected))))
+        return random.Random(seed).sample(self.rejected, k)
+
+
+def paper_tokens(paper: Paper) -> list[str]:
+    """论文文本的分词结果（标题计两次，提高标题权重）"""
+    title = tokenize(paper.title)
+    return title + title + tokenize(paper.abstract)
+
+
+def prefilter_papers(
+    papers: list[Paper],
+    topics: list[str],
+    topic_keywords: dict[str, list[str]] | None = None,
+    options: PrefilterOptions | None = None,
+) -> PrefilterResult:
+    """
+    用 BM25 对论文与母题做匹配排序，挑出需要交给 LLM 判断的论文
+
+    每篇论文的得分为它对所有母题得分中的最大值。
+
+    Args:
+        papers: 原始论文列表
+        topics: 研究母题列表
+        topic_keywords: 母题 -> 扩展关键词（英文关键词可以让中文母题匹配英文摘要）
+        options: 预筛选参数
+
+    Returns:
+        PrefilterResult（passed 按得分从高到低排列）
+    """
+    options = options or PrefilterOptions()
+    topic_keywords = topic_keywords or {}
+
+    index = BM25Index([paper_tokens(p) for p in papers])
+    best = [0.0] * len(papers)
+    best_topic = [""] * len(papers)
+    for topic in topics:
+        query = tokenize(" ".join([topic, *topic_keywords.get(topic, [])]))
+        for i, score in enumerate(index.scores(query)):
+            if score > best[i]:
+                best[i] = score
+                best_topic[i] = topic
+
+    order = sorted(range(len(papers)), key=lambda i: best[i], reverse=True)
+    keep = max(options.min_keep, math.ceil(options.max_ratio * len(papers)))
+    passed_idx = []
+    rejected_idx = []
+    for rank, i in enumerate(order):
+        above = options.min_score is not None and best[i] >= options.min_score
+        (passed_idx if rank < keep or above else rejected_idx).append(i)
+
+    report = PrefilterReport(
+        total=len(papers),
+        passed=len(passed_idx),
+        cutoff_score=best[passed_idx[-1]] if passed_idx else 0.0,
+    )
+    return PrefilterResult(
+        passed=[papers[i] for i in passed_idx],
+        rejected=[papers[i] for i in rejected_idx],
+        scores={p.arxiv_id: s for p, s in zip(papers, best)},
+        best_topics={p.arxiv_id: t for p, t in zip(papers, best_topic) if t},
+        report=report,
+    )
+
+
+def evaluate_recall(result: PrefilterResult, relevant_ids: set[str]) -> float:
+    """
+    已知真实匹配集合时（如人工标注或全量 LLM 筛选的结果），计算预筛选的真实召回率
+
+    用于调 max_ratio / min_score：召回率与 LLM 调用数之间的取舍。
+    """
+    if not relevant_ids:
+        return 1.0
+    passed = {p.arxiv_id for p in result.passed}
+    return len(passed & relevant_ids) / len(relevant_ids)
@@ -0,0 +1,202 @@
+"""
+论文模型的序列化
+
+统一的 to_bytes / from_bytes 以及按行流式读写。每条记录带有 schema 版本（``_v``）
+和类型名（``_type``），读取时据此还原为对应的模型类。
+
+后端：
+- ``json``：安装了 orjson 时使用 orjson，否则回退到标准库 json；文件为 JSON Lines
+- ``msgpack``：二进制格式（需安装 msgpack）；文件为连续的 msgpack 对象
+"""
+
+import json
+from dataclasses import fields
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+from .models import FilteredPaper, FrozenPaper, Paper, SummarizedPaper
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 可选依赖
+    msgpack = None
+
+SCHEMA_VERSION = 1
+
+_TYPES = {cls.__name__: cls for cls in (Paper, FilteredPaper, SummarizedPaper, FrozenPaper)}
+_FIELD_NAMES = {name: tuple(f.name for f in fields(cls)) for name, cls in _TYPES.items()}
+
+# 读取大文件时每次从磁盘读取的字节数（msgpack）
+_READ_CHUNK = 1 << 16
+
+
+def to_dict(paper: Paper | FrozenPaper) -> dict:
+    """
+    转换为带版本信息的普通字典（日期转为 ISO 8601 字符串）
+
+    Raises:
+        TypeError: 不支持的对象类型
+    """
+    type_name = type(paper).__name__
+    names = _FIELD_NAMES.get(type_name)
+    if names is None or type(paper) is not _TYPES[type_name]:
+        raise TypeError(f"不支持序列化的类型：{type(paper).__name__}")
+
+    record = {"_v": SCHEMA_VERSION, "_type": type_name}
+    for name in names:
+        record[name] = getattr(paper, name)
+    record["published_date"] = paper.published_date.isoformat()
+    if type_name == "FrozenPaper":
+        record["authors"] = list(paper.authors)
+        record["categories"] = list(paper.categories)
+    return record
+
+
+def from_dict(record: dict) -> Paper | FrozenPaper:
+    """
+    从 to_dict 产生的字典还原模型对象
+
+    缺少 ``_type`` 时按 Paper 处理；多余的字段会被忽略，便于旧代码读取新版本写入的数据。
+
+    Raises:
+        ValueError: schema 版本高于当前版本，或缺少必需字段
+        TypeError: 未知的类型名
+    """
+    version = record.get("_v", SCHEMA_VERSION)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"数据的 schema 版本 {version} 高于当前支持的版本 {SCHEMA_VERSION}")
+
+    type_name = record.get("_type", "Paper")
+    cls = _TYPES.get(type_name)
+    if cls is None:
+        raise TypeError(f"未知的论文类型：{type_name}")
+
+    kwargs = {}
+    for name in _FIELD_NAMES[type_name]:
+        if name not in record:
+            raise ValueError(f"{type_name} 记录缺少字段：{name}")
+        kwargs[name] = record[name]
+    kwargs["published_date"] = datetime.fromisoformat(kwargs["published_date"])
+    return cls(**kwargs)
+
+
+def dumps(obj, format: str = "json") -> bytes:
+    """用所选后端编码任意 JSON 兼容对象"""
+    if format == "json":
+        if orjson is not None:
+            return orjson.dumps(obj)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if format == "msgpack":
+        return _require_msgpack().packb(obj, use_bin_type=True)
+    raise ValueError(f"未知的序列化格式：{format}")
+
+
+def loads(data: bytes | str, format: str = "json"):
+    """dumps 的逆操作"""
+    if format == "json":
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    if format == "msgpack":
+        return _require_msgpack().unpackb(data, raw=False)
+    raise ValueError(f"未知的序列化格式：{format}")
+
+
+def to_bytes(paper: Paper | FrozenPaper, format: str = "json") -> bytes:
+    """序列化单篇论文"""
+    return dumps(to_dict(paper), format)
+
+
+def from_bytes(data: bytes | str, format: str = "json") -> Paper | FrozenPaper:
+    """反序列化单篇论文"""
+    return from_dict(loads(data, format))
+
+
+def format_for_path(path: str | Path) -> str:
+    """根据扩展名推断格式：.msgpack / .mpk 为 msgpack，其余为 json"""
+    return "msgpack" if Path(path).suffix in (".msgpack", ".mpk") else "json"
+
+
+def write_records(dest: str | Path | BinaryIO, records: Iterable[dict], format: str | None = None) -> int:
+    """
+    流式写入字典记录（json 为每行一条，msgpack 为连续对象）
+
+    Args:
+        dest: 文件路径或以二进制模式打开的文件对象
+        records: 字典记录
+        format: 序列化格式，默认按扩展名推断
+
+    Returns:
+        写入的记录数
+    """
+    if isinstance(dest, (str, Path)):
+        format = format or format_for_path(dest)
+        with open(dest, "wb") as f:
+            return write_records(f, records, format)
+
+    format = format or "json"
+    newline = b"\n" if format == "json" else b""
+    count = 0
+    for record in records:
+        dest.write(dumps(record, format) + newline)
+        count += 1
+    return count
+
+
+def iter_records(source: str | Path | BinaryIO, format: str | None = None) -> Iterator[dict]:
+    """
+    流式读取 write_records 写入的记录（也可读取任意 JSON Lines 文件）
+
+    Args:
+        source: 文件路径或以二进制模式打开的文件对象
+        format: 序列化格式，默认按扩展名推断
+
+    Yields:
+        字典记录
+    """
+    if isinstance(source, (str, Path)):
+        format = format or format_for_path(source)
+        with open(source, "rb") as f:
+            yield from iter_records(f, format)
+        return
+
+    format = format or "json"
+    if format == "json":
+        for line in source:
+            if line.strip():
+                yield loads(line)
+    elif format == "msgpack":
+        unpacker = _require_msgpack().Unpacker(raw=False)
+        while chunk := source.read(_READ_CHUNK):
+            unpacker.feed(chunk)
+            yield from unpacker
+    else:
+        raise ValueError(f"未知的序列化格式：{format}")
+
+
+def write_papers(dest: str | Path | BinaryIO, papers: Iterable[Paper | FrozenPaper], format: str | None = None) -> int:
+    """流式写入论文对象，返回写入的篇数"""
+    return write_records(dest, (to_dict(p) for p in papers), format)
+
+
+def iter_papers(source: str | Path | BinaryIO, format: str | None = None) -> Iterator[Paper | FrozenPaper]:
+    """流式读取论文对象"""
+    for record in iter_records(source, format):
+        yield from_dict(record)
+
+
+def read_papers(source: str | Path | BinaryIO, format: str | None = None) -> list[Paper | FrozenPaper]:
+    """读取全部论文对象"""
+    return list(iter_papers(source, format))
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise ImportError("msgpack 格式需要安装 msgpack：pip install msgpack")
+    return msgpack
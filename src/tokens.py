@@ -0,0 +1,11 @@
+"""token 数估算（src/filter.py 的批量筛选与 ai/ 的限速器共用）"""
+
+import re
+
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估计 token 数：中文约每字 1 个，其余约每 4 个字符 1 个"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk) // 4 + 1
@@ -1,8 +1,12 @@
-import json
 import argparse
 import os
+import sys
 from itertools import count
 
+# 在 to_md 目录中运行，把仓库根目录加入 sys.path 以便导入 src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.serialization import iter_records  # noqa: E402
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--data", type=str, help="Path to the jsonline file")
@@ -16,9 +20,7 @@ if __name__ == "__main__":
         else:
             return len(preference)
 
-    with open(args.data, "r") as f:
-        for line in f:
-            data.append(json.loads(line))
+    data.extend(iter_records(args.data, "json"))
 
     categories = set([item["categories"][0] for item in data])
     template = open("paper_template.md", "r").read()